@@ -0,0 +1,129 @@
+import argparse
+from typing import Dict, List
+
+from toy_organizer.config import DBConfig, StorageConfig
+from toy_organizer.money import Money
+from toy_organizer.schema import migrate
+from toy_organizer.storage import PostgresStorage
+from toy_organizer.storage.resident import ResidentStorage
+
+from .models import seed
+from .pgcluster import TemporaryCluster
+from .runner import measure, printResults, readResults, writeResults
+
+
+DEFAULT_SCALES = [100_000, 1_000_000]
+
+AGES = [(3, 5), (0, 1), (13, 17), (6, 6)]
+
+BUDGETS = [Money(50_000), Money(500_000)]
+TOP = 10
+
+
+def checkSame(sql: PostgresStorage, resident: ResidentStorage):
+    for ageLower, ageUpper in AGES:
+        expected = sorted(toy.id for toy in sql.toys.selectByAge(ageLower, ageUpper))
+        actual = [toy.id for toy in resident.toys.selectByAge(ageLower, ageUpper)]
+        if actual != expected:
+            raise AssertionError(
+                f'Resident selectByAge({ageLower}, {ageUpper}) returned '
+                f'{len(actual)} toys instead of {len(expected)}')
+        if (resident.toys.countByAge(ageLower, ageUpper)
+                != sql.toys.countByAge(ageLower, ageUpper)):
+            raise AssertionError(
+                f'Resident countByAge({ageLower}, {ageUpper}) differs')
+        for maxCost in BUDGETS:
+            expected = [toy.cost for toy in sql.toys.selectTopByCost(
+                ageLower, ageUpper, maxCost, TOP)]
+            actual = [toy.cost for toy in resident.toys.selectTopByCost(
+                ageLower, ageUpper, maxCost, TOP)]
+            mostExpensive = resident.toys.selectMostExpensive(
+                ageLower, ageUpper, maxCost)
+            if actual != expected or (
+                    mostExpensive.cost if mostExpensive else None) != (
+                    expected[0] if expected else None):
+                raise AssertionError(
+                    f'Resident cost lookups for ({ageLower}, {ageUpper}, '
+                    f'{maxCost}) differ')
+
+
+def runScale(scale: int, iterations: int) -> List[Dict]:
+    sql = PostgresStorage()
+    resident = ResidentStorage(PostgresStorage())
+    cases = [('load resident catalog',
+              lambda: resident.toys.resident(), resident.reload)]
+    resident.toys.resident()
+    checkSame(sql, resident)
+
+    for storage in (sql, resident):
+        for ageLower, ageUpper in AGES:
+            cases.append((
+                f'{storage}: selectByAge({ageLower}, {ageUpper})',
+                lambda toys=storage.toys, lower=ageLower, upper=ageUpper:
+                    toys.selectByAge(lower, upper),
+                None))
+            cases.append((
+                f'{storage}: countByAge({ageLower}, {ageUpper})',
+                lambda toys=storage.toys, lower=ageLower, upper=ageUpper:
+                    toys.countByAge(lower, upper),
+                None))
+            cases.append((
+                f'{storage}: selectMostExpensive({ageLower}, {ageUpper})',
+                lambda toys=storage.toys, lower=ageLower, upper=ageUpper:
+                    toys.selectMostExpensive(lower, upper, BUDGETS[0]),
+                None))
+            cases.append((
+                f'{storage}: selectTopByCost({ageLower}, {ageUpper}, {TOP})',
+                lambda toys=storage.toys, lower=ageLower, upper=ageUpper:
+                    toys.selectTopByCost(lower, upper, BUDGETS[0], TOP),
+                None))
+
+    results = []
+    for name, func, setup in cases:
+        result = measure(name, func, iterations, setup)
+        result['scale'] = scale
+        results.append(result)
+    resident.toys.invalidate()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare age and cost queries answered by the resident '
+                    'catalog indexes with SQL on a throwaway local '
+                    'PostgreSQL cluster.')
+    parser.add_argument(
+        '--scales', default=','.join(str(scale) for scale in DEFAULT_SCALES),
+        help='comma separated numbers of seeded toys and events')
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--output', default='bench_ageindex.json')
+    parser.add_argument('--compare', help='results file of a previous run')
+    parser.add_argument(
+        '--lc-monetary', default='ru_RU.UTF-8',
+        help='lc_monetary of the cluster, must match the money format '
+             'expected by Toy')
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    results = []
+    with TemporaryCluster(args.lc_monetary) as cluster:
+        for scale in scales:
+            dbname = f'bench_{scale}'
+            cluster.createDatabase(dbname)
+            dBConnection = cluster.connect(dbname)
+            try:
+                DBConfig.setDBConnection(dBConnection)
+                migrate()
+                StorageConfig.setStorage(PostgresStorage())
+                seed(scale)
+                results.extend(runScale(scale, args.iterations))
+            finally:
+                dBConnection.close()
+
+    writeResults(args.output, results, {'scales': scales})
+    baseline = readResults(args.compare) if args.compare else None
+    printResults(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import argparse
+from typing import Dict, List
+
+from toy_organizer.analytics import CatalogArrays
+from toy_organizer.config import DBConfig
+from toy_organizer.models import Toy
+from toy_organizer.money import increasedCents
+from toy_organizer.schema import migrate
+from toy_organizer.storage.base import canonicalAge
+
+from .models import seed
+from .pgcluster import TemporaryCluster
+from .runner import measure, printResults, readResults, writeResults
+
+
+DEFAULT_SCALES = [100_000, 1_000_000]
+
+AGE_LOWER = 3
+AGE_UPPER = 5
+MULTIPLIER = 110
+
+
+def simulateWithToys(toys: List[Toy]):
+    before = after = 0
+    for toy in toys:
+        lower, upper = canonicalAge(toy.age)
+        if lower is None or upper is None:
+            continue
+        if lower <= AGE_LOWER and upper >= AGE_UPPER + 1:
+            cents = toy.cost.cents
+            before += cents * toy.quantity
+            after += increasedCents(cents, MULTIPLIER) * toy.quantity
+    return before, after
+
+
+def runScale(scale: int, iterations: int) -> List[Dict]:
+    toys = Toy.selectAllToys()
+    catalog = CatalogArrays.load()
+    preview = catalog.simulateRepricing(AGE_LOWER, AGE_UPPER, MULTIPLIER)
+    expected = simulateWithToys(toys)
+    actual = (preview.totalValueBefore.cents,
+              preview.totalValueAfter.cents)
+    if actual != expected:
+        raise AssertionError(
+            f'Vectorized simulation {actual} differs from {expected}')
+
+    cases = [
+        ('load toys', Toy.selectAllToys),
+        ('load arrays', CatalogArrays.load),
+        ('simulate repricing (toys)', lambda: simulateWithToys(toys)),
+        ('simulate repricing (numpy)',
+         lambda: catalog.simulateRepricing(AGE_LOWER, AGE_UPPER, MULTIPLIER)),
+        ('price distribution (numpy)', catalog.priceDistribution),
+        ('stock value by age (numpy)', catalog.stockValueByAge),
+        ('stock value curve (numpy)', catalog.stockValueCurve),
+    ]
+
+    results = []
+    for name, func in cases:
+        result = measure(name, func, iterations)
+        result['scale'] = scale
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare vectorized catalog analytics with iterating '
+                    'toys on a throwaway local PostgreSQL cluster.')
+    parser.add_argument(
+        '--scales', default=','.join(str(scale) for scale in DEFAULT_SCALES),
+        help='comma separated numbers of seeded toys and events')
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--output', default='bench_analytics.json')
+    parser.add_argument('--compare', help='results file of a previous run')
+    parser.add_argument(
+        '--lc-monetary', default='ru_RU.UTF-8',
+        help='lc_monetary of the cluster, must match the money format '
+             'expected by Toy')
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    results = []
+    with TemporaryCluster(args.lc_monetary) as cluster:
+        for scale in scales:
+            dbname = f'bench_{scale}'
+            cluster.createDatabase(dbname)
+            dBConnection = cluster.connect(dbname)
+            try:
+                DBConfig.setDBConnection(dBConnection)
+                migrate()
+                seed(scale)
+                results.extend(runScale(scale, args.iterations))
+            finally:
+                dBConnection.close()
+
+    writeResults(args.output, results, {'scales': scales})
+    baseline = readResults(args.compare) if args.compare else None
+    printResults(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import os
+import tempfile
+import tracemalloc
+from typing import Callable, Dict, List
+
+from toy_organizer.cli import TOY_FIELDS, toyToRecord, writeRecords
+from toy_organizer.config import DBConfig
+from toy_organizer.export import exportParquet
+from toy_organizer.models import Toy
+from toy_organizer.schema import migrate
+
+from .models import seed
+from .pgcluster import TemporaryCluster
+from .runner import measure, printResults, readResults, writeResults
+
+
+DEFAULT_SCALES = [100_000, 1_000_000]
+
+
+def writeCsv(toys, path: str):
+    with open(path, 'w', encoding='utf-8', newline='') as output:
+        writeRecords((toyToRecord(toy) for toy in toys), TOY_FIELDS,
+                     output, 'csv')
+
+
+def peakMemory(func: Callable[[], None]) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def runScale(scale: int, iterations: int, directory: str) -> List[Dict]:
+    csvPath = os.path.join(directory, 'toys.csv')
+    parquetPath = os.path.join(directory, 'toys.parquet')
+    cases = [
+        ('toys csv (selectAllToys)',
+         lambda: writeCsv(Toy.selectAllToys(), csvPath)),
+        ('toys csv (iterAll)', lambda: writeCsv(Toy.iterAll(), csvPath)),
+        ('toys parquet', lambda: exportParquet('toys', parquetPath)),
+        ('events parquet', lambda: exportParquet('events', parquetPath)),
+    ]
+
+    results = []
+    for name, func in cases:
+        result = measure(name, func, iterations)
+        result['scale'] = scale
+        result['peak_mb'] = peakMemory(func)
+        results.append(result)
+        print(f'{scale:>9} {name:<40} peak {result["peak_mb"]:.1f} MB')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare the Parquet export with row by row CSV export '
+                    'on a throwaway local PostgreSQL cluster.')
+    parser.add_argument(
+        '--scales', default=','.join(str(scale) for scale in DEFAULT_SCALES),
+        help='comma separated numbers of seeded toys and events')
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--output', default='bench_export.json')
+    parser.add_argument('--compare', help='results file of a previous run')
+    parser.add_argument(
+        '--lc-monetary', default='ru_RU.UTF-8',
+        help='lc_monetary of the cluster, must match the money format '
+             'expected by Toy')
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    results = []
+    with TemporaryCluster(args.lc_monetary) as cluster, \
+            tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            dbname = f'bench_{scale}'
+            cluster.createDatabase(dbname)
+            dBConnection = cluster.connect(dbname)
+            try:
+                DBConfig.setDBConnection(dBConnection)
+                migrate()
+                seed(scale)
+                results.extend(runScale(scale, args.iterations, directory))
+            finally:
+                dBConnection.close()
+
+    writeResults(args.output, results, {'scales': scales})
+    baseline = readResults(args.compare) if args.compare else None
+    printResults(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+import argparse
+import csv
+import os
+import tempfile
+from typing import Dict, List
+
+from toy_organizer.config import DBConfig
+from toy_organizer.datagen import generateToys
+from toy_organizer.importer import IMPORT_FIELDS, ToyImporter
+from toy_organizer.schema import migrate
+
+from .pgcluster import TemporaryCluster
+from .runner import measure, printResults, readResults, writeResults
+
+
+DEFAULT_SCALES = [100_000, 1_000_000]
+
+_BAD_ROWS = [
+    ['', '100', '1', '1', '2'],
+    ['Сломанный мяч', 'бесплатно', '1', '1', '2'],
+    ['Перевёрнутый кубик', '100', '1', '5', '3'],
+    ['Пустой набор', '100', 'много', '1', '2'],
+    ['Обрезанная строка', '100'],
+]
+
+
+def writeSupplierCsv(path: str, scale: int):
+    with open(path, 'w', encoding='utf-8', newline='') as output:
+        writer = csv.writer(output, lineterminator='\n')
+        writer.writerow(IMPORT_FIELDS)
+        name = ''
+        for index, row in enumerate(generateToys(scale)):
+            if index % 100 == 99:
+                writer.writerow(_BAD_ROWS[index // 100 % len(_BAD_ROWS)])
+                continue
+            if index % 97 == 96:
+                writer.writerow([f' {name.upper()} ', '1', '1', '1', '2'])
+                continue
+            name = f'{row["name"]} {index}'
+            age = row['age_restriction']
+            writer.writerow([
+                name,
+                f'{row["cost"].toDecimal():,} руб.'.replace(',', ' '),
+                row['quantity'],
+                age.lower,
+                age.upper - 1,
+            ])
+
+
+def validate(path: str, workers: int) -> ToyImporter:
+    importer = ToyImporter(workers)
+    rejected = []
+    with open(path, encoding='utf-8') as input_:
+        for _ in importer.validRows(input_, rejected.append):
+            pass
+    return importer
+
+
+def importCsv(path: str, workers: int):
+    importer = ToyImporter(workers)
+    with open(path, encoding='utf-8') as input_:
+        importer.run(input_, lambda record: None)
+    return importer
+
+
+def truncateToys():
+    dBConnection = DBConfig.getDBConnection()
+    with dBConnection.cursor() as cursor:
+        cursor.execute('TRUNCATE toys RESTART IDENTITY CASCADE;')
+    dBConnection.commit()
+
+
+def runScale(
+    path: str,
+    scale: int,
+    iterations: int,
+    cores: int,
+    database: bool
+) -> List[Dict]:
+    single = validate(path, 1)
+    parallel = validate(path, cores)
+    if (single.imported, single.rejected) != (parallel.imported, parallel.rejected):
+        raise AssertionError(
+            f'{cores} workers validated {parallel}, one worker {single}')
+
+    cases = [
+        ('validate (1 process)', lambda: validate(path, 1), None),
+        (f'validate ({cores} processes)', lambda: validate(path, cores), None),
+    ]
+    if database:
+        cases += [
+            ('toys import (1 process, COPY)',
+             lambda: importCsv(path, 1), truncateToys),
+            (f'toys import ({cores} processes, COPY)',
+             lambda: importCsv(path, cores), truncateToys),
+        ]
+
+    results = []
+    for name, func, setup in cases:
+        result = measure(name, func, iterations, setup)
+        result['scale'] = scale
+        result['imported'] = single.imported
+        result['rejected'] = single.rejected
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare validating and importing a supplier CSV file in '
+                    'one process and across a process pool, optionally '
+                    'copying it into a throwaway local PostgreSQL cluster.')
+    parser.add_argument(
+        '--scales', default=','.join(str(scale) for scale in DEFAULT_SCALES),
+        help='comma separated numbers of rows in the generated file')
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--validate-only', action='store_true',
+                        help='skip the PostgreSQL import cases')
+    parser.add_argument('--output', default='bench_importer.json')
+    parser.add_argument('--compare', help='results file of a previous run')
+    parser.add_argument(
+        '--lc-monetary', default='ru_RU.UTF-8',
+        help='lc_monetary of the cluster, must match the money format '
+             'expected by Toy')
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'supplier.csv')
+        if args.validate_only:
+            for scale in scales:
+                writeSupplierCsv(path, scale)
+                results.extend(runScale(
+                    path, scale, args.iterations, args.workers, False))
+        else:
+            with TemporaryCluster(args.lc_monetary) as cluster:
+                for scale in scales:
+                    writeSupplierCsv(path, scale)
+                    dbname = f'bench_{scale}'
+                    cluster.createDatabase(dbname)
+                    dBConnection = cluster.connect(dbname)
+                    try:
+                        DBConfig.setDBConnection(dBConnection)
+                        migrate()
+                        results.extend(runScale(
+                            path, scale, args.iterations, args.workers, True))
+                    finally:
+                        dBConnection.close()
+
+    writeResults(args.output, results,
+                 {'scales': scales, 'workers': args.workers})
+    baseline = readResults(args.compare) if args.compare else None
+    printResults(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
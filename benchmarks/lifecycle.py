@@ -0,0 +1,166 @@
+import argparse
+import os
+import sys
+from typing import Dict, List
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QEvent
+from PyQt6.QtWidgets import QApplication
+
+from toy_organizer.changes import ChangeBus
+from toy_organizer.config import StorageConfig
+from toy_organizer.datagen import generateEvents, generateToys
+from toy_organizer.memreport import MemoryReport
+from toy_organizer.models import Event, Toy
+from toy_organizer.presenters import (
+    AddEventPresenter,
+    AddToyPresenter,
+    AgeSearchPresenter,
+    AnalyticsPresenter,
+    App,
+    CatalogPresenter,
+    EventCatalogPresenter,
+    MainMenuPresenter,
+    MostExpensiveToyPresenter,
+    NavMenuPresenter
+)
+from toy_organizer.storage import MemoryStorage
+from toy_organizer.spans import SpanTracer
+from toy_organizer.views import MainWindow, QtDispatcher, QtMainView, QtNavMenuView
+
+from .runner import writeResults
+
+
+PAGES = [
+    CatalogPresenter,
+    AgeSearchPresenter,
+    MostExpensiveToyPresenter,
+    AnalyticsPresenter,
+    AddToyPresenter,
+    EventCatalogPresenter,
+    AddEventPresenter,
+    MainMenuPresenter,
+]
+
+
+def settle():
+    for _ in range(3):
+        QApplication.processEvents()
+        QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+
+
+def seed(scale: int):
+    Toy.createMany(Toy(row['name'], row['cost'], row['quantity'],
+                       row['age_restriction'])
+                   for row in generateToys(scale))
+    Event.createMany(Event(row['description'], row['date_created'])
+                     for row in generateEvents(scale // 10))
+
+
+def runCycles(cycles: int) -> List[Dict]:
+    from main import createViewFactory
+
+    window = MainWindow()
+    mainView = QtMainView(window)
+    navMenuView = QtNavMenuView(window)
+    window.switchPage(mainView)
+    window.setNavMenu(navMenuView)
+    window.show()
+    viewFactory = createViewFactory(window, mainView, navMenuView)
+    navMenuPresenter = NavMenuPresenter(viewFactory)
+    App.run(MainMenuPresenter(viewFactory), navMenuPresenter)
+    settle()
+
+    results = []
+    for cycle in range(cycles):
+        for presenterClass in PAGES:
+            navMenuPresenter.open(presenterClass)
+            settle()
+        counts = MemoryReport.qtObjectCounts()
+        current, peak = MemoryReport.tracedMemory()
+        results.append({
+            'name': f'cycle {cycle + 1}',
+            'cycle': cycle + 1,
+            'qt_objects': sum(counts.values()),
+            'widgets': len(QApplication.allWidgets()),
+            'subscribers': ChangeBus.subscriberCount(),
+            'traced_kib': current / 1024,
+            'peak_kib': peak / 1024,
+        })
+    results.append(checkCoalescing(navMenuPresenter))
+    App.leavePresenter()
+    return results
+
+
+def checkCoalescing(navMenuPresenter: NavMenuPresenter, burst: int = 50) -> Dict:
+    navMenuPresenter.open(CatalogPresenter)
+    settle()
+    SpanTracer.reset()
+    toys = Toy.selectPage('id', False, None, burst)
+    for toy in toys:
+        toy.quantity += 1
+        toy.save()
+    settle()
+    SpanTracer.notifyPainted()
+    refreshes = sum(histogram.count for histogram in SpanTracer.histograms()
+                    if histogram.name == 'CatalogPresenter.onToysChanged')
+    return {
+        'name': 'coalescing',
+        'writes': len(toys),
+        'refreshes': refreshes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Navigate through every page repeatedly on the offscreen '
+                    'platform and report whether Qt objects or the Python '
+                    'heap keep growing.')
+    parser.add_argument('--cycles', type=int, default=20)
+    parser.add_argument('--scale', type=int, default=2000,
+                        help='number of toys in the in-memory catalog')
+    parser.add_argument('--warmup', type=int, default=3,
+                        help='cycles excluded from the growth check')
+    parser.add_argument('--output', default='bench_lifecycle.json')
+    args = parser.parse_args()
+
+    application = QApplication(sys.argv)
+    dispatcher = QtDispatcher()
+    ChangeBus.setScheduler(dispatcher.post)
+    StorageConfig.setStorage(MemoryStorage())
+    seed(args.scale)
+    MemoryReport.install()
+    results = runCycles(args.cycles)
+    coalescing = results.pop()
+
+    for result in results:
+        print(f'{result["name"]:>10}: {result["qt_objects"]:6d} Qt objects, '
+              f'{result["widgets"]:6d} widgets, '
+              f'{result["subscribers"]:3d} subscribers, '
+              f'{result["traced_kib"]:9.0f} KiB traced')
+    print(MemoryReport.report())
+    print(f'{coalescing["writes"]} writes in one tick refreshed the catalog '
+          f'{coalescing["refreshes"]} time(s)')
+
+    warm = results[min(args.warmup, len(results) - 1)]
+    last = results[-1]
+    results.append(coalescing)
+    writeResults(args.output, results,
+                 {'cycles': args.cycles, 'scale': args.scale})
+    application.quit()
+    if last['widgets'] > warm['widgets']:
+        print(f'Widgets grew from {warm["widgets"]} to {last["widgets"]} '
+              f'after {warm["cycle"]} warm-up cycles')
+        sys.exit(1)
+    if last['subscribers'] > warm['subscribers']:
+        print(f'Model change subscribers grew from {warm["subscribers"]} to '
+              f'{last["subscribers"]}')
+        sys.exit(1)
+    if coalescing['refreshes'] != 1:
+        print(f'Expected one catalog refresh, got {coalescing["refreshes"]}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+import argparse
+import random
+from datetime import date, timedelta
+from typing import Dict, List
+
+from psycopg2.extras import NumericRange
+
+from toy_organizer.config import DBConfig
+from toy_organizer.datagen import DEFAULT_UNTIL, copyEvents, copyToys
+from toy_organizer.models import Event, Toy
+from toy_organizer.money import Money
+from toy_organizer.schema import migrate
+
+from .pgcluster import TemporaryCluster
+from .runner import measure, printResults, readResults, writeResults
+
+
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000]
+
+
+def seed(scale: int):
+    dBConnection = DBConfig.getDBConnection()
+    copyToys(scale)
+    copyEvents(scale)
+
+    dBConnection.autocommit = True
+    with dBConnection.cursor() as cursor:
+        cursor.execute('VACUUM ANALYZE;')
+    dBConnection.autocommit = False
+
+
+def runScale(scale: int, iterations: int, scanIterations: int) -> List[Dict]:
+    randomizer = random.Random(scale)
+    state = {}
+
+    def randomId() -> int:
+        return randomizer.randint(1, scale)
+
+    def newToy(name: str = None) -> Toy:
+        return Toy(
+            name or f'Bench toy {randomizer.random()}',
+            Money.fromDecimal('99.90'),
+            5,
+            NumericRange(3, 7)
+        )
+
+    def setupSavedToy():
+        toy = newToy()
+        toy.save()
+        state['toy'] = toy
+
+    def setupSavedEvent():
+        event = Event('Bench event', date.today())
+        event.save()
+        state['event'] = event
+
+    def setupExistingToy():
+        toy = Toy.selectById(randomId())
+        toy.quantity += 1
+        state['toy'] = toy
+
+    def setupExistingEvent():
+        event = Event.selectById(randomId())
+        event.description += '.'
+        state['event'] = event
+
+    def setupToyName():
+        state['name'] = f'Bench toy {randomizer.random()}'
+        newToy(state['name']).save()
+
+    def randomDate() -> date:
+        return DEFAULT_UNTIL - timedelta(days=randomizer.randint(0, 5 * 365))
+
+    cases = [
+        ('Toy.selectAllToys', Toy.selectAllToys, scanIterations, None),
+        ('Toy.selectById', lambda: Toy.selectById(randomId()),
+         iterations, None),
+        ('Toy.selectByAge', lambda: Toy.selectByAge(3, 5, 'cost'),
+         scanIterations, None),
+        ('Toy.selectMostExpensive',
+         lambda: Toy.selectMostExpensive(3, 5, Money(100_000)),
+         iterations, None),
+        ('Toy.increaseCostForAge',
+         lambda: Toy.increaseCostForAge(11, 12, 100),
+         scanIterations, None),
+        ('Toy.priceHistory', lambda: Toy.priceHistory(randomId()),
+         iterations, None),
+        ('Toy.save (create)', lambda: newToy().save(), iterations, None),
+        ('Toy.save (update)', lambda: state['toy'].save(),
+         iterations, setupExistingToy),
+        ('Toy.delete', lambda: state['toy'].delete(),
+         iterations, setupSavedToy),
+        ('Toy.deleteByName', lambda: Toy.deleteByName(state['name']),
+         iterations, setupToyName),
+        ('Event.selectAll', Event.selectAll, scanIterations, None),
+        ('Event.selectById', lambda: Event.selectById(randomId()),
+         iterations, None),
+        ('Event.selectByDate', lambda: Event.selectByDate(randomDate()),
+         iterations, None),
+        ('Event.save (create)',
+         lambda: Event('Bench event', date.today()).save(),
+         iterations, None),
+        ('Event.save (update)', lambda: state['event'].save(),
+         iterations, setupExistingEvent),
+        ('Event.delete', lambda: state['event'].delete(),
+         iterations, setupSavedEvent),
+    ]
+
+    results = []
+    for name, func, caseIterations, setup in cases:
+        result = measure(name, func, caseIterations, setup)
+        result['scale'] = scale
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark Toy and Event methods against a throwaway '
+                    'local PostgreSQL cluster.')
+    parser.add_argument(
+        '--scales', default=','.join(str(scale) for scale in DEFAULT_SCALES),
+        help='comma separated numbers of seeded toys and events')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--scan-iterations', type=int, default=5)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', help='results file of a previous run')
+    parser.add_argument(
+        '--lc-monetary', default='ru_RU.UTF-8',
+        help='lc_monetary of the cluster, must match the money format '
+             'expected by Toy')
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    results = []
+    with TemporaryCluster(args.lc_monetary) as cluster:
+        for scale in scales:
+            dbname = f'bench_{scale}'
+            cluster.createDatabase(dbname)
+            dBConnection = cluster.connect(dbname)
+            try:
+                DBConfig.setDBConnection(dBConnection)
+                migrate()
+                seed(scale)
+                results.extend(
+                    runScale(scale, args.iterations, args.scan_iterations))
+            finally:
+                dBConnection.close()
+
+    writeResults(args.output, results, {'scales': scales})
+    baseline = readResults(args.compare) if args.compare else None
+    printResults(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import argparse
+from typing import Dict, List, Tuple, Union
+
+from toy_organizer.money import Money
+
+from .runner import measure, printResults, readResults, writeResults
+
+
+PARSE_CASES: List[Tuple[str, Union[int, None]]] = [
+    ('1 234,50 руб.', 123450),
+    ('1\xa0234,50 ₽', 123450),
+    ('-3,10 ₽', -310),
+    ('$1,234.50', 123450),
+    ('-$1,234.50', -123450),
+    ('($12.00)', -1200),
+    ('12 руб', 1200),
+    ('1234,5', 123450),
+    ('1.234', 123400),
+    ('.50', 50),
+    ('$.99', 99),
+    ('5-', None),
+    ('--5', None),
+    ('12.-', None),
+    ('12abc', None),
+    ('1e5', None),
+    ('$', None),
+    ('', None),
+]
+
+STRICT_CASES: List[Tuple[str, Union[int, None]]] = [
+    ('1 234,50 руб.', 123450),
+    ('$12.99', 1299),
+    ('$.99', 99),
+    ('.50', 50),
+    ('5-', None),
+    ('--5', None),
+    ('12.5.3', None),
+    ('1 2 3', None),
+    ('12,345', 1234500),
+    ('12.999', 1299900),
+    ('12.9999', None),
+    ('.', None),
+]
+
+SAMPLES = ['1 234,50 руб.', '$1,234.50', '12,00 ₽', '-3,10 ₽']
+
+
+def checkParse():
+    for parse, cases in ((Money.parse, PARSE_CASES),
+                         (Money.parseStrict, STRICT_CASES)):
+        for text, expected in cases:
+            try:
+                actual = parse(text).cents
+            except ValueError:
+                actual = None
+            if actual != expected:
+                raise AssertionError(
+                    f'Money.{parse.__name__}({text!r}) returned {actual}, '
+                    f'expected {expected}')
+
+
+def parseAll(iterations: int):
+    for _ in range(iterations):
+        for text in SAMPLES:
+            Money.parse(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Check Money.parse and Money.parseStrict on money text '
+                    'formats and measure Money.parse.')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--values', type=int, default=25_000,
+                        help='parsed values per iteration, in groups of '
+                             f'{len(SAMPLES)}')
+    parser.add_argument('--output', default='bench_money.json')
+    parser.add_argument('--compare', help='results file of a previous run')
+    args = parser.parse_args()
+
+    checkParse()
+    groups = args.values // len(SAMPLES)
+    results: List[Dict] = [
+        measure('Money.parse', lambda: parseAll(groups), args.iterations),
+    ]
+
+    writeResults(args.output, results, {'values': groups * len(SAMPLES)})
+    baseline = readResults(args.compare) if args.compare else None
+    printResults(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import os
+import shutil
+import subprocess
+import tempfile
+
+from psycopg2 import connect
+from psycopg2.extensions import connection
+from psycopg2.extras import RealDictCursor
+
+
+def findBinDir() -> str:
+    binDir = os.getenv('PG_BIN')
+    if binDir:
+        return binDir
+    pgConfig = shutil.which('pg_config')
+    if pgConfig is not None:
+        return subprocess.run(
+            [pgConfig, '--bindir'],
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout.strip()
+    initdb = shutil.which('initdb')
+    if initdb is not None:
+        return os.path.dirname(initdb)
+    raise RuntimeError(
+        'PostgreSQL binaries are not found. '
+        'Please, add them to PATH or specify PG_BIN.')
+
+
+class TemporaryCluster:
+    def __init__(self, lcMonetary: str = None, port: int = 5432) -> None:
+        self.lcMonetary = lcMonetary
+        self.port = port
+        self.binDir = findBinDir()
+        self.directory = None
+
+    @property
+    def dataDirectory(self) -> str:
+        return os.path.join(self.directory, 'data')
+
+    def _run(self, program: str, *args: str):
+        subprocess.run(
+            [os.path.join(self.binDir, program), *args],
+            check=True,
+            stdout=subprocess.DEVNULL
+        )
+
+    def start(self):
+        self.directory = tempfile.mkdtemp(prefix='toy_organizer_bench_')
+        initdbArgs = ['-D', self.dataDirectory, '-U', 'postgres',
+                      '-A', 'trust', '--encoding=UTF8']
+        if self.lcMonetary is not None:
+            initdbArgs.append(f'--lc-monetary={self.lcMonetary}')
+        self._run('initdb', *initdbArgs)
+        self._run(
+            'pg_ctl', 'start', '-w',
+            '-D', self.dataDirectory,
+            '-l', os.path.join(self.directory, 'postgres.log'),
+            '-o', f"-c listen_addresses='' -k {self.directory} -p {self.port}"
+        )
+
+    def stop(self):
+        if self.directory is None:
+            return
+        try:
+            self._run('pg_ctl', 'stop', '-w', '-m', 'fast',
+                      '-D', self.dataDirectory)
+        finally:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    def connect(self, dbname: str = 'postgres') -> connection:
+        return connect(
+            host=self.directory,
+            port=self.port,
+            dbname=dbname,
+            user='postgres',
+            cursor_factory=RealDictCursor
+        )
+
+    def createDatabase(self, dbname: str):
+        dBConnection = self.connect()
+        try:
+            dBConnection.autocommit = True
+            with dBConnection.cursor() as cursor:
+                cursor.execute(f'CREATE DATABASE {dbname};')
+        finally:
+            dBConnection.close()
+
+    def __enter__(self) -> 'TemporaryCluster':
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        self.stop()
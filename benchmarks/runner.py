@@ -0,0 +1,102 @@
+import json
+import math
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Union
+
+
+def percentile(sortedValues: List[float], fraction: float) -> float:
+    if not sortedValues:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sortedValues)) - 1, 0)
+    return sortedValues[rank]
+
+
+def measure(
+    name: str,
+    func: Callable[[], None],
+    iterations: int,
+    setup: Union[Callable[[], None], None] = None,
+    warmup: int = 1
+) -> Dict:
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        func()
+
+    latencies = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'name': name,
+        'iterations': iterations,
+        'ops_per_sec': iterations / total if total > 0 else 0.0,
+        'mean_ms': total / iterations * 1000,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p90_ms': percentile(latencies, 0.90) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000,
+    }
+
+
+def gitRevision() -> Union[str, None]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def writeResults(path: str, results: List[Dict], meta: Dict = None):
+    document = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'git_revision': gitRevision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            **(meta or {}),
+        },
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(document, output, indent=2)
+
+
+def readResults(path: str) -> List[Dict]:
+    with open(path, 'r', encoding='utf-8') as input_:
+        return json.load(input_)['results']
+
+
+def _resultKey(result: Dict):
+    return result.get('scale'), result['name']
+
+
+def printResults(results: List[Dict], baseline: List[Dict] = None):
+    baselineByKey = {_resultKey(result): result for result in baseline or []}
+    header = (f'{"scale":>9} {"benchmark":<40} {"ops/s":>10} '
+              f'{"p50 ms":>9} {"p90 ms":>9} {"p99 ms":>9}')
+    if baseline is not None:
+        header += f' {"p50 vs base":>12}'
+    print(header)
+    for result in results:
+        line = (f'{result.get("scale", ""):>9} {result["name"]:<40} '
+                f'{result["ops_per_sec"]:>10.1f} '
+                f'{result["p50_ms"]:>9.2f} {result["p90_ms"]:>9.2f} '
+                f'{result["p99_ms"]:>9.2f}')
+        base = baselineByKey.get(_resultKey(result))
+        if base is not None and base['p50_ms'] > 0:
+            line += f' {result["p50_ms"] / base["p50_ms"]:>11.2f}x'
+        print(line)
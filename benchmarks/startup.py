@@ -0,0 +1,96 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from .runner import percentile, printResults, readResults, writeResults
+
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+_IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parseImportTime(output: str) -> List[Tuple[str, int, int]]:
+    result = []
+    for line in output.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match is not None and len(match.group(3)) == 1:
+            result.append(
+                (match.group(4), int(match.group(1)), int(match.group(2))))
+    return result
+
+
+def runOnce() -> Tuple[float, List[Tuple[str, int, int]]]:
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-m', 'benchmarks.startupprobe'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        cwd=ROOT_PATH
+    )
+    firstPaint = None
+    for line in process.stdout:
+        if line.strip() == 'first paint':
+            firstPaint = time.perf_counter() - start
+    _, errors = process.communicate()
+    if firstPaint is None:
+        raise RuntimeError(f'Application did not paint its window:\n{errors}')
+    return firstPaint, parseImportTime(errors)
+
+
+def summarize(name: str, values: List[float]) -> Dict:
+    values = sorted(values)
+    return {
+        'name': name,
+        'iterations': len(values),
+        'ops_per_sec': len(values) / sum(values) if sum(values) else 0.0,
+        'mean_ms': sum(values) / len(values) * 1000,
+        'p50_ms': percentile(values, 0.50) * 1000,
+        'p90_ms': percentile(values, 0.90) * 1000,
+        'p99_ms': percentile(values, 0.99) * 1000,
+        'max_ms': values[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measure time to first paint and import time of main.py.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15,
+                        help='number of slowest top-level imports to show')
+    parser.add_argument('--output', default='bench_startup.json')
+    parser.add_argument('--compare', help='results file of a previous run')
+    args = parser.parse_args()
+
+    firstPaints = []
+    importTimes = {}
+    for _ in range(args.runs):
+        firstPaint, imports = runOnce()
+        firstPaints.append(firstPaint)
+        for module, _, cumulative in imports:
+            importTimes.setdefault(module, []).append(cumulative / 1_000_000)
+
+    results = [summarize('startup.firstPaint', firstPaints)]
+    results.append(summarize(
+        'startup.imports',
+        [sum(times[index] for times in importTimes.values()
+             if index < len(times))
+         for index in range(args.runs)]
+    ))
+    slowest = sorted(importTimes.items(),
+                     key=lambda item: sum(item[1]), reverse=True)
+    for module, times in slowest[:args.top]:
+        results.append(summarize(f'import {module}', times))
+
+    writeResults(args.output, results, {'runs': args.runs})
+    baseline = readResults(args.compare) if args.compare else None
+    printResults(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+import os
+import runpy
+import sys
+
+from PyQt6.QtWidgets import QApplication
+
+from main import FirstPaintProbe
+from toy_organizer.views import MainWindow
+
+
+MAIN_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'main.py')
+
+
+def onFirstPaint():
+    print('first paint', flush=True)
+    sys.stderr.flush()
+    os._exit(0)
+
+
+def probedExec(exec_):
+    def wrapper():
+        for widget in QApplication.topLevelWidgets():
+            if isinstance(widget, MainWindow):
+                FirstPaintProbe(widget, onFirstPaint)
+        return exec_()
+    return staticmethod(wrapper)
+
+
+def main():
+    QApplication.exec = probedExec(QApplication.exec)
+    sys.argv = [MAIN_PATH]
+    runpy.run_path(MAIN_PATH, run_name='__main__')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,436 @@
+import argparse
+import os
+import random
+import tempfile
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterator, List
+
+from psycopg2.extras import NumericRange
+
+from toy_organizer.config import DBConfig, StorageConfig
+from toy_organizer.datagen import DEFAULT_UNTIL, generateEvents, generateToys
+from toy_organizer.models import Event, Toy
+from toy_organizer.money import Money
+from toy_organizer.schema import migrate
+from toy_organizer.snapshot import CatalogSnapshot
+from toy_organizer.storage import (
+    MemoryStorage,
+    PostgresStorage,
+    SQLiteStorage,
+    Storage
+)
+from toy_organizer.storage.base import TOY_PAGE_COLUMNS, toyPageKey
+from toy_organizer.storage.resident import ResidentStorage
+
+from .pgcluster import TemporaryCluster
+from .runner import measure, printResults, readResults, writeResults
+
+
+BACKENDS = ['memory', 'sqlite', 'postgres', 'resident']
+DEFAULT_SCALES = [10_000, 100_000]
+SEED_BATCH_SIZE = 5000
+
+
+class ConformanceError(AssertionError):
+    pass
+
+
+def _check(condition: bool, message: str):
+    if not condition:
+        raise ConformanceError(message)
+
+
+def _fields(toy: Toy) -> tuple:
+    return toy.name, toy.cost, toy.quantity, toy.age.lower, toy.age.upper
+
+
+def checkToys():
+    toy = Toy('Мяч', Money.fromDecimal('99.99'), 5, NumericRange(3, 8))
+    toy.save()
+    _check(toy.saved, 'save() must assign an id')
+    _check(_fields(Toy.selectById(toy.id)) ==
+           ('Мяч', Money.fromDecimal('99.99'), 5, 3, 8),
+           'selectById must return the saved fields')
+
+    inclusive = Toy('Кубик', Money.fromDecimal('10'), 1, NumericRange(1, 3, '[]'))
+    inclusive.save()
+    _check(Toy.selectById(inclusive.id).age == NumericRange(1, 4),
+           'age ranges must be canonicalized to [lower, upper)')
+
+    _check([found.id for found in Toy.selectByAge(3, 7)] == [toy.id],
+           'selectByAge must return toys whose age range contains the search')
+    _check(Toy.selectByAge(2, 5) == [] and Toy.selectByAge(3, 8) == [],
+           'selectByAge must not return partially overlapping toys')
+    _check(Toy.countByAge(3, 7) == 1 and Toy.countByAge(2, 5) == 0,
+           'countByAge must count toys whose age range contains the search')
+
+    cheap = Toy('Мяч', Money.fromDecimal('5.50'), 2, NumericRange(0, 10))
+    cheap.save()
+    _check([found.id for found in Toy.selectByAge(3, 5, 'cost')] ==
+           [cheap.id, toy.id], 'selectByAge must order by cost')
+    _check(Toy.countByAge(3, 5) == 2 and Toy.countByAge(1, 2) == 2,
+           'countByAge must include every matching toy')
+    _check(Toy.selectMostExpensive(3, 5, Money.fromDecimal('99.99')).id == toy.id,
+           'selectMostExpensive must include the maximum cost')
+    _check(Toy.selectMostExpensive(3, 5, Money.fromDecimal('99.98')).id == cheap.id,
+           'selectMostExpensive must exclude toys above the maximum cost')
+    _check(Toy.selectMostExpensive(11, 12, Money(100_000)) is None,
+           'selectMostExpensive must return None when nothing matches')
+    _check([found.id for found in Toy.selectTopByCost(3, 5, Money(100_000), 5)]
+           == [toy.id, cheap.id],
+           'selectTopByCost must return the most expensive toys first')
+    _check([found.id for found in Toy.selectTopByCost(
+               3, 5, Money.fromDecimal('99.98'), 1)] == [cheap.id],
+           'selectTopByCost must respect the maximum cost and the limit')
+
+    Toy.increaseCostForAge(3, 5, 110)
+    _check(Toy.selectById(toy.id).cost == Money.fromDecimal('109.99'),
+           'increaseCostForAge must round to whole cents')
+    _check(Toy.selectById(inclusive.id).cost == Money.fromDecimal('10.00'),
+           'increaseCostForAge must not touch other ages')
+
+    toy = Toy.selectById(toy.id)
+    toy.quantity = 7
+    toy.age = NumericRange(4, 6)
+    toy.save()
+    _check(_fields(Toy.selectById(toy.id)) ==
+           ('Мяч', Money.fromDecimal('109.99'), 7, 4, 6),
+           'save() of a loaded toy must update it')
+
+    created = Toy.createMany(
+        Toy(f'Пазл {index}', Money(index * 100), index, NumericRange(0, 3))
+        for index in range(3))
+    _check(len({item.id for item in created}) == 3,
+           'createMany must assign distinct ids')
+    _check(Toy.deleteByNames(['Пазл 0', 'Пазл 1', 'Нет такого']) == 2,
+           'deleteByNames must return the number of deleted toys')
+
+    Toy.deleteByName('Мяч')
+    _check({found.id for found in Toy.selectAllToys()} ==
+           {inclusive.id, created[2].id},
+           'deleteByName must delete every toy with the name')
+    _check([row for rows in StorageConfig.getStorage().toys.iterStockRows(1)
+            for row in rows] ==
+           [(inclusive.id, 1000, 1, 1, 4), (created[2].id, 200, 2, 0, 3)],
+           'iterStockRows must return cents, quantities and age bounds by id')
+
+    inclusive.delete()
+    try:
+        Toy.selectById(inclusive.id)
+    except ValueError:
+        pass
+    else:
+        raise ConformanceError('selectById of a deleted toy must raise')
+    _check([found.id for found in Toy.iterAll(1)] == [created[2].id],
+           'iterAll must return every toy')
+    created[2].delete()
+
+
+def checkPages():
+    toys = Toy.createMany([
+        Toy('Пазл', Money(500), 3, NumericRange(3, 8)),
+        Toy('Кубик', Money(500), 1, NumericRange(0, 4)),
+        Toy('Мяч', Money(120), 3, NumericRange(3, 8)),
+        Toy('Кубик', Money(990), 7, NumericRange(3, 6)),
+        Toy('Мяч', Money(120), 2, NumericRange(1, 3)),
+    ])
+    for orderBy in TOY_PAGE_COLUMNS:
+        for descending in (False, True):
+            expected = [toy.id for toy in sorted(
+                toys, key=lambda toy: toyPageKey(toy, orderBy),
+                reverse=descending)]
+            found, after = [], None
+            while True:
+                page = Toy.selectPage(orderBy, descending, after, 2)
+                found.extend(toy.id for toy in page)
+                if len(page) < 2:
+                    break
+                after = page[-1]
+            _check(found == expected,
+                   f'selectPage must page through toys ordered by {orderBy}'
+                   f'{" descending" if descending else ""}')
+    for toy in toys:
+        toy.delete()
+
+
+def checkEvents():
+    day = date(2024, 3, 1)
+    event = Event('Поставка', day)
+    event.save()
+    later = Event('Инвентаризация', day + timedelta(days=10))
+    later.save()
+
+    _check(Event.selectById(event.id).description == 'Поставка',
+           'selectById must return the saved event')
+    _check([found.id for found in Event.selectByDate(day)] == [event.id],
+           'selectByDate must return events of the day')
+    _check([found.id for found in Event.selectSince(day + timedelta(days=1))]
+           == [later.id], 'selectSince must return later events')
+
+    event.description = 'Возврат'
+    event.dateCreated = day + timedelta(days=1)
+    event.save()
+    _check(Event.selectByDate(day) == [],
+           'save() must move an event to its new date')
+    _check(Event.selectById(event.id).description == 'Возврат',
+           'save() of a loaded event must update it')
+
+    created = Event.createMany(Event('Акция', day) for _ in range(2))
+    _check(len(Event.selectAll()) == 4, 'createMany must save every event')
+
+    for found in [event, later] + created:
+        found.delete()
+    _check(Event.selectAll() == [], 'delete() must delete the event')
+    try:
+        Event.selectById(event.id)
+    except ValueError:
+        pass
+    else:
+        raise ConformanceError('selectById of a deleted event must raise')
+
+
+def checkSnapshot():
+    toys = Toy.createMany([
+        Toy('Конструктор', Money(1000), 1, NumericRange(3, None)),
+        Toy('Погремушка', Money(500), 2, NumericRange(None, 3)),
+        Toy('Открытка', Money(100), 3, NumericRange(empty=True)),
+        Toy('Мяч', Money(700), 4, NumericRange(3, 8)),
+    ])
+    directory = tempfile.mkdtemp()
+    CatalogSnapshot.open(os.path.join(directory, 'snapshot.sqlite3'))
+    try:
+        CatalogSnapshot.refresh()
+        _check([_fields(toy) for toy in CatalogSnapshot.selectAllToys()] ==
+               [_fields(toy) for toy in Toy.selectAllToys()],
+               'snapshot must keep open-ended and empty age ranges')
+        _check([toy.id for toy in CatalogSnapshot.selectByAge(3, 5)] ==
+               [toy.id for toy in Toy.selectByAge(3, 5)],
+               'snapshot selectByAge must skip open-ended age ranges')
+        _check(CatalogSnapshot.selectMostExpensive(3, 5, Money(100_000)).id
+               == toys[3].id,
+               'snapshot selectMostExpensive must skip open-ended age ranges')
+        for descending in (False, True):
+            _check([toy.id for toy in CatalogSnapshot.selectPage(
+                       'age', descending, None, 10)] ==
+                   [toy.id for toy in Toy.selectPage(
+                       'age', descending, None, 10)],
+                   'snapshot must sort open-ended age ranges like the database')
+
+        toys[1].age = NumericRange(1, None)
+        StorageConfig.getStorage().toys.updateMany([toys[1]])
+        CatalogSnapshot.refresh()
+        _check(_fields(CatalogSnapshot.selectAllToys()[1]) ==
+               _fields(toys[1]),
+               'snapshot delta sync must save open-ended age ranges')
+    finally:
+        CatalogSnapshot.close()
+        os.remove(os.path.join(directory, 'snapshot.sqlite3'))
+        os.rmdir(directory)
+        for toy in toys:
+            toy.delete()
+
+
+def checkConformance(storage: Storage):
+    StorageConfig.setStorage(storage)
+    try:
+        checkToys()
+        checkPages()
+        checkEvents()
+        if type(storage) is PostgresStorage:
+            checkSnapshot()
+    except ConformanceError as error:
+        raise ConformanceError(f'{storage}: {error}') from None
+
+
+def seed(scale: int):
+    toys = (Toy(row['name'], row['cost'], row['quantity'],
+                row['age_restriction'])
+            for row in generateToys(scale))
+    events = (Event(row['description'], row['date_created'])
+              for row in generateEvents(scale))
+    for rows, createMany in ((toys, Toy.createMany), (events, Event.createMany)):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == SEED_BATCH_SIZE:
+                createMany(batch)
+                batch = []
+        createMany(batch)
+
+
+def runWorkload(
+    backend: str,
+    scale: int,
+    iterations: int,
+    scanIterations: int
+) -> List[Dict]:
+    randomizer = random.Random(scale)
+    state = {}
+
+    def randomId() -> int:
+        return randomizer.randint(1, scale)
+
+    def newToy(name: str = None) -> Toy:
+        return Toy(
+            name or f'Bench toy {randomizer.random()}',
+            Money.fromDecimal('99.90'),
+            5,
+            NumericRange(3, 7)
+        )
+
+    def setupSavedToy():
+        toy = newToy()
+        toy.save()
+        state['toy'] = toy
+
+    def setupExistingToy():
+        toy = Toy.selectById(randomId())
+        toy.quantity += 1
+        state['toy'] = toy
+
+    def setupToyName():
+        state['name'] = f'Bench toy {randomizer.random()}'
+        newToy(state['name']).save()
+
+    def randomDate() -> date:
+        return DEFAULT_UNTIL - timedelta(days=randomizer.randint(0, 5 * 365))
+
+    cases: List[tuple] = [
+        ('Toy.selectAllToys', Toy.selectAllToys, scanIterations, None),
+        ('Toy.selectById', lambda: Toy.selectById(randomId()),
+         iterations, None),
+        ('Toy.selectByAge', lambda: Toy.selectByAge(3, 5, 'cost'),
+         scanIterations, None),
+        ('Toy.countByAge', lambda: Toy.countByAge(3, 5), iterations, None),
+        ('Toy.selectTopByCost',
+         lambda: Toy.selectTopByCost(3, 5, Money(100_000), 10),
+         iterations, None),
+        ('Toy.selectMostExpensive',
+         lambda: Toy.selectMostExpensive(3, 5, Money(100_000)),
+         iterations, None),
+        ('Toy.selectPage',
+         lambda: Toy.selectPage('cost', True, state['toy'], 200),
+         iterations, setupExistingToy),
+        ('Toy.increaseCostForAge',
+         lambda: Toy.increaseCostForAge(11, 12, 100),
+         scanIterations, None),
+        ('Toy.save (create)', lambda: newToy().save(), iterations, None),
+        ('Toy.save (update)', lambda: state['toy'].save(),
+         iterations, setupExistingToy),
+        ('Toy.delete', lambda: state['toy'].delete(),
+         iterations, setupSavedToy),
+        ('Toy.deleteByName', lambda: Toy.deleteByName(state['name']),
+         iterations, setupToyName),
+        ('Event.selectAll', Event.selectAll, scanIterations, None),
+        ('Event.selectById', lambda: Event.selectById(randomId()),
+         iterations, None),
+        ('Event.selectByDate', lambda: Event.selectByDate(randomDate()),
+         iterations, None),
+        ('Event.save (create)',
+         lambda: Event('Bench event', date.today()).save(),
+         iterations, None),
+    ]
+
+    results = []
+    for name, func, caseIterations, setup in cases:
+        result = measure(f'{backend}: {name}', func, caseIterations, setup)
+        result['scale'] = scale
+        result['backend'] = backend
+        results.append(result)
+    return results
+
+
+@contextmanager
+def openStorage(
+    backend: str,
+    cluster: TemporaryCluster,
+    dbname: str
+) -> Iterator[Storage]:
+    if backend == 'memory':
+        yield MemoryStorage()
+    elif backend == 'sqlite':
+        storage = SQLiteStorage()
+        try:
+            yield storage
+        finally:
+            storage.close()
+    else:
+        cluster.createDatabase(dbname)
+        dBConnection = cluster.connect(dbname)
+        try:
+            DBConfig.setDBConnection(dBConnection)
+            migrate()
+            if backend == 'resident':
+                yield ResidentStorage(PostgresStorage())
+            else:
+                yield PostgresStorage()
+        finally:
+            dBConnection.close()
+
+
+def run(
+    backends: List[str],
+    scales: List[int],
+    cluster: TemporaryCluster,
+    benchmark: Callable[[str, int], List[Dict]]
+) -> List[Dict]:
+    results = []
+    for backend in backends:
+        with openStorage(backend, cluster, f'conformance_{backend}') as storage:
+            checkConformance(storage)
+        print(f'{backend}: conformance passed')
+
+        for scale in scales:
+            with openStorage(backend, cluster, f'bench_{scale}') as storage:
+                StorageConfig.setStorage(storage)
+                seed(scale)
+                results.extend(benchmark(backend, scale))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Check that every storage backend behaves the same and '
+                    'benchmark them on the same workload.')
+    parser.add_argument('--backends', default=','.join(BACKENDS),
+                        help='comma separated backends: '
+                             f'{", ".join(BACKENDS)}')
+    parser.add_argument(
+        '--scales', default=','.join(str(scale) for scale in DEFAULT_SCALES),
+        help='comma separated numbers of seeded toys and events')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--scan-iterations', type=int, default=5)
+    parser.add_argument('--conformance-only', action='store_true')
+    parser.add_argument('--output', default='bench_storage.json')
+    parser.add_argument('--compare', help='results file of a previous run')
+    parser.add_argument(
+        '--lc-monetary', default='ru_RU.UTF-8',
+        help='lc_monetary of the cluster, must match the money format '
+             'expected by Toy')
+    args = parser.parse_args()
+
+    backends = args.backends.split(',')
+    scales = [] if args.conformance_only else \
+        [int(scale) for scale in args.scales.split(',')]
+
+    def benchmark(backend: str, scale: int) -> List[Dict]:
+        return runWorkload(backend, scale, args.iterations,
+                           args.scan_iterations)
+
+    if 'postgres' in backends or 'resident' in backends:
+        with TemporaryCluster(args.lc_monetary) as cluster:
+            results = run(backends, scales, cluster, benchmark)
+    else:
+        results = run(backends, scales, None, benchmark)
+
+    if args.conformance_only:
+        return
+    writeResults(args.output, results,
+                 {'backends': backends, 'scales': scales})
+    baseline = readResults(args.compare) if args.compare else None
+    printResults(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
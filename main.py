@@ -1,18 +1,18 @@
-import sys
 import os
+import sys
 
+from PyQt6.QtCore import QObject, QEvent, QTimer
 from PyQt6.QtWidgets import QApplication
-from dotenv import load_dotenv
-from psycopg2 import connect
-from psycopg2.extras import RealDictCursor
 
 from toy_organizer.config import DBConfig
-from toy_organizer.presenters import App, MainMenuPresenter, NavMenuPresenter
+from toy_organizer.spans import SpanTracer
 from toy_organizer.views import (
     MainWindow,
+    QtDispatcher,
     QtAddEventView,
     QtAddToyView,
     QtAgeSearchView,
+    QtAnalyticsView,
     QtDeleteByNameView,
     QtEditEventView,
     QtEditToyView,
@@ -25,42 +25,263 @@ from toy_organizer.views import (
     QtCatalogView
 )
 
-if __name__ == '__main__':
-    load_dotenv()
-    app = QApplication(sys.argv)
 
-    dBConnection = connect(
-        host=os.getenv('host'),
-        port=os.getenv('port'),
-        dbname=os.getenv('dbname'),
-        user=os.getenv('user'),
-        password=os.getenv('password'),
-        cursor_factory=RealDictCursor
+class FirstPaintProbe(QObject):
+    def __init__(self, window: MainWindow, handler) -> None:
+        super().__init__(window)
+        self.handler = handler
+        window.installEventFilter(self)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Type.UpdateRequest:
+            watched.removeEventFilter(self)
+            QTimer.singleShot(0, self.handler)
+        return False
+
+
+def createViewFactory(
+    window: MainWindow,
+    mainView: QtMainView,
+    navMenuView: QtNavMenuView
+) -> ViewFactory:
+    prebuiltMainViews = [mainView]
+    prebuiltNavMenuViews = [navMenuView]
+
+    def getMainView():
+        if prebuiltMainViews:
+            return prebuiltMainViews.pop()
+        return QtMainView(window)
+
+    def getNavMenuView():
+        if prebuiltNavMenuViews:
+            return prebuiltNavMenuViews.pop()
+        return QtNavMenuView(window)
+
+    return ViewFactory(
+        lambda: QtCatalogView(window),
+        lambda: QtAddToyView(window),
+        lambda id_: QtEditToyView(window, id_),
+        getNavMenuView,
+        getMainView,
+        lambda: QtMostExpensiveToyView(window),
+        lambda: QtAgeSearchView(window),
+        lambda: QtIncreaseCostView(window),
+        lambda: QtDeleteByNameView(window),
+        lambda: QtEventCatalogView(window),
+        lambda: QtAddEventView(window),
+        lambda id_: QtEditEventView(window, id_),
+        lambda: QtAnalyticsView(window)
+    )
+
+
+def enableWriteBehind(connect=None):
+    flushInterval = float(os.getenv('write_behind_ms', '1000')) / 1000
+    if flushInterval <= 0:
+        return
+
+    from toy_organizer.config import StorageConfig
+    from toy_organizer.storage.writebehind import WriteBehindStorage
+
+    StorageConfig.setStorage(
+        WriteBehindStorage(
+            StorageConfig.getStorage(), flushInterval, connect=connect))
+
+
+def enableResidentCatalog():
+    if os.getenv('resident_catalog', '0') in ('', '0'):
+        return
+
+    from toy_organizer.config import StorageConfig
+    from toy_organizer.storage.resident import ResidentStorage
+
+    StorageConfig.setStorage(ResidentStorage(StorageConfig.getStorage()))
+
+
+def startMemoryReports(parent: QObject, interval: float):
+    import logging
+
+    from toy_organizer.memreport import MemoryReport
+
+    def logReport():
+        logging.getLogger(__name__).info(
+            'Memory report:\n%s', MemoryReport.report())
+
+    if interval > 0:
+        timer = QTimer(parent)
+        timer.timeout.connect(logReport)
+        timer.start(int(interval * 1000))
+
+
+def startApp(viewFactory: ViewFactory, dispatcher: QtDispatcher):
+    import logging
+
+    from dotenv import load_dotenv
+    from toy_organizer.cache import QueryCache
+    from toy_organizer.cancellation import QueryTask
+    from toy_organizer.changes import ChangeBus
+    from toy_organizer.config import StatementTimeouts, connectFromEnv
+    from toy_organizer.connector import DBConnector
+    from toy_organizer.memreport import MemoryReport
+    from toy_organizer.presenters import (
+        App,
+        MainMenuPresenter,
+        NavMenuPresenter
     )
+    from toy_organizer.snapshot import CatalogReader, CatalogSnapshot
+    from toy_organizer.tracing import QueryTracer
+
+    load_dotenv()
+    if QueryTracer.installFromEnv():
+        logging.basicConfig(level=logging.INFO)
+    if MemoryReport.installFromEnv():
+        logging.basicConfig(level=logging.INFO)
+        startMemoryReports(dispatcher, MemoryReport.interval())
+    StatementTimeouts.loadFromEnv()
+    if float(os.getenv('query_cache_ttl_s', '30')) > 0:
+        CatalogReader.setCache(QueryCache.fromEnv())
+    else:
+        CatalogReader.setCache(None)
+    App.setDispatcher(dispatcher.invoke)
+    ChangeBus.setScheduler(dispatcher.post)
+    DBConfig.setConnectionFactory(connectFromEnv)
+
+    sqlitePath = os.getenv('sqlite_path')
+    if sqlitePath:
+        from toy_organizer.config import StorageConfig
+        from toy_organizer.storage.sqlite import SQLiteStorage
+
+        StorageConfig.setStorage(SQLiteStorage(sqlitePath))
+        enableResidentCatalog()
+        enableWriteBehind()
+        with SpanTracer.span('App.startApp'):
+            mainMenuPresenter = MainMenuPresenter(viewFactory)
+            navMenuPresenter = NavMenuPresenter(viewFactory)
+            App.run(mainMenuPresenter, navMenuPresenter)
+            navMenuPresenter.onConnected()
+        return None
+
     try:
+        CatalogSnapshot.open()
+    except Exception:
+        logging.getLogger(__name__).exception(
+            'Failed to open the catalog snapshot')
+        CatalogSnapshot.close()
+    enableResidentCatalog()
+    enableWriteBehind(connectFromEnv)
+
+    with SpanTracer.span('App.startApp'):
+        mainMenuPresenter = MainMenuPresenter(viewFactory)
+        navMenuPresenter = NavMenuPresenter(viewFactory)
+        App.run(mainMenuPresenter, navMenuPresenter)
+
+    def publishChanges(changes):
+        for change in changes:
+            ChangeBus.publish(change)
+
+    def onRefreshFailed(error):
+        logging.getLogger(__name__).error(
+            'Failed to refresh the catalog snapshot', exc_info=error)
+
+    snapshotRefreshes = []
+
+    def refreshSnapshot():
+        if snapshotRefreshes and not snapshotRefreshes[-1].finished:
+            return
+        snapshotRefreshes[:] = [QueryTask(
+            CatalogSnapshot.sync,
+            publishChanges,
+            onRefreshFailed,
+            dispatcher.post,
+            DBConfig.dedicatedDBConnection
+        ).start()]
+
+    def onConnected(dBConnection):
         DBConfig.setDBConnection(dBConnection)
+        with SpanTracer.span('App.onConnected'):
+            mainMenuPresenter.onConnected()
+            navMenuPresenter.onConnected()
+        refreshSnapshot()
+
+    connector = DBConnector(
+        connectFromEnv,
+        dispatcher.wrap(onConnected),
+        dispatcher.wrap(mainMenuPresenter.onConnecting)
+    )
+
+    def reconnect():
+        if not CatalogReader.isOnline():
+            connector.start()
+
+    CatalogReader.setConnectionLostHandler(
+        lambda error: dispatcher.post(reconnect))
+    connector.start()
+    return connector
+
+
+def closeApp(connector):
+    if connector is not None:
+        connector.stop()
+
+    if 'toy_organizer.presenters' in sys.modules:
+        from toy_organizer.presenters import App
+        App.leavePresenter()
+
+    if 'toy_organizer.tracing' in sys.modules:
+        import logging
+
+        from toy_organizer.tracing import QueryTracer
+        if QueryTracer.stats():
+            logging.getLogger(__name__).info(
+                'Query statistics:\n%s', QueryTracer.report())
 
+    if 'toy_organizer.memreport' in sys.modules:
+        import logging
+        import tracemalloc
+
+        from toy_organizer.memreport import MemoryReport
+        if tracemalloc.is_tracing():
+            logging.getLogger(__name__).info(
+                'Memory report:\n%s', MemoryReport.report())
+
+    if 'toy_organizer.snapshot' in sys.modules:
+        from toy_organizer.snapshot import CatalogSnapshot
+        CatalogSnapshot.close()
+
+    if 'toy_organizer.storage' in sys.modules:
+        import logging
+
+        from toy_organizer.config import StorageConfig
+        try:
+            StorageConfig.getStorage().close()
+        except Exception:
+            logging.getLogger(__name__).exception(
+                'Failed to save pending changes')
+
+    DBConfig.closeDBConnection()
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+
+    with SpanTracer.span('App.firstPaint'):
         window = MainWindow()
-        viewFactory = ViewFactory(
-            lambda: QtCatalogView(window),
-            lambda: QtAddToyView(window),
-            lambda id_: QtEditToyView(window, id_),
-            lambda: QtNavMenuView(window),
-            lambda: QtMainView(window),
-            lambda: QtMostExpensiveToyView(window),
-            lambda: QtAgeSearchView(window),
-            lambda: QtIncreaseCostView(window),
-            lambda: QtDeleteByNameView(window),
-            lambda: QtEventCatalogView(window),
-            lambda: QtAddEventView(window),
-            lambda id_: QtEditEventView(window, id_)
-        )
+        mainView = QtMainView(window)
+        navMenuView = QtNavMenuView(window)
+        window.switchPage(mainView)
+        window.setNavMenu(navMenuView)
         window.show()
-        App.run(MainMenuPresenter(viewFactory), NavMenuPresenter(viewFactory))
-        exitCode = app.exec()
 
+    viewFactory = createViewFactory(window, mainView, navMenuView)
+    dispatcher = QtDispatcher()
+    connectors = []
+    FirstPaintProbe(
+        window,
+        lambda: connectors.append(startApp(viewFactory, dispatcher))
+    )
+
+    try:
+        exitCode = app.exec()
     finally:
-        if dBConnection.closed == 0:
-            dBConnection.close()
+        closeApp(connectors[0] if connectors else None)
 
     sys.exit(exitCode)
@@ -0,0 +1,243 @@
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from .config import StorageConfig
+from .models import Toy
+from .money import Money
+from .repricing import RepricingPreview
+from .storage.base import toyStockRow
+
+
+DEFAULT_BATCH_SIZE = 50_000
+
+AGE_BRACKETS = [(0, 2), (3, 5), (6, 8), (9, 12), (13, 17)]
+
+
+def repricedCents(cents: np.ndarray, multiplierAsPercentage: int) -> np.ndarray:
+    quotient, remainder = np.divmod(cents * multiplierAsPercentage, 100)
+    roundUp = (remainder > 50) | ((remainder == 50) & (quotient % 2 == 1))
+    return quotient + roundUp
+
+
+def priceEdges(costCents: np.ndarray, bins: int) -> np.ndarray:
+    if not len(costCents):
+        return np.arange(bins + 1, dtype=np.int64)
+    minimum, maximum = int(costCents.min()), int(costCents.max())
+    edges = np.rint(np.geomspace(max(minimum, 1), max(maximum, 1), bins + 1))
+    edges[0] = minimum
+    return np.unique(edges.astype(np.int64))
+
+
+class PriceDistribution:
+    def __init__(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        costCents: np.ndarray,
+        quantity: np.ndarray,
+        edges: np.ndarray
+    ) -> None:
+        self._ageLower = ageLower
+        self._ageUpper = ageUpper
+        self._count = len(costCents)
+        self._stockValue = Money(int(np.dot(costCents, quantity)))
+        self._edges = [Money(int(edge)) for edge in edges]
+        self._histogram = np.histogram(costCents, edges)[0].tolist()
+        if self._count:
+            quantiles = np.quantile(costCents, [0, 0.25, 0.5, 0.75, 1])
+            self._quantiles = [Money(int(value))
+                               for value in np.rint(quantiles)]
+        else:
+            self._quantiles = [None] * 5
+
+# region Properties
+    @property
+    def ageLower(self) -> int:
+        return self._ageLower
+
+    @property
+    def ageUpper(self) -> int:
+        return self._ageUpper
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def stockValue(self) -> Money:
+        return self._stockValue
+
+    @property
+    def minimum(self) -> Money:
+        return self._quantiles[0]
+
+    @property
+    def lowerQuartile(self) -> Money:
+        return self._quantiles[1]
+
+    @property
+    def median(self) -> Money:
+        return self._quantiles[2]
+
+    @property
+    def upperQuartile(self) -> Money:
+        return self._quantiles[3]
+
+    @property
+    def maximum(self) -> Money:
+        return self._quantiles[4]
+
+    @property
+    def edges(self) -> List[Money]:
+        return self._edges
+
+    @property
+    def histogram(self) -> List[int]:
+        return self._histogram
+# endregion
+
+    def __str__(self) -> str:
+        return (f'(age: {self._ageLower} - {self._ageUpper}, '
+                f'count: {self._count}, median: {self.median}, '
+                f'stock value: {self._stockValue})')
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class CatalogArrays:
+    def __init__(
+        self,
+        ids: np.ndarray,
+        costCents: np.ndarray,
+        quantity: np.ndarray,
+        ageLower: np.ndarray,
+        ageUpper: np.ndarray
+    ) -> None:
+        self._ids = ids
+        self._costCents = costCents
+        self._quantity = quantity
+        self._ageLower = ageLower
+        self._ageUpper = ageUpper
+
+# region Properties
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids
+
+    @property
+    def costCents(self) -> np.ndarray:
+        return self._costCents
+
+    @property
+    def quantity(self) -> np.ndarray:
+        return self._quantity
+
+    @property
+    def ageLower(self) -> np.ndarray:
+        return self._ageLower
+
+    @property
+    def ageUpper(self) -> np.ndarray:
+        return self._ageUpper
+
+    @property
+    def stockValueCents(self) -> np.ndarray:
+        return self._costCents * self._quantity
+# endregion
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __str__(self) -> str:
+        return f'(toys: {len(self)}, stock value: {self.totalStockValue()})'
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @classmethod
+    def fromRows(cls, rows: List[Tuple[int, int, int, int, int]]) -> 'CatalogArrays':
+        data = np.array(rows, dtype=np.int64).reshape(-1, 5)
+        return cls(*(np.ascontiguousarray(column) for column in data.T))
+
+    @classmethod
+    def fromToys(cls, toys: Iterable[Toy]) -> 'CatalogArrays':
+        return cls.fromRows([toyStockRow(toy) for toy in toys])
+
+    @classmethod
+    def load(cls, batchSize: int = DEFAULT_BATCH_SIZE) -> 'CatalogArrays':
+        toys = StorageConfig.getStorage().toys
+        batches = [np.array(rows, dtype=np.int64)
+                   for rows in toys.iterStockRows(batchSize)]
+        if not batches:
+            return cls.fromRows([])
+        data = np.concatenate(batches)
+        return cls(*(np.ascontiguousarray(column) for column in data.T))
+
+    def matchAge(self, ageLower: int, ageUpper: int) -> np.ndarray:
+        return (self._ageLower <= ageLower) & (self._ageUpper >= ageUpper + 1)
+
+    def totalQuantity(self) -> int:
+        return int(self._quantity.sum())
+
+    def totalStockValue(self) -> Money:
+        return Money(int(self.stockValueCents.sum()))
+
+    def averageCost(self) -> Money:
+        if not len(self):
+            return Money(0)
+        return Money(int(np.rint(self._costCents.mean())))
+
+    def stockValueByAge(self, maxAge: int = 17) -> List[Tuple[int, Money]]:
+        lower = np.clip(self._ageLower, 0, maxAge + 1)
+        upper = np.clip(self._ageUpper, 0, maxAge + 1)
+        suitable = lower < upper
+        changes = np.zeros(maxAge + 2, dtype=np.int64)
+        np.add.at(changes, lower[suitable], self.stockValueCents[suitable])
+        np.add.at(changes, upper[suitable], -self.stockValueCents[suitable])
+        return [(age, Money(int(value)))
+                for age, value in enumerate(np.cumsum(changes)[:maxAge + 1])]
+
+    def stockValueCurve(self, points: int = 10) -> List[Tuple[Money, int, Money]]:
+        if not len(self):
+            return []
+        order = np.argsort(self._costCents, kind='stable')
+        costCents = self._costCents[order]
+        cumulativeValue = np.cumsum(self.stockValueCents[order])
+        thresholds = np.unique(np.quantile(
+            costCents, np.linspace(0, 1, points + 1)[1:], method='higher'))
+        counts = np.searchsorted(costCents, thresholds, side='right')
+        return [(Money(int(threshold)), int(count),
+                 Money(int(cumulativeValue[count - 1])))
+                for threshold, count in zip(thresholds, counts)]
+
+    def priceDistribution(
+        self,
+        brackets: List[Tuple[int, int]] = AGE_BRACKETS,
+        bins: int = 10
+    ) -> List[PriceDistribution]:
+        edges = priceEdges(self._costCents, bins)
+        result = []
+        for ageLower, ageUpper in brackets:
+            mask = self.matchAge(ageLower, ageUpper)
+            result.append(PriceDistribution(
+                ageLower, ageUpper,
+                self._costCents[mask], self._quantity[mask], edges))
+        return result
+
+    def simulateRepricing(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        multiplierAsPercentage: int
+    ) -> RepricingPreview:
+        mask = self.matchAge(ageLower, ageUpper)
+        costCents = self._costCents[mask]
+        quantity = self._quantity[mask]
+        after = repricedCents(costCents, multiplierAsPercentage)
+        return RepricingPreview(
+            int(mask.sum()),
+            Money(int(np.dot(costCents, quantity))),
+            Money(int(np.dot(after, quantity)))
+        )
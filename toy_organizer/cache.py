@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from .changes import ChangeBus, ModelChange, ToysChanged
+
+
+MISSING = object()
+
+
+class WriteGeneration:
+    _value = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def current(cls) -> int:
+        return cls._value
+
+    @classmethod
+    def bump(cls) -> int:
+        with cls._lock:
+            cls._value += 1
+            return cls._value
+
+    @classmethod
+    def onToysChanged(cls, change: ModelChange):
+        cls.bump()
+
+
+ChangeBus.listen(ToysChanged, WriteGeneration.onToysChanged)
+
+
+class QueryCache:
+    def __init__(
+        self,
+        maxSize: int = 128,
+        ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if maxSize <= 0:
+            raise ValueError('Cache size must be positive')
+        self.maxSize = maxSize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: 'OrderedDict[Hashable, Tuple[int, float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+# region Properties
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+# endregion
+
+    @classmethod
+    def fromEnv(cls) -> 'QueryCache':
+        return cls(int(os.getenv('query_cache_size', '128')),
+                   float(os.getenv('query_cache_ttl_s', '30')))
+
+    def get(self, key: Hashable):
+        generation = WriteGeneration.current()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            entryGeneration, expires, value = entry
+            if entryGeneration != generation or expires <= self._clock():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def getOrLoad(self, key: Hashable, load: Callable[[], Any]):
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        generation = WriteGeneration.current()
+        with self._lock:
+            self._misses += 1
+        value = load()
+        self.put(key, value, generation)
+        return value
+
+    def put(self, key: Hashable, value, generation: int):
+        with self._lock:
+            if generation != WriteGeneration.current():
+                return
+            self._entries[key] = (generation, self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxSize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._entries),
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __str__(self) -> str:
+        return (f'(size: {len(self)}/{self.maxSize}, ttl: {self.ttl}, '
+                f'hits: {self._hits}, misses: {self._misses})')
+
+    def __repr__(self) -> str:
+        return self.__str__()
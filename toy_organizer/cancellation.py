@@ -0,0 +1,143 @@
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from typing import Any, Callable, ContextManager, Union
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+class CancellationToken:
+    _current = threading.local()
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._interrupt = None
+
+# region Properties
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+# endregion
+
+    @classmethod
+    def current(cls) -> Union['CancellationToken', None]:
+        return getattr(cls._current, 'token', None)
+
+    @contextmanager
+    def activate(self):
+        previous = CancellationToken.current()
+        CancellationToken._current.token = self
+        try:
+            yield self
+        finally:
+            CancellationToken._current.token = previous
+
+    def cancel(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            if self._interrupt is not None:
+                self._interrupt()
+
+    def raiseIfCancelled(self):
+        if self._cancelled:
+            raise OperationCancelled()
+
+    @contextmanager
+    def executing(self, interrupt: Callable[[], None]):
+        with self._lock:
+            self.raiseIfCancelled()
+            self._interrupt = interrupt
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._interrupt = None
+        self.raiseIfCancelled()
+
+    def __str__(self) -> str:
+        return f'(cancelled: {self._cancelled})'
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+def interruptible(interrupt: Callable[[], None]) -> ContextManager:
+    token = CancellationToken.current()
+    if token is None:
+        return nullcontext()
+    return token.executing(interrupt)
+
+
+def _runInline(func: Callable[[], None]):
+    func()
+
+
+class QueryTask:
+    def __init__(
+        self,
+        query: Callable[[], Any],
+        onDone: Callable[[Any], None],
+        onError: Callable[[Exception], None],
+        dispatch: Callable[[Callable[[], None]], None] = _runInline,
+        connection: Callable[[], ContextManager] = nullcontext
+    ) -> None:
+        self._query = query
+        self._onDone = onDone
+        self._onError = onError
+        self._dispatch = dispatch
+        self._connection = connection
+        self._token = CancellationToken()
+        self._finished = threading.Event()
+        self._thread = None
+
+# region Properties
+    @property
+    def cancelled(self) -> bool:
+        return self._token.cancelled
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+# endregion
+
+    def start(self) -> 'QueryTask':
+        self._thread = threading.Thread(
+            target=self._run, name='QueryTask', daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._token.cancel()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def _run(self):
+        try:
+            with self._token.activate(), self._connection():
+                self._token.raiseIfCancelled()
+                result = self._query()
+        except Exception as error:
+            if not self._token.cancelled:
+                self._dispatch(partial(self._deliver, self._onError, error))
+        else:
+            if not self._token.cancelled:
+                self._dispatch(partial(self._deliver, self._onDone, result))
+        finally:
+            self._finished.set()
+
+    def _deliver(self, handler: Callable[[Any], None], value):
+        if not self._token.cancelled:
+            handler(value)
+
+    def __str__(self) -> str:
+        return (f'(cancelled: {self.cancelled}, '
+                f'finished: {self.finished})')
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,151 @@
+import logging
+import threading
+from functools import wraps
+from typing import Callable, Dict, List, Tuple, Type, Union
+
+
+logger = logging.getLogger(__name__)
+
+
+class ModelChange:
+    def __init__(self, external: bool = False) -> None:
+        self._external = external
+        self._count = 1
+
+# region Properties
+    @property
+    def external(self) -> bool:
+        return self._external
+
+    @property
+    def count(self) -> int:
+        return self._count
+# endregion
+
+    def merge(self, other: 'ModelChange') -> 'ModelChange':
+        merged = type(self)(self._external or other._external)
+        merged._count = self._count + other._count
+        return merged
+
+    def __str__(self) -> str:
+        return (f'{type(self).__name__}(count: {self._count}, '
+                f'external: {self._external})')
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class ToysChanged(ModelChange):
+    pass
+
+
+class EventsChanged(ModelChange):
+    pass
+
+
+def _runInline(func: Callable[[], None]):
+    func()
+
+
+def _notify(handler: Callable[[ModelChange], None], change: ModelChange):
+    try:
+        handler(change)
+    except Exception:
+        logger.exception('Failed to handle %s in %r', change, handler)
+
+
+class ChangeBus:
+    _listeners: Dict[Type[ModelChange], List[Callable]] = {}
+    _subscribers: Dict[Type[ModelChange], List[Callable]] = {}
+    _pending: Dict[Tuple[Type[ModelChange], Callable], ModelChange] = {}
+    _scheduled = False
+    _schedule: Callable[[Callable[[], None]], None] = _runInline
+    _lock = threading.RLock()
+
+    @classmethod
+    def listen(cls, changeType: Type[ModelChange], handler: Callable[[ModelChange], None]):
+        with cls._lock:
+            cls._listeners.setdefault(changeType, []).append(handler)
+
+    @classmethod
+    def unlisten(cls, changeType: Type[ModelChange], handler: Callable[[ModelChange], None]):
+        with cls._lock:
+            handlers = cls._listeners.get(changeType, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+    @classmethod
+    def subscribe(cls, changeType: Type[ModelChange], handler: Callable[[ModelChange], None]):
+        with cls._lock:
+            cls._subscribers.setdefault(changeType, []).append(handler)
+
+    @classmethod
+    def unsubscribe(cls, changeType: Type[ModelChange], handler: Callable[[ModelChange], None]):
+        with cls._lock:
+            handlers = cls._subscribers.get(changeType, [])
+            if handler in handlers:
+                handlers.remove(handler)
+            cls._pending.pop((changeType, handler), None)
+
+    @classmethod
+    def setScheduler(cls, schedule: Union[Callable[[Callable[[], None]], None], None]):
+        cls._schedule = schedule or _runInline
+
+    @classmethod
+    def publish(cls, change: ModelChange):
+        with cls._lock:
+            listeners = [handler
+                         for changeType, handlers in cls._listeners.items()
+                         if isinstance(change, changeType)
+                         for handler in handlers]
+            for changeType, handlers in cls._subscribers.items():
+                if not isinstance(change, changeType):
+                    continue
+                for handler in handlers:
+                    key = (changeType, handler)
+                    pending = cls._pending.get(key)
+                    cls._pending[key] = (change if pending is None
+                                         else pending.merge(change))
+            schedule = None
+            if cls._pending and not cls._scheduled:
+                cls._scheduled = True
+                schedule = cls._schedule
+
+        for handler in listeners:
+            _notify(handler, change)
+        if schedule is not None:
+            schedule(cls.flush)
+
+    @classmethod
+    def flush(cls):
+        with cls._lock:
+            pending = cls._pending
+            cls._pending = {}
+            cls._scheduled = False
+        for (_, handler), change in pending.items():
+            _notify(handler, change)
+
+    @classmethod
+    def subscriberCount(cls) -> int:
+        with cls._lock:
+            return sum(len(handlers) for handlers in cls._subscribers.values())
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._listeners = {}
+            cls._subscribers = {}
+            cls._pending = {}
+            cls._scheduled = False
+
+
+def publishes(changeType: Type[ModelChange]):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                ChangeBus.publish(changeType())
+        return wrapper
+    return decorator
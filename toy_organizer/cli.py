@@ -0,0 +1,304 @@
+import argparse
+import csv
+import json
+import sys
+from datetime import date
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, TextIO
+
+from psycopg2.extras import NumericRange
+
+from .config import DBConfig, StorageConfig, connectFromEnv
+from .models import Event, Toy
+from .money import Money
+from .repricing import BulkRepricer
+from .storage.sqlite import SQLiteStorage
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+TOY_FIELDS = ['id', 'name', 'cost', 'quantity', 'age_lower', 'age_upper']
+EVENT_FIELDS = ['id', 'description', 'date_created']
+
+
+def toyToRecord(toy: Toy) -> Dict:
+    return {
+        'id': toy.id,
+        'name': toy.name,
+        'cost': str(toy.cost),
+        'quantity': toy.quantity,
+        'age_lower': toy.age.lower,
+        'age_upper': toy.age.upper - 1,
+    }
+
+
+def toyFromRecord(record: Dict) -> Toy:
+    return Toy(
+        record['name'],
+        Money.fromDecimal(str(record['cost'])),
+        int(record['quantity']),
+        NumericRange(int(record['age_lower']), int(record['age_upper']) + 1)
+    )
+
+
+def eventToRecord(event: Event) -> Dict:
+    return {
+        'id': event.id,
+        'description': event.description,
+        'date_created': event.dateCreated.isoformat(),
+    }
+
+
+def eventFromRecord(record: Dict) -> Event:
+    return Event(
+        record['description'],
+        date.fromisoformat(record['date_created'])
+    )
+
+
+def readRecords(input: TextIO, format: str) -> Iterator[Dict]:
+    if format == 'csv':
+        yield from csv.DictReader(input)
+        return
+    for line in input:
+        if line.strip():
+            yield json.loads(line)
+
+
+def writeRecords(
+    records: Iterable[Dict],
+    fields: List[str],
+    output: TextIO,
+    format: str
+) -> int:
+    count = 0
+    if format == 'csv':
+        writer = csv.DictWriter(output, fields, lineterminator='\n')
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    else:
+        for record in records:
+            output.write(json.dumps(record, ensure_ascii=False))
+            output.write('\n')
+            count += 1
+    output.flush()
+    return count
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _listToys(args) -> Iterable[Dict]:
+    if args.age_lower is not None or args.age_upper is not None:
+        toys = Toy.selectByAge(args.age_lower or 0, args.age_upper or 0,
+                               args.order_by)
+    else:
+        toys = Toy.iterAll()
+    return (toyToRecord(toy) for toy in toys)
+
+
+def _mostExpensiveToy(args) -> Iterable[Dict]:
+    toy = Toy.selectMostExpensive(
+        args.age_lower, args.age_upper, Money.fromDecimal(args.max_cost))
+    return [] if toy is None else [toyToRecord(toy)]
+
+
+def _addToys(args) -> Iterable[Dict]:
+    for batch in batched(readRecords(args.input, args.format), args.batch_size):
+        for toy in Toy.createMany(toyFromRecord(record) for record in batch):
+            yield toyToRecord(toy)
+
+
+def _importToys(args) -> Iterable[Dict]:
+    from .importer import REJECTED_FIELDS, ToyImporter
+
+    rejected = csv.DictWriter(args.rejected or sys.stderr, REJECTED_FIELDS,
+                              lineterminator='\n')
+    rejected.writeheader()
+    importer = ToyImporter(args.workers, args.chunk_size)
+    try:
+        importer.run(args.input, rejected.writerow)
+    finally:
+        if args.rejected is not None:
+            args.rejected.close()
+    return [{'read': importer.read, 'imported': importer.imported,
+             'rejected': importer.rejected}]
+
+
+def _deleteToysByName(args) -> Iterable[Dict]:
+    if args.names:
+        names = iter(args.names)
+    else:
+        names = (record['name']
+                 for record in readRecords(args.input, args.format))
+    for batch in batched(names, args.batch_size):
+        yield {'names': len(batch), 'deleted': Toy.deleteByNames(batch)}
+
+
+def _increaseCost(args) -> Iterable[Dict]:
+    if args.sqlite is not None:
+        Toy.increaseCostForAge(args.age_lower, args.age_upper, args.percent)
+        return []
+    job = BulkRepricer(args.batch_size).apply(
+        args.age_lower, args.age_upper, args.percent)
+    return [{'job_id': job.id, 'total': job.total, 'processed': job.processed}]
+
+
+def _listEvents(args) -> Iterable[Dict]:
+    if args.date is not None:
+        events = Event.selectByDate(args.date)
+    elif args.since is not None:
+        events = Event.selectSince(args.since)
+    else:
+        events = Event.selectAll()
+    return (eventToRecord(event) for event in events)
+
+
+def _addEvents(args) -> Iterable[Dict]:
+    for batch in batched(readRecords(args.input, args.format), args.batch_size):
+        for event in Event.createMany(eventFromRecord(record) for record in batch):
+            yield eventToRecord(event)
+
+
+def _export(args) -> Iterable[Dict]:
+    from .export import exportParquet
+
+    rows = exportParquet(args.export_table, args.output, args.batch_size)
+    return [{'table': args.export_table, 'rows': rows, 'output': args.output}]
+
+
+def _addFormatArguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+
+
+def _addInputArguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--input', type=argparse.FileType('r', encoding='utf-8'),
+                        default=sys.stdin,
+                        help='records to read (stdin by default)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='records written per transaction')
+
+
+def _addAgeArguments(parser: argparse.ArgumentParser, required: bool):
+    parser.add_argument('--age-lower', type=int, required=required)
+    parser.add_argument('--age-upper', type=int, required=required)
+
+
+def createParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m toy_organizer',
+        description='Batch operations on the toy catalog and events. '
+                    'Records are read and written as JSON lines or CSV.')
+    parser.add_argument('--sqlite', metavar='FILE',
+                        help='use a SQLite database file instead of '
+                             'PostgreSQL')
+    tables = parser.add_subparsers(dest='table', required=True)
+
+    toys = tables.add_parser('toys').add_subparsers(
+        dest='command', required=True)
+
+    command = toys.add_parser('list', help='print toys')
+    _addAgeArguments(command, False)
+    command.add_argument('--order-by', choices=['cost', 'name', 'quantity'])
+    _addFormatArguments(command)
+    command.set_defaults(handler=_listToys, fields=TOY_FIELDS)
+
+    command = toys.add_parser('most-expensive',
+                              help='print the most expensive toy for an age')
+    _addAgeArguments(command, True)
+    command.add_argument('--max-cost', required=True)
+    _addFormatArguments(command)
+    command.set_defaults(handler=_mostExpensiveToy, fields=TOY_FIELDS)
+
+    command = toys.add_parser('add', help='add toys and print them with ids')
+    _addFormatArguments(command)
+    _addInputArguments(command)
+    command.set_defaults(handler=_addToys, fields=TOY_FIELDS)
+
+    command = toys.add_parser(
+        'import', help='validate a supplier CSV file and copy valid toys')
+    command.add_argument('--input',
+                         type=argparse.FileType('r', encoding='utf-8-sig'),
+                         default=sys.stdin,
+                         help='CSV with name, cost, quantity, age_lower and '
+                              'age_upper columns (stdin by default)')
+    command.add_argument('--rejected', metavar='FILE',
+                         type=argparse.FileType('w', encoding='utf-8'),
+                         help='CSV of rejected rows with reasons '
+                              '(stderr by default)')
+    command.add_argument('--workers', type=int,
+                         help='validating processes (all cores by default)')
+    command.add_argument('--chunk-size', type=int, default=5000,
+                         help='rows validated per task')
+    _addFormatArguments(command)
+    command.set_defaults(handler=_importToys,
+                         fields=['read', 'imported', 'rejected'])
+
+    command = toys.add_parser('delete-by-name',
+                              help='delete toys by name (arguments or input)')
+    command.add_argument('names', nargs='*')
+    _addFormatArguments(command)
+    _addInputArguments(command)
+    command.set_defaults(handler=_deleteToysByName,
+                         fields=['names', 'deleted'])
+
+    command = toys.add_parser('increase-cost',
+                              help='increase cost of toys for an age')
+    _addAgeArguments(command, True)
+    command.add_argument('--percent', type=int, required=True)
+    command.add_argument('--batch-size', type=int, default=500,
+                         help='toys repriced per transaction')
+    _addFormatArguments(command)
+    command.set_defaults(handler=_increaseCost,
+                         fields=['job_id', 'total', 'processed'])
+
+    events = tables.add_parser('events').add_subparsers(
+        dest='command', required=True)
+
+    command = events.add_parser('list', help='print events')
+    dates = command.add_mutually_exclusive_group()
+    dates.add_argument('--date', type=date.fromisoformat)
+    dates.add_argument('--since', type=date.fromisoformat)
+    _addFormatArguments(command)
+    command.set_defaults(handler=_listEvents, fields=EVENT_FIELDS)
+
+    command = events.add_parser('add', help='add events and print them with ids')
+    _addFormatArguments(command)
+    _addInputArguments(command)
+    command.set_defaults(handler=_addEvents, fields=EVENT_FIELDS)
+
+    command = tables.add_parser(
+        'export', help='write a table to a Parquet file')
+    command.add_argument('export_table', metavar='table',
+                         choices=['toys', 'events', 'price_history'])
+    command.add_argument('--output', required=True, metavar='FILE')
+    command.add_argument('--batch-size', type=int, default=50_000,
+                         help='rows fetched and written per record batch')
+    _addFormatArguments(command)
+    command.set_defaults(handler=_export, fields=['table', 'rows', 'output'])
+
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = createParser().parse_args(argv)
+
+    if args.sqlite is not None:
+        StorageConfig.setStorage(SQLiteStorage(args.sqlite))
+    else:
+        DBConfig.setDBConnection(connectFromEnv())
+    try:
+        writeRecords(args.handler(args), args.fields, sys.stdout, args.format)
+    except BrokenPipeError:
+        return 1
+    finally:
+        StorageConfig.getStorage().close()
+    return 0
@@ -1,13 +1,31 @@
+import logging
 import os
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Union
 
-from psycopg2.extensions import connection
+if TYPE_CHECKING:
+    from psycopg2.extensions import connection
+
+    from .storage import Storage
+
+
+logger = logging.getLogger(__name__)
 
 
 class DBConfig:
     _dBConnection = None
+    _cursorFactory = None
+    _local = threading.local()
+    _connect: Union[Callable[[], 'connection'], None] = None
+    _idleConnections: List['connection'] = []
+    _idleLock = threading.Lock()
 
     @classmethod
-    def getDBConnection(cls) -> connection:
+    def getDBConnection(cls) -> 'connection':
+        dBConnection = getattr(cls._local, 'dBConnection', None)
+        if dBConnection is not None:
+            return dBConnection
         if cls._dBConnection is None:
             raise ValueError(
                 'DB connection is not specified. '
@@ -15,9 +33,165 @@ class DBConfig:
         return cls._dBConnection
 
     @classmethod
-    def setDBConnection(cls, dBConnection: connection):
+    def hasDBConnection(cls) -> bool:
+        return cls._dBConnection is not None
+
+    @classmethod
+    def setDBConnection(cls, dBConnection: 'connection'):
         cls._dBConnection = dBConnection
+        if dBConnection is not None:
+            cls.prepareDBConnection(dBConnection)
+
+    @classmethod
+    def prepareDBConnection(cls, dBConnection: 'connection'):
+        from .money import registerMoneyType
+        registerMoneyType(dBConnection)
+        if cls._cursorFactory is not None:
+            dBConnection.cursor_factory = cls._cursorFactory
+
+    @classmethod
+    @contextmanager
+    def useDBConnection(cls, dBConnection: 'connection') -> Iterator[None]:
+        previous = getattr(cls._local, 'dBConnection', None)
+        cls._local.dBConnection = dBConnection
+        try:
+            yield
+        finally:
+            cls._local.dBConnection = previous
+
+    @classmethod
+    def setConnectionFactory(cls, connect: Union[Callable[[], 'connection'], None]):
+        cls._connect = connect
+
+    @classmethod
+    @contextmanager
+    def dedicatedDBConnection(cls) -> Iterator[None]:
+        dBConnection = cls._acquireDBConnection()
+        if dBConnection is None:
+            yield
+            return
+        try:
+            with cls.useDBConnection(dBConnection):
+                yield
+        finally:
+            cls._releaseDBConnection(dBConnection)
+
+    @classmethod
+    def _acquireDBConnection(cls) -> Union['connection', None]:
+        if (cls._connect is None or cls._dBConnection is None
+                or cls._dBConnection.closed != 0):
+            return None
+        with cls._idleLock:
+            while cls._idleConnections:
+                dBConnection = cls._idleConnections.pop()
+                if dBConnection.closed == 0:
+                    return dBConnection
+        try:
+            dBConnection = cls._connect()
+        except Exception:
+            logger.warning('Failed to open a dedicated connection, '
+                           'using the shared one', exc_info=True)
+            return None
+        cls.prepareDBConnection(dBConnection)
+        return dBConnection
+
+    @classmethod
+    def _releaseDBConnection(cls, dBConnection: 'connection'):
+        from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+        if dBConnection.closed != 0:
+            return
+        try:
+            if dBConnection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                dBConnection.rollback()
+        except Exception:
+            dBConnection.close()
+            return
+        with cls._idleLock:
+            cls._idleConnections.append(dBConnection)
+
+    @classmethod
+    def closeDBConnection(cls):
+        with cls._idleLock:
+            idleConnections, cls._idleConnections = cls._idleConnections, []
+        for dBConnection in idleConnections:
+            if dBConnection.closed == 0:
+                dBConnection.close()
+        if cls._dBConnection is not None and cls._dBConnection.closed == 0:
+            cls._dBConnection.close()
+
+    @classmethod
+    def setCursorFactory(cls, cursorFactory):
+        cls._cursorFactory = cursorFactory
+        if cls._dBConnection is not None:
+            cls._dBConnection.cursor_factory = cursorFactory
+
+
+class StorageConfig:
+    _storage = None
+
+    @classmethod
+    def getStorage(cls) -> 'Storage':
+        if cls._storage is None:
+            from .storage.postgres import PostgresStorage
+            cls._storage = PostgresStorage()
+        return cls._storage
+
+    @classmethod
+    def setStorage(cls, storage: 'Storage'):
+        cls._storage = storage
+
+
+class StatementTimeouts:
+    _default: Union[int, None] = None
+    _timeouts: Dict[str, int] = {}
+
+    @classmethod
+    def get(cls, operation: str) -> Union[int, None]:
+        return cls._timeouts.get(operation, cls._default)
+
+    @classmethod
+    def set(cls, operation: str, milliseconds: Union[int, None]):
+        if milliseconds is None:
+            cls._timeouts.pop(operation, None)
+        else:
+            cls._timeouts[operation] = milliseconds
+
+    @classmethod
+    def setDefault(cls, milliseconds: Union[int, None]):
+        cls._default = milliseconds
+
+    @classmethod
+    def loadFromEnv(cls):
+        default = os.getenv('statement_timeout_ms')
+        if default:
+            cls.setDefault(int(default))
+        for item in os.getenv('statement_timeouts', '').split(','):
+            if not item.strip():
+                continue
+            operation, _, milliseconds = item.partition(':')
+            cls.set(operation.strip(), int(milliseconds))
+
+
+def connectFromEnv() -> 'connection':
+    from dotenv import load_dotenv
+    from psycopg2 import connect
+    from psycopg2.extras import RealDictCursor
+
+    load_dotenv()
+    return connect(
+        host=os.getenv('host'),
+        port=os.getenv('port'),
+        dbname=os.getenv('dbname'),
+        user=os.getenv('user'),
+        password=os.getenv('password'),
+        connect_timeout=os.getenv('connect_timeout', '10'),
+        cursor_factory=RealDictCursor
+    )
 
 
 STYLES_PATH = os.path.join(os.path.dirname(
     os.path.realpath(__file__)), 'styles')
+
+SQL_PATH = os.path.join(os.path.dirname(
+    os.path.realpath(__file__)), 'sql')
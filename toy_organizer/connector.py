@@ -0,0 +1,71 @@
+import logging
+import random
+import threading
+from typing import Callable, Union
+
+from psycopg2 import OperationalError
+
+
+logger = logging.getLogger(__name__)
+
+
+class DBConnector:
+    def __init__(
+        self,
+        connect: Callable,
+        onConnected: Callable,
+        onRetry: Union[Callable[[int, float, Exception], None], None] = None,
+        initialDelay: float = 0.5,
+        maxDelay: float = 30.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.2
+    ) -> None:
+        self._connect = connect
+        self._onConnected = onConnected
+        self._onRetry = onRetry
+        self.initialDelay = initialDelay
+        self.maxDelay = maxDelay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def isRunning(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.isRunning():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='DBConnector', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def nextDelay(self, attempt: int) -> float:
+        delay = min(self.initialDelay * self.multiplier ** (attempt - 1),
+                    self.maxDelay)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _run(self):
+        attempt = 0
+        while not self._stopped.is_set():
+            attempt += 1
+            try:
+                dBConnection = self._connect()
+            except Exception as error:
+                if not isinstance(error, OperationalError):
+                    logger.exception('Failed to connect to the database')
+                delay = self.nextDelay(attempt)
+                if self._onRetry is not None:
+                    self._onRetry(attempt, delay, error)
+                self._stopped.wait(delay)
+                continue
+
+            if self._stopped.is_set():
+                dBConnection.close()
+            else:
+                self._onConnected(dBConnection)
+            return
@@ -0,0 +1,240 @@
+import argparse
+import csv
+import io
+import math
+import random
+import re
+import sys
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, TextIO
+
+from psycopg2.extras import NumericRange
+
+from .config import DBConfig, connectFromEnv
+from .money import Money
+
+
+DEFAULT_SEED = 42
+DEFAULT_UNTIL = date(2024, 12, 31)
+
+TOY_COLUMNS = ['name', 'cost', 'quantity', 'age_restriction']
+EVENT_COLUMNS = ['description', 'date_created']
+
+_ADJECTIVES = [
+    'Плюшевый', 'Деревянный', 'Мягкий', 'Большой', 'Маленький', 'Поющий',
+    'Радиоуправляемый', 'Музыкальный', 'Развивающий', 'Светящийся',
+    'Пластиковый', 'Интерактивный', 'Магнитный', 'Надувной', 'Заводной',
+]
+_NOUNS = [
+    'мишка', 'конструктор', 'паровозик', 'пазл', 'мяч', 'кубик', 'робот',
+    'самолёт', 'динозавр', 'зайчик', 'грузовик', 'телефон', 'домик',
+    'набор', 'вертолёт', 'кораблик', 'котёнок', 'щенок', 'поезд', 'пирамидка',
+]
+_EVENT_TEMPLATES = [
+    'Поставка: {noun}',
+    'Инвентаризация склада',
+    'Акция на {noun}',
+    'Заказать {noun} у поставщика',
+    'Переоценка товаров',
+    'Возврат: {noun}',
+]
+_AGE_LOWERS = [0, 1, 2, 3, 4, 5, 6, 7, 8, 10, 12, 14]
+_AGE_LOWER_WEIGHTS = [4, 6, 8, 10, 9, 8, 7, 5, 4, 3, 2, 1]
+_AGE_SPANS = [1, 2, 3, 4, 5, 6, 8, 10, 12]
+_AGE_SPAN_WEIGHTS = [3, 6, 8, 8, 6, 4, 3, 2, 1]
+_PRICE_ENDINGS = [0, 90, 99]
+
+
+def _zipfWeights(count: int, exponent: float = 1.1) -> List[float]:
+    return list(accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+_ADJECTIVE_WEIGHTS = _zipfWeights(len(_ADJECTIVES))
+_NOUN_WEIGHTS = _zipfWeights(len(_NOUNS))
+
+
+def _name(randomizer: random.Random) -> str:
+    adjective = randomizer.choices(
+        _ADJECTIVES, cum_weights=_ADJECTIVE_WEIGHTS)[0]
+    noun = randomizer.choices(_NOUNS, cum_weights=_NOUN_WEIGHTS)[0]
+    return f'{adjective} {noun}'
+
+
+def _cost(randomizer: random.Random) -> Money:
+    rubles = min(max(int(randomizer.lognormvariate(math.log(800), 0.9)), 29),
+                 50_000)
+    return Money(rubles * 100 + randomizer.choice(_PRICE_ENDINGS))
+
+
+def _quantity(randomizer: random.Random) -> int:
+    if randomizer.random() < 0.05:
+        return 0
+    return 1 + int(randomizer.expovariate(1 / 20))
+
+
+def _age(randomizer: random.Random) -> NumericRange:
+    lower = randomizer.choices(_AGE_LOWERS, _AGE_LOWER_WEIGHTS)[0]
+    span = randomizer.choices(_AGE_SPANS, _AGE_SPAN_WEIGHTS)[0]
+    return NumericRange(lower, lower + span + 1)
+
+
+def generateToys(count: int, seed: int = DEFAULT_SEED) -> Iterator[Dict]:
+    randomizer = random.Random(f'toys:{seed}')
+    for _ in range(count):
+        yield {
+            'name': _name(randomizer),
+            'cost': _cost(randomizer),
+            'quantity': _quantity(randomizer),
+            'age_restriction': _age(randomizer),
+        }
+
+
+def generateEvents(
+    count: int,
+    seed: int = DEFAULT_SEED,
+    years: int = 5,
+    until: date = DEFAULT_UNTIL
+) -> Iterator[Dict]:
+    randomizer = random.Random(f'events:{seed}')
+    days = years * 365
+    for _ in range(count):
+        template = randomizer.choice(_EVENT_TEMPLATES)
+        noun = randomizer.choices(_NOUNS, cum_weights=_NOUN_WEIGHTS)[0]
+        yield {
+            'description': template.format(noun=noun),
+            'date_created': until - timedelta(days=randomizer.randint(0, days)),
+        }
+
+
+def _formatAge(age: NumericRange) -> str:
+    return f'[{age.lower},{age.upper})'
+
+
+def _formatRow(row: Dict, columns: List[str], decimalPoint: str) -> List:
+    result = []
+    for column in columns:
+        value = row[column]
+        if isinstance(value, NumericRange):
+            value = _formatAge(value)
+        elif isinstance(value, Money):
+            value = str(value).replace('.', decimalPoint)
+        result.append(value)
+    return result
+
+
+class _CsvStream(io.RawIOBase):
+    def __init__(
+        self,
+        rows: Iterable[Dict],
+        columns: List[str],
+        decimalPoint: str = '.'
+    ) -> None:
+        super().__init__()
+        self._rows = iter(rows)
+        self._columns = columns
+        self._decimalPoint = decimalPoint
+        self._text = io.StringIO()
+        self._writer = csv.writer(self._text, lineterminator='\n')
+        self._buffer = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            lines = self._nextLines(1000)
+            if not lines:
+                break
+            self._buffer += lines
+        if size < 0:
+            size = len(self._buffer)
+        result, self._buffer = self._buffer[:size], self._buffer[size:]
+        return result
+
+    def _nextLines(self, count: int) -> bytes:
+        self._text.seek(0)
+        self._text.truncate()
+        for _, row in zip(range(count), self._rows):
+            self._writer.writerow(
+                _formatRow(row, self._columns, self._decimalPoint))
+        return self._text.getvalue().encode('utf-8')
+
+
+def writeCsv(rows: Iterable[Dict], columns: List[str], output: TextIO):
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(_formatRow(row, columns, '.'))
+
+
+def _moneyDecimalPoint(cursor) -> str:
+    cursor.execute('SELECT 0.5::numeric::money::text AS sample;')
+    match = re.search(r'0(\D)5', cursor.fetchone()['sample'])
+    return match.group(1) if match else '.'
+
+
+def copyRows(table: str, rows: Iterable[Dict], columns: List[str]):
+    dBConnection = DBConfig.getDBConnection()
+
+    with dBConnection.cursor() as cursor:
+        stream = _CsvStream(rows, columns, _moneyDecimalPoint(cursor))
+        cursor.copy_expert(
+            f'COPY {table}({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)',
+            stream
+        )
+    dBConnection.commit()
+
+
+def copyToys(count: int, seed: int = DEFAULT_SEED):
+    copyRows('toys', generateToys(count, seed), TOY_COLUMNS)
+
+
+def copyEvents(
+    count: int,
+    seed: int = DEFAULT_SEED,
+    years: int = 5,
+    until: date = DEFAULT_UNTIL
+):
+    copyRows('events', generateEvents(count, seed, years, until), EVENT_COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate deterministic synthetic toys and events.')
+    parser.add_argument('table', choices=['toys', 'events'])
+    parser.add_argument('--count', type=int, required=True)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--years', type=int, default=5,
+                        help='time span of generated events')
+    parser.add_argument('--until', type=date.fromisoformat,
+                        default=DEFAULT_UNTIL,
+                        help='date of the latest generated event')
+    parser.add_argument('--csv', metavar='FILE',
+                        help='write CSV to FILE ("-" for stdout) '
+                             'instead of copying into the database')
+    args = parser.parse_args()
+
+    if args.table == 'toys':
+        rows = generateToys(args.count, args.seed)
+        columns = TOY_COLUMNS
+    else:
+        rows = generateEvents(args.count, args.seed, args.years, args.until)
+        columns = EVENT_COLUMNS
+
+    if args.csv == '-':
+        writeCsv(rows, columns, sys.stdout)
+    elif args.csv is not None:
+        with open(args.csv, 'w', encoding='utf-8', newline='') as output:
+            writeCsv(rows, columns, output)
+    else:
+        dBConnection = connectFromEnv()
+        try:
+            DBConfig.setDBConnection(dBConnection)
+            copyRows(args.table, rows, columns)
+        finally:
+            dBConnection.close()
+
+
+if __name__ == '__main__':
+    main()
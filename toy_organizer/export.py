@@ -0,0 +1,102 @@
+from typing import Dict, Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from psycopg2.extensions import cursor as PlainCursor
+
+from .config import DBConfig
+
+
+DEFAULT_BATCH_SIZE = 50_000
+
+MONEY = pa.decimal128(14, 2)
+
+SCHEMAS: Dict[str, pa.Schema] = {
+    'toys': pa.schema([
+        pa.field('id', pa.int32(), nullable=False),
+        pa.field('name', pa.string(), nullable=False),
+        pa.field('cost', MONEY),
+        pa.field('quantity', pa.int32()),
+        pa.field('age_lower', pa.int32()),
+        pa.field('age_upper', pa.int32()),
+    ]),
+    'events': pa.schema([
+        pa.field('id', pa.int32(), nullable=False),
+        pa.field('description', pa.string(), nullable=False),
+        pa.field('date_created', pa.date32(), nullable=False),
+    ]),
+    'price_history': pa.schema([
+        pa.field('toy_id', pa.int32(), nullable=False),
+        pa.field('old_cost', MONEY),
+        pa.field('new_cost', MONEY),
+        pa.field('changed_at', pa.timestamp('us', tz='UTC'), nullable=False),
+    ]),
+}
+
+_QUERIES = {
+    'toys': 'SELECT id, name, cost::numeric::text, quantity, '
+            'lower(age_restriction), upper(age_restriction) - 1 '
+            'FROM toys ORDER BY id',
+    'events': 'SELECT id, description, date_created - DATE \'1970-01-01\' '
+              'FROM events ORDER BY id',
+    'price_history': 'SELECT toy_id, old_cost::numeric::text, '
+                     'new_cost::numeric::text, '
+                     '(extract(epoch FROM changed_at) * 1000000)::bigint '
+                     'FROM toy_price_history ORDER BY changed_at',
+}
+
+_WIRE_TYPES = {
+    pa.decimal128(14, 2): pa.string(),
+    pa.date32(): pa.int32(),
+    pa.timestamp('us', tz='UTC'): pa.int64(),
+}
+
+
+def _column(values, type_: pa.DataType) -> pa.Array:
+    wireType = _WIRE_TYPES.get(type_)
+    if wireType is None:
+        return pa.array(values, type=type_)
+    return pa.array(values, type=wireType).cast(type_)
+
+
+def iterRecordBatches(
+    table: str,
+    batchSize: int = DEFAULT_BATCH_SIZE
+) -> Iterator[pa.RecordBatch]:
+    if table not in SCHEMAS:
+        raise ValueError(f'Unknown table: {table}')
+    schema = SCHEMAS[table]
+    dBConnection = DBConfig.getDBConnection()
+
+    try:
+        with dBConnection.cursor(
+            name=f'{table}_export',
+            cursor_factory=PlainCursor
+        ) as cursor:
+            cursor.itersize = batchSize
+            cursor.execute(_QUERIES[table])
+            while True:
+                rows = cursor.fetchmany(batchSize)
+                if not rows:
+                    break
+                yield pa.RecordBatch.from_arrays(
+                    [_column(column, field.type)
+                     for column, field in zip(zip(*rows), schema)],
+                    schema=schema
+                )
+    finally:
+        dBConnection.commit()
+
+
+def exportParquet(
+    table: str,
+    path: str,
+    batchSize: int = DEFAULT_BATCH_SIZE,
+    compression: str = 'zstd'
+) -> int:
+    rows = 0
+    with pq.ParquetWriter(path, SCHEMAS[table], compression=compression) as writer:
+        for batch in iterRecordBatches(table, batchSize):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
@@ -0,0 +1,225 @@
+import csv
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, TextIO, Tuple, Union
+
+from psycopg2.extras import NumericRange
+
+from .changes import ChangeBus, ToysChanged
+from .config import StorageConfig
+from .datagen import TOY_COLUMNS, copyRows
+from .models import Toy
+from .money import Money
+from .storage import PostgresStorage
+
+
+DEFAULT_CHUNK_SIZE = 5000
+
+IMPORT_FIELDS = ['name', 'cost', 'quantity', 'age_lower', 'age_upper']
+REJECTED_FIELDS = ['line', 'reason'] + IMPORT_FIELDS
+
+Row = Tuple[int, List[str]]
+ValidRow = Tuple[int, str, int, int, int, int]
+
+
+def normalizeName(name: str) -> str:
+    return ' '.join(name.split())
+
+
+def _rejected(line: int, values: Dict[str, str], reason: str) -> Dict:
+    record = {'line': line, 'reason': reason}
+    record.update(values)
+    return record
+
+
+def _validateRow(line: int, values: Dict[str, str]) -> Union[ValidRow, Dict]:
+    name = normalizeName(values['name'])
+    if name == '':
+        return _rejected(line, values, 'Название не должно быть пустым')
+
+    try:
+        cents = Money.parseStrict(values['cost']).cents
+    except ValueError:
+        return _rejected(line, values, f'Неверная цена: {values["cost"]!r}')
+    if cents < 0:
+        return _rejected(line, values, 'Цена не должна быть отрицательной')
+
+    try:
+        quantity = int(values['quantity'])
+        ageLower = int(values['age_lower'])
+        ageUpper = int(values['age_upper'])
+    except ValueError:
+        return _rejected(line, values,
+                         'Количество и возраст должны быть целыми числами')
+    if quantity < 0:
+        return _rejected(line, values,
+                         'Количество не должно быть отрицательным')
+    if ageLower < 0:
+        return _rejected(line, values, 'Возраст не должен быть отрицательным')
+    if ageLower >= ageUpper:
+        return _rejected(
+            line, values,
+            'Минимальный возраст должен быть меньше максимального')
+
+    return line, name, cents, quantity, ageLower, ageUpper
+
+
+def validateChunk(
+    columns: List[int],
+    rows: List[Row]
+) -> Tuple[List[ValidRow], List[Dict]]:
+    valid = []
+    rejected = []
+    for line, row in rows:
+        values = {field: row[column]
+                  for field, column in zip(IMPORT_FIELDS, columns)
+                  if column < len(row)}
+        if len(values) < len(IMPORT_FIELDS):
+            rejected.append(_rejected(line, values, 'Неверное число полей'))
+            continue
+
+        result = _validateRow(line, values)
+        if isinstance(result, dict):
+            rejected.append(result)
+        else:
+            valid.append(result)
+    return valid, rejected
+
+
+class ToyImporter:
+    def __init__(
+        self,
+        workers: Union[int, None] = None,
+        chunkSize: int = DEFAULT_CHUNK_SIZE
+    ) -> None:
+        if chunkSize <= 0:
+            raise ValueError('Chunk size must be positive')
+        self.workers = workers or os.cpu_count() or 1
+        self.chunkSize = chunkSize
+        self._read = 0
+        self._imported = 0
+        self._rejected = 0
+
+# region Properties
+    @property
+    def read(self) -> int:
+        return self._read
+
+    @property
+    def imported(self) -> int:
+        return self._imported
+
+    @property
+    def rejected(self) -> int:
+        return self._rejected
+# endregion
+
+    def run(self, input: TextIO, onRejected: Callable[[Dict], None]) -> int:
+        rows = self.validRows(input, onRejected)
+        storage = StorageConfig.getStorage()
+        try:
+            if type(storage) is PostgresStorage:
+                copyRows('toys', rows, TOY_COLUMNS)
+            else:
+                for batch in _batched(rows, self.chunkSize):
+                    Toy.createMany(Toy(row['name'], row['cost'],
+                                       row['quantity'], row['age_restriction'])
+                                   for row in batch)
+        finally:
+            ChangeBus.publish(ToysChanged())
+        return self._imported
+
+    def validRows(
+        self,
+        input: TextIO,
+        onRejected: Callable[[Dict], None]
+    ) -> Iterator[Dict]:
+        names = set()
+        for valid, rejected in self._validatedChunks(self._chunks(input)):
+            pending = deque(sorted(rejected, key=lambda record: record['line']))
+            for line, name, cents, quantity, ageLower, ageUpper in valid:
+                while pending and pending[0]['line'] < line:
+                    self._reject(pending.popleft(), onRejected)
+
+                key = name.casefold()
+                if key in names:
+                    self._reject(_rejected(
+                        line,
+                        {'name': name, 'cost': str(Money(cents)),
+                         'quantity': str(quantity),
+                         'age_lower': str(ageLower),
+                         'age_upper': str(ageUpper)},
+                        'Повторяющееся название'), onRejected)
+                    continue
+                names.add(key)
+
+                self._imported += 1
+                yield {
+                    'name': name,
+                    'cost': Money(cents),
+                    'quantity': quantity,
+                    'age_restriction': NumericRange(ageLower, ageUpper + 1),
+                }
+            while pending:
+                self._reject(pending.popleft(), onRejected)
+
+    def _reject(self, record: Dict, onRejected: Callable[[Dict], None]):
+        self._rejected += 1
+        onRejected(record)
+
+    def _chunks(self, input: TextIO) -> Iterator[Tuple[List[int], List[Row]]]:
+        reader = csv.reader(input)
+        header = [field.strip().lower() for field in next(reader, [])]
+        missing = [field for field in IMPORT_FIELDS if field not in header]
+        if missing:
+            raise ValueError(f'Missing columns: {", ".join(missing)}')
+        columns = [header.index(field) for field in IMPORT_FIELDS]
+
+        chunk = []
+        for row in reader:
+            if not row:
+                continue
+            self._read += 1
+            chunk.append((reader.line_num, row))
+            if len(chunk) == self.chunkSize:
+                yield columns, chunk
+                chunk = []
+        if chunk:
+            yield columns, chunk
+
+    def _validatedChunks(
+        self,
+        chunks: Iterable[Tuple[List[int], List[Row]]]
+    ) -> Iterator[Tuple[List[ValidRow], List[Dict]]]:
+        if self.workers == 1:
+            for columns, rows in chunks:
+                yield validateChunk(columns, rows)
+            return
+
+        with ProcessPoolExecutor(self.workers) as executor:
+            pending = deque()
+            for columns, rows in chunks:
+                pending.append(executor.submit(validateChunk, columns, rows))
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def __str__(self) -> str:
+        return (f'(workers: {self.workers}, read: {self._read}, '
+                f'imported: {self._imported}, rejected: {self._rejected})')
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
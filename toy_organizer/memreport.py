@@ -0,0 +1,91 @@
+import os
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from PyQt6 import sip
+from PyQt6.QtCore import QObject
+from PyQt6.QtWidgets import QApplication
+
+
+class MemoryReport:
+    frames = 1
+    _previousCounts: Dict[str, int] = {}
+
+    @classmethod
+    def install(cls, frames: int = 1):
+        cls.frames = frames
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    @classmethod
+    def uninstall(cls):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @classmethod
+    def installFromEnv(cls) -> bool:
+        if os.getenv('memory_report', '0') in {'', '0', 'false'}:
+            return False
+        cls.install(int(os.getenv('memory_report_frames', '1')))
+        return True
+
+    @classmethod
+    def interval(cls) -> float:
+        return float(os.getenv('memory_report_s', '300'))
+
+    @classmethod
+    def qtObjectCounts(cls) -> Dict[str, int]:
+        application = QApplication.instance()
+        if application is None:
+            return {}
+
+        counts = Counter()
+        seen = set()
+        for root in [application] + QApplication.topLevelWidgets():
+            for qObject in [root] + root.findChildren(QObject):
+                address = sip.unwrapinstance(qObject)
+                if address in seen:
+                    continue
+                seen.add(address)
+                counts[type(qObject).__name__] += 1
+        return dict(counts)
+
+    @classmethod
+    def topAllocations(cls, limit: int = 10) -> List[tracemalloc.Statistic]:
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ])
+        return snapshot.statistics('lineno')[:limit]
+
+    @classmethod
+    def tracedMemory(cls) -> Tuple[int, int]:
+        if not tracemalloc.is_tracing():
+            return 0, 0
+        return tracemalloc.get_traced_memory()
+
+    @classmethod
+    def report(cls, limit: int = 10) -> str:
+        counts = cls.qtObjectCounts()
+        previous = cls._previousCounts
+        cls._previousCounts = counts
+
+        lines = [f'Qt objects: {sum(counts.values())} '
+                 f'({sum(counts.values()) - sum(previous.values()):+d})']
+        for name, count in sorted(counts.items(),
+                                  key=lambda item: item[1], reverse=True)[:limit]:
+            lines.append(f'  {name}: {count} ({count - previous.get(name, 0):+d})')
+
+        if tracemalloc.is_tracing():
+            current, peak = cls.tracedMemory()
+            lines.append(f'Python heap: {current / 1024:.0f} KiB '
+                         f'(peak {peak / 1024:.0f} KiB)')
+            for statistic in cls.topAllocations(limit):
+                frame = statistic.traceback[0]
+                lines.append(f'  {frame.filename}:{frame.lineno}: '
+                             f'{statistic.size / 1024:.1f} KiB '
+                             f'in {statistic.count} blocks')
+        return '\n'.join(lines)
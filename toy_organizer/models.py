@@ -1,9 +1,48 @@
-from datetime import date
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import List, Union
+from typing import Generic, Iterable, Iterator, List, TypeVar, Union
 from psycopg2.extras import NumericRange
 
-from .config import DBConfig
+from .changes import EventsChanged, ToysChanged, publishes
+from .config import DBConfig, StorageConfig
+from .money import Money
+
+
+SYNC_OVERLAP = timedelta(minutes=5)
+
+TOY_SELECT_LIST = ('id, name, (cost::numeric * 100)::bigint AS cost_cents, '
+                   'quantity, age_restriction')
+
+T = TypeVar('T')
+
+
+class ChangeSet(Generic[T]):
+    def __init__(self, changed: List[T], deletedIds: List[int], watermark: datetime) -> None:
+        self._changed = changed
+        self._deletedIds = deletedIds
+        self._watermark = watermark
+
+# region Properties
+    @property
+    def changed(self) -> List[T]:
+        return self._changed
+
+    @property
+    def deletedIds(self) -> List[int]:
+        return self._deletedIds
+
+    @property
+    def watermark(self) -> datetime:
+        return self._watermark
+# endregion
+
+    def __str__(self) -> str:
+        return (f'(changed: {len(self._changed)}, '
+                f'deleted: {len(self._deletedIds)}, '
+                f'watermark: {self._watermark})')
+
+    def __repr__(self) -> str:
+        return self.__str__()
 
 
 class Event:
@@ -35,6 +74,7 @@ class Event:
         self._dateCreated = value
 # endregion
 
+    @publishes(EventsChanged)
     def save(self):
         if self._saved:
             self._update()
@@ -42,32 +82,24 @@ class Event:
             self._create()
 
     def _update(self):
-        dBConnection = DBConfig.getDBConnection()
-
-        with dBConnection.cursor() as cursor:
-            cursor.execute(
-                f'UPDATE events '
-                f'SET description = \'{self._description}\', '
-                f'date_created = \'{self._dateCreated}\' '
-                f'WHERE id = {self._id};'
-            )
-        dBConnection.commit()
+        StorageConfig.getStorage().events.update(self)
 
     def _create(self):
-        dBConnection = DBConfig.getDBConnection()
-
-        with dBConnection.cursor() as cursor:
-            cursor.execute(
-                f'INSERT INTO events(description, date_created) '
-                f'VALUES(\'{self._description}\', '
-                f'\'{self._dateCreated}\') '
-                f'RETURNING id;'
-            )
-            data = cursor.fetchone()
-            self._id = data['id']
-            self._saved = True
+        self._id = StorageConfig.getStorage().events.create(self)
+        self._saved = True
 
-        dBConnection.commit()
+    @classmethod
+    @publishes(EventsChanged)
+    def createMany(cls, events: Iterable['Event']) -> List['Event']:
+        events = [event for event in events if not event._saved]
+        if not events:
+            return []
+
+        ids = StorageConfig.getStorage().events.createMany(events)
+        for event, id_ in zip(events, ids):
+            event._id = id_
+            event._saved = True
+        return events
 
     @classmethod
     def _createFromDBData(
@@ -81,75 +113,99 @@ class Event:
         event._saved = True
         return event
 
+    @publishes(EventsChanged)
     def delete(self):
-        dBConnection = DBConfig.getDBConnection()
-
-        with dBConnection.cursor() as cursor:
-            cursor.execute(
-                f'DELETE FROM events '
-                f'WHERE id = {self._id};'
-            )
-            self._saved = False
-            self._id = -1
-        dBConnection.commit()
+        StorageConfig.getStorage().events.delete(self._id)
+        self._saved = False
+        self._id = -1
 
     @classmethod
-    def selectByDate(cls, dateCreated: date):
-        dBConnection = DBConfig.getDBConnection()
-
-        with dBConnection.cursor() as cursor:
-            query = f'SELECT * FROM events WHERE date_created = \'{dateCreated}\''
-            cursor.execute(query)
-            events = cursor.fetchall()
-            result = []
-            for event in events:
-                result.append(cls._createFromDBData(
-                    event['id'],
-                    event['description'],
-                    event['date_created']
-                ))
-        return result
+    def selectByDate(cls, dateCreated: date) -> List['Event']:
+        return StorageConfig.getStorage().events.selectByDate(dateCreated)
 
     @classmethod
-    def selectById(cls, id_: int):
-        dBConnection = DBConfig.getDBConnection()
+    def selectById(cls, id_: int) -> 'Event':
+        return StorageConfig.getStorage().events.selectById(id_)
 
-        with dBConnection.cursor() as cursor:
-            query = f'SELECT * FROM events WHERE id = {id_}'
-            cursor.execute(query)
-            eventData = cursor.fetchone()
-            if eventData is None:
-                raise ValueError('There is no event with such id')
-            event = cls._createFromDBData(
-                eventData['id'],
-                eventData['description'],
-                eventData['date_created']
-            )
+    @classmethod
+    def selectAll(cls) -> List['Event']:
+        return StorageConfig.getStorage().events.selectAll()
 
-            return event
+    @classmethod
+    def selectSince(cls, dateCreated: date) -> List['Event']:
+        return StorageConfig.getStorage().events.selectSince(dateCreated)
 
     @classmethod
-    def selectAll(cls):
+    def selectChangedSince(cls, watermark: datetime) -> ChangeSet['Event']:
         dBConnection = DBConfig.getDBConnection()
+        since = watermark - SYNC_OVERLAP
 
         with dBConnection.cursor() as cursor:
-            query = 'SELECT * FROM events '
-            cursor.execute(query)
-            events = cursor.fetchall()
-            result = []
-            for event in events:
-                result.append(cls._createFromDBData(
+            cursor.execute('SELECT now() AS now;')
+            newWatermark = cursor.fetchone()['now']
+
+            cursor.execute(
+                'SELECT * FROM events WHERE updated_at >= %s;', (since,))
+            changed = []
+            for event in cursor.fetchall():
+                changed.append(cls._createFromDBData(
                     event['id'],
                     event['description'],
                     event['date_created']
                 ))
-        return result
+
+            cursor.execute(
+                'SELECT id FROM event_tombstones WHERE deleted_at >= %s;',
+                (since,)
+            )
+            deletedIds = [data['id'] for data in cursor.fetchall()]
+        dBConnection.commit()
+        return ChangeSet(changed, deletedIds, newWatermark)
+
+
+class PriceChange:
+    def __init__(
+        self,
+        toyId: int,
+        oldCost: Union[Money, None],
+        newCost: Money,
+        changedAt: datetime
+    ) -> None:
+        self._toyId = toyId
+        self._oldCost = oldCost
+        self._newCost = newCost
+        self._changedAt = changedAt
+
+# region Properties
+    @property
+    def toyId(self) -> int:
+        return self._toyId
+
+    @property
+    def oldCost(self) -> Union[Money, None]:
+        return self._oldCost
+
+    @property
+    def newCost(self) -> Money:
+        return self._newCost
+
+    @property
+    def changedAt(self) -> datetime:
+        return self._changedAt
+# endregion
+
+    def __str__(self) -> str:
+        return (f'(toy id: {self._toyId}, old cost: {self._oldCost}, '
+                f'new cost: {self._newCost}, changed at: {self._changedAt})')
+
+    def __repr__(self) -> str:
+        return self.__str__()
 
 
 class Toy:
-    def __init__(self, name: str, cost: Decimal, quantity: int, age: NumericRange) -> None:
+    def __init__(self, name: str, cost: Union[Money, Decimal], quantity: int, age: NumericRange) -> None:
         self._name = name
-        self._cost = cost
+        self._cost = Money.of(cost)
         self._quantity = quantity
         self._age = age
         self._saved = False
@@ -168,7 +224,7 @@ class Toy:
         return self._name
 
     @property
-    def cost(self) -> Decimal:
+    def cost(self) -> Money:
         return self._cost
 
     @property
@@ -188,8 +244,8 @@ class Toy:
         self._name = value
 
     @cost.setter
-    def cost(self, value: Decimal) -> None:
-        self._cost = value
+    def cost(self, value: Union[Money, Decimal]) -> None:
+        self._cost = Money.of(value)
 
     @quantity.setter
     def quantity(self, value: int) -> None:
@@ -208,182 +264,174 @@ class Toy:
     def __repr__(self) -> str:
         return self.__str__()
 
+    @publishes(ToysChanged)
     def save(self):
         if self._saved:
             self._update()
         else:
             self._create()
 
+    @publishes(ToysChanged)
     def delete(self):
-        dBConnection = DBConfig.getDBConnection()
-
-        with dBConnection.cursor() as cursor:
-            cursor.execute(
-                f'DELETE FROM toys '
-                f'WHERE id = {self._id};'
-            )
-            self._saved = False
-            self._id = -1
-        dBConnection.commit()
+        StorageConfig.getStorage().toys.delete(self._id)
+        self._saved = False
+        self._id = -1
 
     @classmethod
+    @publishes(ToysChanged)
     def deleteByName(cls, name: str):
-        dBConnection = DBConfig.getDBConnection()
+        StorageConfig.getStorage().toys.deleteByName(name)
 
-        with dBConnection.cursor() as cursor:
-            cursor.execute(f'DELETE FROM toys WHERE name = \'{name}\'')
-
-        dBConnection.commit()
+    @classmethod
+    @publishes(ToysChanged)
+    def deleteByNames(cls, names: Iterable[str]) -> int:
+        names = list(names)
+        if not names:
+            return 0
+        return StorageConfig.getStorage().toys.deleteByNames(names)
 
     @classmethod
     def selectByAge(cls, ageLower: int, ageUpper: int, orderBy: str = None) -> List['Toy']:
-        dBConnection = DBConfig.getDBConnection()
-        with dBConnection.cursor() as cursor:
-            query = (f'SELECT * FROM toys '
-                     f'WHERE lower(age_restriction) <= {ageLower}'
-                     f'AND upper(age_restriction) >= {ageUpper + 1} ')
-            if orderBy is not None and orderBy in {'cost', 'name', 'quantity'}:
-                query += f'ORDER BY {orderBy}'
+        return StorageConfig.getStorage().toys.selectByAge(
+            ageLower, ageUpper, orderBy)
 
-            cursor.execute(query)
-
-            result = []
-            for data in cursor.fetchall():
-                result.append(cls._createFromDBData(
-                    data['id'],
-                    data['name'],
-                    data['cost'],
-                    data['quantity'],
-                    data['age_restriction']
-                ))
-        return result
+    @classmethod
+    def countByAge(cls, ageLower: int, ageUpper: int) -> int:
+        return StorageConfig.getStorage().toys.countByAge(ageLower, ageUpper)
 
     @classmethod
     def selectMostExpensive(
         cls,
         ageLower: int,
         ageUpper: int,
-        maxCost: Decimal
+        maxCost: Union[Money, Decimal]
     ) -> Union['Toy', None]:
-        dBConnection = DBConfig.getDBConnection()
+        return StorageConfig.getStorage().toys.selectMostExpensive(
+            ageLower, ageUpper, Money.of(maxCost))
 
-        with dBConnection.cursor() as cursor:
-            query = (
-                'SELECT * FROM toys '
-                f'WHERE lower(age_restriction) <= {ageLower} '
-                f'AND upper(age_restriction) >= {ageUpper + 1} '
-                f'AND cost <= {maxCost}::money '
-                'ORDER BY cost DESC '
-                'LIMIT 1'
-            )
-            cursor.execute(query)
-
-            data = cursor.fetchone()
-            if not data:
-                return None
-
-            result = cls._createFromDBData(
-                data['id'],
-                data['name'],
-                data['cost'],
-                data['quantity'],
-                data['age_restriction']
-            )
-        return result
+    @classmethod
+    def selectTopByCost(
+        cls,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Union[Money, Decimal],
+        limit: int
+    ) -> List['Toy']:
+        return StorageConfig.getStorage().toys.selectTopByCost(
+            ageLower, ageUpper, Money.of(maxCost), limit)
 
     @classmethod
-    def increaseCostForAge(cls, ageLower: int, ageUpper: int, multiplierAsPercentage: int):
-        dBConnection = DBConfig.getDBConnection()
+    def selectPage(
+        cls,
+        orderBy: str,
+        descending: bool,
+        after: Union['Toy', None],
+        limit: int
+    ) -> List['Toy']:
+        return StorageConfig.getStorage().toys.selectPage(
+            orderBy, descending, after, limit)
 
-        with dBConnection.cursor() as cursor:
-            cursor.execute(
-                'UPDATE toys '
-                f'SET cost = cost * {multiplierAsPercentage / 100}'
-                f'WHERE lower(age_restriction) <= {ageLower} '
-                f'AND upper(age_restriction) >= {ageUpper + 1}'
-            )
-        dBConnection.commit()
+    @classmethod
+    @publishes(ToysChanged)
+    def increaseCostForAge(cls, ageLower: int, ageUpper: int, multiplierAsPercentage: int):
+        StorageConfig.getStorage().toys.increaseCostForAge(
+            ageLower, ageUpper, multiplierAsPercentage)
 
     def _update(self):
-        dBConnection = DBConfig.getDBConnection()
-
-        with dBConnection.cursor() as cursor:
-            cursor.execute(
-                f'UPDATE toys '
-                f'SET name = \'{self._name}\', '
-                f'cost = {self._cost}, '
-                f'quantity = {self._quantity}, '
-                f'age_restriction = \'{self._age}\' '
-                f'WHERE id = {self._id};'
-            )
-        dBConnection.commit()
+        StorageConfig.getStorage().toys.update(self)
 
     def _create(self):
-        dBConnection = DBConfig.getDBConnection()
+        self._id = StorageConfig.getStorage().toys.create(self)
+        self._saved = True
 
-        with dBConnection.cursor() as cursor:
-            cursor.execute(
-                f'INSERT INTO toys(name, cost, quantity, age_restriction) '
-                f'VALUES(\'{self._name}\', '
-                f'{self._cost}, '
-                f'{self._quantity}, '
-                f'\'{self._age}\') '
-                f'RETURNING id;'
-            )
-            data = cursor.fetchone()
-            self._id = data['id']
-            self._saved = True
-
-        dBConnection.commit()
+    @classmethod
+    @publishes(ToysChanged)
+    def createMany(cls, toys: Iterable['Toy']) -> List['Toy']:
+        toys = [toy for toy in toys if not toy._saved]
+        if not toys:
+            return []
+
+        ids = StorageConfig.getStorage().toys.createMany(toys)
+        for toy, id_ in zip(toys, ids):
+            toy._id = id_
+            toy._saved = True
+        return toys
 
     @classmethod
     def _createFromDBData(
         cls,
         id_: int,
         name: str,
-        cost: str,
+        cost: Union[Money, str, Decimal],
         quantity: int,
         age: NumericRange
     ) -> 'Toy':
-        toy = Toy(name, Decimal(
-            cost.split()[0].replace(',', '.')), quantity, age)
+        toy = Toy(name, cost, quantity, age)
         toy._id = id_
         toy._saved = True
         return toy
 
     @classmethod
     def selectById(cls, id_) -> 'Toy':
+        return StorageConfig.getStorage().toys.selectById(id_)
+
+    @classmethod
+    def selectAllToys(cls) -> List['Toy']:
+        return StorageConfig.getStorage().toys.selectAll()
+
+    @classmethod
+    def iterAll(cls, batchSize: int = 2000) -> Iterator['Toy']:
+        return StorageConfig.getStorage().toys.iterAll(batchSize)
+
+    @classmethod
+    def priceHistory(cls, id_: int, since: datetime = None) -> List[PriceChange]:
         dBConnection = DBConfig.getDBConnection()
 
         with dBConnection.cursor() as cursor:
-            cursor.execute(f'SELECT * FROM toys WHERE id = {id_};')
-            data = cursor.fetchone()
-            if not data:
-                raise ValueError('There is no toy with specified id.')
-
-            result = cls._createFromDBData(
-                data['id'],
-                data['name'],
-                data['cost'],
-                data['quantity'],
-                data['age_restriction']
-            )
+            query = ('SELECT toy_id, old_cost, new_cost, changed_at '
+                     'FROM toy_price_history '
+                     'WHERE toy_id = %(id)s ')
+            if since is not None:
+                query += 'AND changed_at >= %(since)s '
+            query += 'ORDER BY changed_at;'
+            cursor.execute(query, {'id': id_, 'since': since})
+
+            result = []
+            for data in cursor.fetchall():
+                result.append(PriceChange(
+                    data['toy_id'],
+                    data['old_cost'],
+                    data['new_cost'],
+                    data['changed_at']
+                ))
         return result
 
     @classmethod
-    def selectAllToys(cls) -> List['Toy']:
+    def selectChangedSince(cls, watermark: datetime) -> ChangeSet['Toy']:
         dBConnection = DBConfig.getDBConnection()
+        since = watermark - SYNC_OVERLAP
 
         with dBConnection.cursor() as cursor:
-            cursor.execute('SELECT * FROM toys;')
+            cursor.execute('SELECT now() AS now;')
+            newWatermark = cursor.fetchone()['now']
 
-            result = []
+            cursor.execute(
+                f'SELECT {TOY_SELECT_LIST} FROM toys WHERE updated_at >= %s;',
+                (since,))
+            changed = []
             for data in cursor.fetchall():
-                result.append(cls._createFromDBData(
+                changed.append(cls._createFromDBData(
                     data['id'],
                     data['name'],
-                    data['cost'],
+                    Money(data['cost_cents']),
                     data['quantity'],
                     data['age_restriction']
                 ))
-        return result
+
+            cursor.execute(
+                'SELECT id FROM toy_tombstones WHERE deleted_at >= %s;',
+                (since,)
+            )
+            deletedIds = [data['id'] for data in cursor.fetchall()]
+        dBConnection.commit()
+        return ChangeSet(changed, deletedIds, newWatermark)
@@ -0,0 +1,174 @@
+import re
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import TYPE_CHECKING, Tuple, Union
+
+if TYPE_CHECKING:
+    from psycopg2.extensions import AsIs
+
+
+MONEY_OID = 790
+
+_NUMBER = re.compile(r'[0-9](?:[0-9\s.,\']*[0-9])?|[.,][0-9]{1,2}')
+_STRICT_NUMBER = re.compile(
+    r"[0-9]{1,3}(?:[\s.,'][0-9]{3})+(?:[.,][0-9]{1,2})?"
+    r'|[0-9]*(?:[.,][0-9]{1,2})?')
+_NOT_DIGITS = re.compile(r'[^0-9]')
+_SPACES = ' \t\xa0\u202f'
+_CURRENCY_PREFIXES = ('$', '€', '₽')
+_CURRENCY_SUFFIXES = ('руб.', 'руб', 'RUB', '₽', '€', '$')
+
+
+def _unwrap(text: str) -> Tuple[bool, str]:
+    number = text.strip(_SPACES)
+    negative = number[:1] == '(' and number[-1:] == ')'
+    if negative:
+        number = number[1:-1].strip(_SPACES)
+    elif number[:1] in ('-', '+'):
+        negative = number[0] == '-'
+        number = number[1:].lstrip(_SPACES)
+    for prefix in _CURRENCY_PREFIXES:
+        if number.startswith(prefix):
+            number = number[len(prefix):].lstrip(_SPACES)
+            break
+    for suffix in _CURRENCY_SUFFIXES:
+        if number.endswith(suffix):
+            number = number[:-len(suffix)].rstrip(_SPACES)
+            break
+    return negative, number
+
+
+def roundHalfEven(numerator: int, denominator: int) -> int:
+    quotient, remainder = divmod(numerator, denominator)
+    if remainder * 2 > denominator or (
+            remainder * 2 == denominator and quotient % 2 == 1):
+        quotient += 1
+    return quotient
+
+
+def increasedCents(cents: int, multiplierAsPercentage: int) -> int:
+    return roundHalfEven(cents * multiplierAsPercentage, 100)
+
+
+class Money(int):
+    __slots__ = ()
+
+    def __new__(cls, cents: int = 0) -> 'Money':
+        return super().__new__(cls, cents)
+
+# region Properties
+    @property
+    def cents(self) -> int:
+        return int(self)
+# endregion
+
+    @classmethod
+    def fromDecimal(cls, value: Union[Decimal, int, float, str]) -> 'Money':
+        if isinstance(value, float):
+            value = repr(value)
+        return cls(int(Decimal(value).scaleb(2)
+                       .to_integral_value(ROUND_HALF_EVEN)))
+
+    @classmethod
+    def parse(cls, text: str) -> 'Money':
+        negative, number = _unwrap(text)
+        if _NUMBER.fullmatch(number) is None:
+            raise ValueError(f'Invalid money value: {text!r}')
+        return cls._fromNumber(number, negative)
+
+    @classmethod
+    def parseStrict(cls, text: str) -> 'Money':
+        negative, number = _unwrap(text)
+        if not number or _STRICT_NUMBER.fullmatch(number) is None:
+            raise ValueError(f'Invalid money value: {text!r}')
+        return cls._fromNumber(number, negative)
+
+    @classmethod
+    def _fromNumber(cls, number: str, negative: bool) -> 'Money':
+        integer, fraction = number, ''
+        separator = max(number.rfind('.'), number.rfind(','))
+        if separator >= 0 and len(number) - separator <= 3:
+            integer, fraction = number[:separator], number[separator + 1:]
+        try:
+            units = int(integer or 0)
+        except ValueError:
+            units = int(_NOT_DIGITS.sub('', integer) or 0)
+        cents = units * 100 + int(fraction.ljust(2, '0'))
+        return cls(-cents if negative else cents)
+
+    @classmethod
+    def of(cls, value: Union['Money', Decimal, int, float, str, None]) -> Union['Money', None]:
+        if value is None or type(value) is Money:
+            return value
+        if isinstance(value, str):
+            return cls.parse(value)
+        return cls.fromDecimal(value)
+
+    def toDecimal(self) -> Decimal:
+        return Decimal(int(self)).scaleb(-2)
+
+    def scaled(self, multiplierAsPercentage: int) -> 'Money':
+        return Money(increasedCents(int(self), multiplierAsPercentage))
+
+    def __add__(self, other: 'Money') -> 'Money':
+        if not isinstance(other, Money):
+            raise TypeError(f'Can not add {type(other).__name__} to money')
+        return Money(int(self) + int(other))
+
+    def __radd__(self, other) -> 'Money':
+        if type(other) is int and other == 0:
+            return self
+        raise TypeError(f'Can not add money to {type(other).__name__}')
+
+    def __sub__(self, other: 'Money') -> 'Money':
+        if not isinstance(other, Money):
+            raise TypeError(f'Can not subtract {type(other).__name__} from money')
+        return Money(int(self) - int(other))
+
+    def __rsub__(self, other):
+        raise TypeError(f'Can not subtract money from {type(other).__name__}')
+
+    def __mul__(self, other: int) -> 'Money':
+        if type(other) is not int:
+            raise TypeError(f'Can not multiply money by {type(other).__name__}')
+        return Money(int(self) * other)
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> 'Money':
+        return Money(-int(self))
+
+    def __abs__(self) -> 'Money':
+        return Money(abs(int(self)))
+
+    def __format__(self, spec: str) -> str:
+        if not spec:
+            return self.__str__()
+        return format(self.toDecimal(), spec)
+
+    def __str__(self) -> str:
+        if self < 0:
+            return '-' + (-self).__str__()
+        text = '%03d' % self
+        return f'{text[:-2]}.{text[-2:]}'
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+def _castMoney(value, cursor) -> Union[Money, None]:
+    if value is None:
+        return None
+    return Money.parse(value)
+
+
+def _adaptMoney(money: Money) -> 'AsIs':
+    from psycopg2.extensions import AsIs
+
+    return AsIs(str(money))
+
+
+def registerMoneyType(dBConnection):
+    from psycopg2.extensions import new_type, register_adapter, register_type
+
+    register_adapter(Money, _adaptMoney)
+    register_type(new_type((MONEY_OID,), 'MONEY', _castMoney), dBConnection)
@@ -1,15 +1,27 @@
 from abc import ABC
+import logging
+import os
 import sys
 from datetime import date
-from typing import List
+from typing import Any, Callable, List, Tuple, Type, Union
 
+from psycopg2 import OperationalError
+from psycopg2.errors import QueryCanceled
 from psycopg2.extras import NumericRange
 
+from toy_organizer.cache import MISSING
+from toy_organizer.cancellation import QueryTask
+from toy_organizer.changes import ChangeBus, EventsChanged, ModelChange, ToysChanged
+from toy_organizer.config import DBConfig
 from toy_organizer.models import Toy, Event
+from toy_organizer.snapshot import CatalogReader
+from toy_organizer.spans import SpanTracer, traced
+from toy_organizer.storage.base import TOY_PAGE_COLUMNS
 from toy_organizer.views import (
     AddEventView,
     AddToyView,
     AgeSearchView,
+    AnalyticsView,
     CatalogView,
     DeleteByNameView,
     EditEventView,
@@ -24,7 +36,16 @@ from toy_organizer.views import (
 )
 
 
+CATALOG_PAGE_SIZE = 200
+
+logger = logging.getLogger(__name__)
+
+
 class App:
+    presenter: Union['Presenter', None] = None
+    navMenuPresenter: Union['NavMenuPresenter', None] = None
+    _dispatch: Union[Callable[[Callable[[], None]], None], None] = None
+
     @classmethod
     def run(cls, presenter: 'Presenter', navMenuPresenter: 'NavMenuPresenter' = None):
         cls.presenter = presenter
@@ -35,20 +56,103 @@ class App:
 
     @classmethod
     def switchPresenter(cls, presenter: 'Presenter'):
+        if cls.presenter is not None and cls.presenter is not presenter:
+            cls.presenter.dispose()
         cls.presenter = presenter
 
     @classmethod
     def switchNavMenuPresenter(cls, presenter):
         cls.navMenuPresenter = presenter
 
+    @classmethod
+    def leavePresenter(cls):
+        if cls.presenter is not None:
+            cls.presenter.dispose()
+
+    @classmethod
+    def setDispatcher(cls, dispatch: Callable[[Callable[[], None]], None]):
+        cls._dispatch = dispatch
+
+    @classmethod
+    def dispatch(cls, func: Callable[[], None]):
+        if cls._dispatch is None:
+            func()
+        else:
+            cls._dispatch(func)
+
 
 class Presenter(ABC):
     view: View
+    query: Union[QueryTask, None] = None
+    disposed = False
+    modelSubscriptions: Tuple[Tuple[Type[ModelChange], Callable], ...] = ()
 
     def run(self):
         App.switchPresenter(self)
         self.view.show()
 
+    def dispose(self):
+        if self.disposed:
+            return
+        self.disposed = True
+        for changeType, handler in self.modelSubscriptions:
+            ChangeBus.unsubscribe(changeType, handler)
+        self.modelSubscriptions = ()
+        self.cancelQuery()
+        self.view.dispose()
+
+    def subscribeOnModelChange(
+        self,
+        changeType: Type[ModelChange],
+        handler: Callable[[ModelChange], None]
+    ):
+        ChangeBus.subscribe(changeType, handler)
+        self.modelSubscriptions += ((changeType, handler),)
+
+    def runQuery(
+        self,
+        query: Callable[[], Any],
+        onDone: Callable[[Any], None],
+        onError: Callable[[Exception], None] = None
+    ) -> QueryTask:
+        self.cancelQuery()
+        self.query = QueryTask(
+            query,
+            onDone,
+            onError or self.onQueryError,
+            App.dispatch,
+            DBConfig.dedicatedDBConnection
+        )
+        return self.query.start()
+
+    def cancelQuery(self):
+        if self.query is not None:
+            self.query.cancel()
+            self.query = None
+
+    def onQueryError(self, error: Exception):
+        if isinstance(error, QueryCanceled):
+            self.view.showMessage(
+                'Запрос выполнялся слишком долго и был прерван. '
+                'Уточните условия поиска.',
+                'Ошибка')
+        elif isinstance(error, OperationalError):
+            self.view.showMessage(
+                'Нет соединения с базой данных. '
+                'Повторите запрос после подключения.',
+                'Ошибка')
+        else:
+            logger.error('Query failed', exc_info=error)
+            self.view.showMessage('Не удалось выполнить запрос.', 'Ошибка')
+
+    def requireOnline(self) -> bool:
+        if CatalogReader.isOnline():
+            return True
+        self.view.showMessage(
+            'Нет соединения с базой данных. Доступен только просмотр.',
+            'Ошибка')
+        return False
+
 
 class NavMenuPresenter(Presenter):
     view: NavMenuView
@@ -57,6 +161,10 @@ class NavMenuPresenter(Presenter):
         self.viewFactory = viewFactory
         self.view = viewFactory.getNavMenuView()
         self.subscribeOnEvents()
+        self.view.setActionsEnabled(CatalogReader.canBrowse())
+
+    def onConnected(self):
+        self.view.setActionsEnabled(True)
 
     def subscribeOnEvents(self):
         self.view.subscribeOnCatalogAddClick(self.onCatalogAddClick)
@@ -64,9 +172,13 @@ class NavMenuPresenter(Presenter):
             self.onCatalogMostExpensiveClick)
         self.view.subscribeOnCatalogWatchClick(
             self.onCatalogWatchClick)
+        self.view.subscribeOnCatalogAnalyticsClick(
+            self.onCatalogAnalyticsClick)
         self.view.subscribeOnFileMenuCatalogClick(
             self.onFileMenuCatalogClick)
         self.view.subscribeOnFileMenuEventsClick(self.onFileMenuEventsClick)
+        self.view.subscribeOnFileMenuExportProfileClick(
+            self.onExportProfileClick)
         self.view.subscribeOnFileMenuExitClick(self.onExitClick)
         self.view.subscribeOnEventsAddClick(self.onEventsAddClick)
         self.view.subscribeOnEventsWatchClick(self.onEventsWatchClick)
@@ -74,26 +186,53 @@ class NavMenuPresenter(Presenter):
     def onExitClick(self):
         sys.exit()
 
+    def onExportProfileClick(self):
+        path = os.path.abspath(
+            os.getenv('profile_path', 'toy_organizer_profile.json'))
+        SpanTracer.exportJson(path)
+        self.view.showMessage(f'Профиль сохранён в {path}')
+
+    def open(self, presenterClass):
+        App.leavePresenter()
+        presenterClass(self.viewFactory).run()
+
+    @traced
     def onCatalogAddClick(self):
-        AddToyPresenter(self.viewFactory).run()
+        if not self.requireOnline():
+            return
+
+        self.open(AddToyPresenter)
 
+    @traced
     def onCatalogMostExpensiveClick(self):
-        MostExpensiveToyPresenter(self.viewFactory).run()
+        self.open(MostExpensiveToyPresenter)
 
+    @traced
     def onCatalogWatchClick(self):
-        CatalogPresenter(self.viewFactory).run()
+        self.open(CatalogPresenter)
+
+    @traced
+    def onCatalogAnalyticsClick(self):
+        self.open(AnalyticsPresenter)
 
+    @traced
     def onFileMenuCatalogClick(self):
-        CatalogPresenter(self.viewFactory).run()
+        self.open(CatalogPresenter)
 
+    @traced
     def onFileMenuEventsClick(self):
-        EventCatalogPresenter(self.viewFactory).run()
+        self.open(EventCatalogPresenter)
 
+    @traced
     def onEventsAddClick(self):
-        AddEventPresenter(self.viewFactory).run()
+        if not self.requireOnline():
+            return
 
+        self.open(AddEventPresenter)
+
+    @traced
     def onEventsWatchClick(self):
-        EventCatalogPresenter(self.viewFactory).run()
+        self.open(EventCatalogPresenter)
 
 
     def run(self):
@@ -107,10 +246,17 @@ class CatalogPresenter(Presenter):
     def __init__(self, viewFactory: ViewFactory) -> None:
         self.viewFactory = viewFactory
         self.view = viewFactory.getCatalogView()
+        self.orderBy = 'id'
+        self.descending = False
+        self.lastToy: Union[Toy, None] = None
+        self.exhausted = False
         self.subscribeOnEvents()
         self.setTableData()
 
     def subscribeOnEvents(self):
+        self.subscribeOnModelChange(ToysChanged, self.onToysChanged)
+        self.view.subscribeOnSortClick(self.onSortClick)
+        self.view.subscribeOnScrolledToEnd(self.onScrolledToEnd)
         self.view.subscribeOnAddButtonClick(self.onAddButtonClick)
         self.view.subscribeOnEditButtonClick(self.onEditButtonClick)
         self.view.subscribeOnDeleteButtonClick(self.onDeleteButtonClick)
@@ -122,19 +268,67 @@ class CatalogPresenter(Presenter):
         self.view.subscribeOnDeleteByNameButtonClick(
             self.onDeleteByNameButtonClick)
 
-    def setTableData(self):
+    def selectPage(self, after: Union[Toy, None]) -> List[Toy]:
+        toys = CatalogReader.selectToysPage(
+            self.orderBy, self.descending, after, CATALOG_PAGE_SIZE)
+        if toys:
+            self.lastToy = toys[-1]
+        self.exhausted = len(toys) < CATALOG_PAGE_SIZE
+        return toys
+
+    def shapeTableData(self, toys: List[Toy]) -> List[list]:
         data = []
-        toys = Toy.selectAllToys()
         for toy in toys:
-            data.append([toy.id, toy.name, toy.cost, toy.quantity,
-                        f'{toy.age.lower} - {toy.age.upper - 1}'])
+            data.append([toy.id, toy.name, toy.cost, toy.quantity, toy.age])
+        return data
+
+    @traced
+    def setTableData(self):
+        self.lastToy = None
+        with SpanTracer.span('model'):
+            toys = self.selectPage(None)
+        with SpanTracer.span('shape'):
+            data = self.shapeTableData(toys)
+        with SpanTracer.span('view'):
+            self.view.tableData = data
+
+    @traced
+    def onToysChanged(self, change: ToysChanged):
+        if self.disposed:
+            return
 
-        self.view.tableData = data
+        self.setTableData()
 
+    @traced
+    def onScrolledToEnd(self):
+        if self.exhausted or self.lastToy is None:
+            return
+
+        with SpanTracer.span('model'):
+            toys = self.selectPage(self.lastToy)
+        with SpanTracer.span('shape'):
+            data = self.shapeTableData(toys)
+        with SpanTracer.span('view'):
+            self.view.appendTableData(data)
+
+    @traced
+    def onSortClick(self, column: int, descending: bool):
+        self.orderBy = TOY_PAGE_COLUMNS[column]
+        self.descending = descending
+        self.setTableData()
+
+    @traced
     def onAddButtonClick(self):
+        if not self.requireOnline():
+            return
+
         AddToyPresenter(self.viewFactory).run()
 
+    @traced
     def onEditButtonClick(self):
+        if not self.requireOnline():
+            return
+
         if len(self.view.selectedItems) == 0:
             self.view.showMessage(
                 'Не выбран элемент для редактирования', 'Ошибка')
@@ -147,7 +341,11 @@ class CatalogPresenter(Presenter):
         EditToyPresenter(self.viewFactory, int(
             self.view.selectedItems[0][0])).run()
 
+    @traced
     def onDeleteButtonClick(self):
+        if not self.requireOnline():
+            return
+
         if len(self.view.selectedItems) == 0:
             self.view.showMessage('Не выбран элемент для удаления', 'Ошибка')
             return
@@ -157,19 +355,29 @@ class CatalogPresenter(Presenter):
             return
 
         item = self.view.selectedItems[0]
-        toy = Toy.selectById(int(item[0]))
-        toy.delete()
-        self.setTableData()
+        with SpanTracer.span('model'):
+            toy = Toy.selectById(int(item[0]))
+            toy.delete()
 
+    @traced
     def onAgeSearchButtonClick(self):
         AgeSearchPresenter(self.viewFactory).run()
 
+    @traced
     def onDeleteByNameButtonClick(self):
+        if not self.requireOnline():
+            return
+
         DeleteByNamePresenter(self.viewFactory).run()
 
+    @traced
     def onIncreaseCostButtonClick(self):
+        if not self.requireOnline():
+            return
+
         IncreaseCostPresenter(self.viewFactory).run()
 
+    @traced
     def onMostExpensiveToyButtonClick(self):
         MostExpensiveToyPresenter(self.viewFactory).run()
 
@@ -186,6 +394,7 @@ class AddToyPresenter(Presenter):
         self.view.subscribeOnAddButtonClick(self.onAddButtonClick)
         self.view.subscribeOnCancelButtonClick(self.onCancelButtonClick)
 
+    @traced
     def onAddButtonClick(self):
         if self.view.ageLower >= self.view.ageUpper:
             self.view.showMessage(
@@ -202,9 +411,11 @@ class AddToyPresenter(Presenter):
             self.view.quantity,
             NumericRange(self.view.ageLower, self.view.ageUpper + 1)
         )
-        toy.save()
+        with SpanTracer.span('model'):
+            toy.save()
         CatalogPresenter(self.viewFactory).run()
 
+    @traced
     def onCancelButtonClick(self):
         CatalogPresenter(self.viewFactory).run()
 
@@ -230,6 +441,7 @@ class EditToyPresenter(Presenter):
         self.view.ageLower = self.toy.age.lower
         self.view.ageUpper = self.toy.age.upper
 
+    @traced
     def onEditButtonClick(self):
         if self.view.ageLower >= self.view.ageUpper:
             self.view.showMessage(
@@ -244,9 +456,11 @@ class EditToyPresenter(Presenter):
         self.toy.cost = self.view.cost
         self.toy.quantity = self.view.quantity
         self.toy.age = NumericRange(self.view.ageLower, self.view.ageUpper)
-        self.toy.save()
+        with SpanTracer.span('model'):
+            self.toy.save()
         CatalogPresenter(self.viewFactory).run()
 
+    @traced
     def onCancelButtonClick(self):
         CatalogPresenter(self.viewFactory).run()
 
@@ -260,20 +474,36 @@ class MostExpensiveToyPresenter(Presenter):
         self.view.subscribeOnSearchButton(self.onSearchButtonClick)
         self.view.subscribeOnCancelButton(self.onCancelButtonClick)
 
+    @traced
     def onSearchButtonClick(self):
         self.view.hasToy = True
         ageLower = self.view.ageLower
         ageUpper = self.view.ageUpper
         maxCost = self.view.maxCost
 
-        toy = Toy.selectMostExpensive(ageLower, ageUpper, maxCost)
-        if toy is None:
-            self.view.hasToy = False
-            self.view.tableData = []
-        else:
-            self.view.tableData = [[toy.name, toy.cost]]
+        toy = CatalogReader.cachedMostExpensive(ageLower, ageUpper, maxCost)
+        if toy is not MISSING:
+            self.cancelQuery()
+            self.showSearchResult(toy)
+            return
 
+        self.runQuery(
+            lambda: CatalogReader.selectMostExpensive(
+                ageLower, ageUpper, maxCost),
+            self.showSearchResult)
+
+    @traced
+    def showSearchResult(self, toy: Union[Toy, None]):
+        with SpanTracer.span('view'):
+            if toy is None:
+                self.view.hasToy = False
+                self.view.tableData = []
+            else:
+                self.view.tableData = [[toy.name, toy.cost]]
+
+    @traced
     def onCancelButtonClick(self):
+        self.dispose()
         CatalogPresenter(self.viewFactory).run()
 
 
@@ -286,13 +516,107 @@ class IncreaseCostPresenter(Presenter):
         self.view.subscibeOnUpdateButton(self.onUpdateButtonClick)
         self.view.subscibeOnCancelButton(self.onCancelButtonClick)
 
+    @traced
     def onUpdateButtonClick(self):
         ageLower = self.view.ageLower
         ageUpper = self.view.ageUpper
         multiplier = self.view.multiplierAsPercentage
-        Toy.increaseCostForAge(ageLower, ageUpper, multiplier)
+        with SpanTracer.span('model'):
+            Toy.increaseCostForAge(ageLower, ageUpper, multiplier)
         CatalogPresenter(self.viewFactory).run()
 
+    @traced
+    def onCancelButtonClick(self):
+        CatalogPresenter(self.viewFactory).run()
+
+
+class AnalyticsPresenter(Presenter):
+    view: AnalyticsView
+
+    def __init__(self, viewFactory: ViewFactory) -> None:
+        self.viewFactory = viewFactory
+        self.view = viewFactory.getAnalyticsView()
+        self.catalog = None
+        self.view.subscribeOnSimulateButtonClick(self.onSimulateButtonClick)
+        self.view.subscribeOnCancelButtonClick(self.onCancelButtonClick)
+        self.subscribeOnModelChange(ToysChanged, self.onToysChanged)
+        self.setAnalyticsData()
+
+    @traced
+    def setAnalyticsData(self):
+        from toy_organizer.analytics import CatalogArrays
+
+        with SpanTracer.span('model'):
+            if CatalogReader.isOnline():
+                self.catalog = CatalogArrays.load()
+            else:
+                self.catalog = CatalogArrays.fromToys(
+                    CatalogReader.selectAllToys())
+        with SpanTracer.span('shape'):
+            catalog = self.catalog
+            total = catalog.totalStockValue()
+            distributions = catalog.priceDistribution()
+            distributionData = []
+            for distribution in distributions:
+                quantiles = [
+                    distribution.minimum,
+                    distribution.lowerQuartile,
+                    distribution.median,
+                    distribution.upperQuartile,
+                    distribution.maximum
+                ]
+                distributionData.append(
+                    [f'{distribution.ageLower} - {distribution.ageUpper}',
+                     distribution.count] +
+                    ['' if value is None else value for value in quantiles] +
+                    [distribution.stockValue])
+            edges = distributions[0].edges
+            histogramData = []
+            for i in range(len(edges) - 1):
+                histogramData.append(
+                    [f'{edges[i]} - {edges[i + 1]}'] +
+                    [distribution.histogram[i]
+                     for distribution in distributions])
+            curveData = []
+            for cost, count, value in catalog.stockValueCurve():
+                share = f'{value.cents / total.cents:.0%}' if total else ''
+                curveData.append([cost, count, value, share])
+        with SpanTracer.span('view'):
+            self.view.setSummary(
+                f'Игрушек: {len(catalog)}, единиц на складе: '
+                f'{catalog.totalQuantity()}, средняя цена: '
+                f'{catalog.averageCost()}, стоимость запаса: {total}')
+            self.view.setDistributionData(distributionData)
+            self.view.setHistogramData(
+                histogramData,
+                [f'{distribution.ageLower} - {distribution.ageUpper}'
+                 for distribution in distributions])
+            self.view.setStockByAgeData(
+                [list(row) for row in catalog.stockValueByAge()])
+            self.view.setStockCurveData(curveData)
+
+    @traced
+    def onToysChanged(self, change: ToysChanged):
+        if self.disposed:
+            return
+
+        self.setAnalyticsData()
+
+    @traced
+    def onSimulateButtonClick(self):
+        with SpanTracer.span('model'):
+            preview = self.catalog.simulateRepricing(
+                self.view.ageLower,
+                self.view.ageUpper,
+                self.view.multiplierAsPercentage)
+        with SpanTracer.span('view'):
+            self.view.setSimulationResult(
+                f'Затронуто игрушек: {preview.affected}. '
+                f'Стоимость запаса: {preview.totalValueBefore} → '
+                f'{preview.totalValueAfter} '
+                f'({preview.totalValueChange:+})')
+
+    @traced
     def onCancelButtonClick(self):
         CatalogPresenter(self.viewFactory).run()
 
@@ -306,19 +630,34 @@ class AgeSearchPresenter(Presenter):
         self.view.subscribeOnSearchButtonClick(self.onSearchButtonClick)
         self.view.subscribeOnCancelButtonClick(self.onCancelButtonClick)
 
+    @traced
     def onSearchButtonClick(self):
         ageLower = self.view.ageLower
         ageUpper = self.view.ageUpper
         orderBy = self.view.orderBy
 
-        toys = Toy.selectByAge(ageLower, ageUpper, orderBy)
-        data = []
-        for toy in toys:
-            data.append([toy.name, toy.cost])
+        toys = CatalogReader.cachedByAge(ageLower, ageUpper, orderBy)
+        if toys is not None:
+            self.cancelQuery()
+            self.showSearchResult(toys)
+            return
+
+        self.runQuery(
+            lambda: CatalogReader.selectByAge(ageLower, ageUpper, orderBy),
+            self.showSearchResult)
 
-        self.view.tableData = data
+    @traced
+    def showSearchResult(self, toys: List[Toy]):
+        with SpanTracer.span('shape'):
+            data = []
+            for toy in toys:
+                data.append([toy.name, toy.cost])
+        with SpanTracer.span('view'):
+            self.view.tableData = data
 
+    @traced
     def onCancelButtonClick(self):
+        self.dispose()
         CatalogPresenter(self.viewFactory).run()
 
 
@@ -331,11 +670,14 @@ class DeleteByNamePresenter(Presenter):
         self.view.subscribeOnDeleteButtonClick(self.onDeleteButtonClick)
         self.view.subscribeOnCancelButtonClick(self.onCancelButtonClick)
 
+    @traced
     def onDeleteButtonClick(self):
         name = self.view.name
-        Toy.deleteByName(name)
+        with SpanTracer.span('model'):
+            Toy.deleteByName(name)
         CatalogPresenter(self.viewFactory).run()
 
+    @traced
     def onCancelButtonClick(self):
         CatalogPresenter(self.viewFactory).run()
 
@@ -347,20 +689,67 @@ class MainMenuPresenter(Presenter):
         self.viewFactory = viewFactory
         self.view = viewFactory.getMainView()
         self.subscribeOnEvents()
-        events: List[Event] = Event.selectByDate(date.today())
-        eventsData = []
-        for event in events:
-            eventsData.append(
-                [str(event.id), event.description, str(event.dateCreated)])
-        self.view.setEventsData(eventsData)
+        if CatalogReader.isOnline():
+            self.setEventsData()
+            return
+
+        canBrowse = CatalogReader.canBrowse()
+        self.view.setConnectionState('Подключение к базе данных...', canBrowse)
+        if canBrowse:
+            self.setEventsData()
+
+    @traced
+    def setEventsData(self):
+        with SpanTracer.span('model'):
+            events: List[Event] = CatalogReader.selectEventsByDate(date.today())
+        with SpanTracer.span('shape'):
+            eventsData = []
+            for event in events:
+                eventsData.append(
+                    [str(event.id), event.description, str(event.dateCreated)])
+        with SpanTracer.span('view'):
+            self.view.setEventsData(eventsData)
+
+    def onConnecting(self, attempt: int, delay: float, error: Exception):
+        if self.disposed:
+            return
+
+        lines = str(error).strip().splitlines()
+        reason = lines[0] if lines else type(error).__name__
+        canBrowse = CatalogReader.canBrowse()
+        message = (f'Не удалось подключиться к базе данных ({reason}). '
+                   f'Попытка {attempt}, повтор через {delay:.0f} с...')
+        if canBrowse:
+            message += ' Показаны сохранённые данные, доступен только просмотр.'
+        self.view.setConnectionState(message, canBrowse)
+
+    def onConnected(self):
+        if self.disposed:
+            return
+
+        self.view.setConnectionState(None)
+        self.setEventsData()
+
+    @traced
+    def onEventsChanged(self, change: EventsChanged):
+        if self.disposed or not CatalogReader.canBrowse():
+            return
+
+        self.setEventsData()
 
     def subscribeOnEvents(self):
+        self.subscribeOnModelChange(EventsChanged, self.onEventsChanged)
         self.view.subscribeOnAddEventClick(self.onAddEventClick)
         self.view.subscribeOnCatalogClick(self.onCatalogClick)
 
+    @traced
     def onAddEventClick(self):
+        if not self.requireOnline():
+            return
+
         AddEventPresenter(self.viewFactory).run()
 
+    @traced
     def onCatalogClick(self):
         CatalogPresenter(self.viewFactory).run()
 
@@ -374,23 +763,43 @@ class EventCatalogPresenter(Presenter):
         self.subscribeOnEvents()
         self.setTableData()
 
+    @traced
     def setTableData(self):
-        events: List[Event] = Event.selectAll()
-        eventsData = []
-        for event in events:
-            eventsData.append(
-                [str(event.id), event.description, str(event.dateCreated)])
-        self.view.tableData = eventsData
+        with SpanTracer.span('model'):
+            events: List[Event] = CatalogReader.selectAllEvents()
+        with SpanTracer.span('shape'):
+            eventsData = []
+            for event in events:
+                eventsData.append(
+                    [str(event.id), event.description, str(event.dateCreated)])
+        with SpanTracer.span('view'):
+            self.view.tableData = eventsData
+
+    @traced
+    def onEventsChanged(self, change: EventsChanged):
+        if self.disposed:
+            return
+
+        self.setTableData()
 
     def subscribeOnEvents(self):
+        self.subscribeOnModelChange(EventsChanged, self.onEventsChanged)
         self.view.subscribeOnAddButtonClick(self.onAddButtonClick)
         self.view.subscribeOnDeleteButtonClick(self.onDeleteButtonClick)
         self.view.subscribeOnEditButtonClick(self.onEditButtonClick)
 
+    @traced
     def onAddButtonClick(self):
+        if not self.requireOnline():
+            return
+
         AddEventPresenter(self.viewFactory).run()
 
+    @traced
     def onEditButtonClick(self):
+        if not self.requireOnline():
+            return
+
         if len(self.view.selectedItems) == 0:
             self.view.showMessage(
                 'Не выбран элемент для редактирования', 'Ошибка')
@@ -404,7 +813,11 @@ class EventCatalogPresenter(Presenter):
             self.view.selectedItems[0][0])).run()
 
 
+    @traced
     def onDeleteButtonClick(self):
+        if not self.requireOnline():
+            return
+
         if len(self.view.selectedItems) == 0:
             self.view.showMessage('Не выбран элемент для удаления', 'Ошибка')
             return
@@ -414,9 +827,9 @@ class EventCatalogPresenter(Presenter):
             return
 
         item = self.view.selectedItems[0]
-        event = Event.selectById(int(item[0]))
-        event.delete()
-        self.setTableData()
+        with SpanTracer.span('model'):
+            event = Event.selectById(int(item[0]))
+            event.delete()
 
 
 class AddEventPresenter(Presenter):
@@ -431,6 +844,7 @@ class AddEventPresenter(Presenter):
         self.view.subscribeOnAddButtonClick(self.onAddButtonClick)
         self.view.subscribeOnCancelButtonClick(self.onCancelButtonClick)
 
+    @traced
     def onAddButtonClick(self):
         if self.view.description == 0 or str(self.view.description).strip() == '':
             self.view.showMessage('Описание не должно быть пустым', 'Ошибка')
@@ -440,9 +854,11 @@ class AddEventPresenter(Presenter):
             self.view.description,
             self.view.dateCreated
         )
-        event.save()
+        with SpanTracer.span('model'):
+            event.save()
         EventCatalogPresenter(self.viewFactory).run()
 
+    @traced
     def onCancelButtonClick(self):
         EventCatalogPresenter(self.viewFactory).run()
 
@@ -465,6 +881,7 @@ class EditEventPresenter(Presenter):
         self.view.dateCreated = self.event.dateCreated
         self.view.description = self.event.description
 
+    @traced
     def onEditButtonClick(self):
         if self.view.description == 0 or str(self.view.description).strip() == '':
             self.view.showMessage('Описание не должно быть пустым', 'Ошибка')
@@ -472,8 +889,10 @@ class EditEventPresenter(Presenter):
 
         self.event.dateCreated = self.view.dateCreated
         self.event.description = self.view.description
-        self.event.save()
+        with SpanTracer.span('model'):
+            self.event.save()
         EventCatalogPresenter(self.viewFactory).run()
 
+    @traced
     def onCancelButtonClick(self):
         EventCatalogPresenter(self.viewFactory).run()
@@ -0,0 +1,279 @@
+from typing import Callable, List, Union
+
+from .config import DBConfig
+from .money import Money
+from .schema import ensureSqlScript
+
+
+class RepricingPreview:
+    def __init__(
+        self,
+        affected: int,
+        totalValueBefore: Money,
+        totalValueAfter: Money
+    ) -> None:
+        self._affected = affected
+        self._totalValueBefore = totalValueBefore
+        self._totalValueAfter = totalValueAfter
+
+# region Properties
+    @property
+    def affected(self) -> int:
+        return self._affected
+
+    @property
+    def totalValueBefore(self) -> Money:
+        return self._totalValueBefore
+
+    @property
+    def totalValueAfter(self) -> Money:
+        return self._totalValueAfter
+
+    @property
+    def totalValueChange(self) -> Money:
+        return self._totalValueAfter - self._totalValueBefore
+# endregion
+
+    def __str__(self) -> str:
+        return (f'(affected: {self._affected}, '
+                f'before: {self._totalValueBefore}, '
+                f'after: {self._totalValueAfter})')
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class RepricingJob:
+    def __init__(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        multiplierAsPercentage: int,
+        total: int
+    ) -> None:
+        self._ageLower = ageLower
+        self._ageUpper = ageUpper
+        self._multiplierAsPercentage = multiplierAsPercentage
+        self._total = total
+        self._processed = 0
+        self._lastId = 0
+        self._finished = False
+        self._id = -1
+
+# region Properties
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @property
+    def ageLower(self) -> int:
+        return self._ageLower
+
+    @property
+    def ageUpper(self) -> int:
+        return self._ageUpper
+
+    @property
+    def multiplierAsPercentage(self) -> int:
+        return self._multiplierAsPercentage
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    @property
+    def processed(self) -> int:
+        return self._processed
+
+    @property
+    def lastId(self) -> int:
+        return self._lastId
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+# endregion
+
+    def __str__(self) -> str:
+        return (f'(id: {self._id}, age: {self._ageLower} - {self._ageUpper}, '
+                f'multiplier: {self._multiplierAsPercentage}%, '
+                f'processed: {self._processed}/{self._total}, '
+                f'finished: {self._finished})')
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @classmethod
+    def _createFromDBData(cls, data) -> 'RepricingJob':
+        job = RepricingJob(
+            data['age_lower'],
+            data['age_upper'],
+            data['multiplier_percentage'],
+            data['total']
+        )
+        job._id = data['id']
+        job._processed = data['processed']
+        job._lastId = data['last_id']
+        job._finished = data['finished']
+        return job
+
+
+class BulkRepricer:
+    def __init__(
+        self,
+        chunkSize: int = 500,
+        onProgress: Union[Callable[[RepricingJob], None], None] = None
+    ) -> None:
+        if chunkSize <= 0:
+            raise ValueError('Chunk size must be positive')
+        self.chunkSize = chunkSize
+        self.onProgress = onProgress
+
+    def preview(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        multiplierAsPercentage: int
+    ) -> RepricingPreview:
+        ensureSqlScript('repricing.sql')
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute(
+                'SELECT count(*) AS affected, '
+                'coalesce(sum(cents * quantity), 0)::bigint AS before, '
+                'coalesce(sum(increased_cents(cents, %(multiplier)s) '
+                '* quantity), 0)::bigint AS after '
+                'FROM (SELECT (cost::numeric * 100)::bigint AS cents, quantity '
+                'FROM toys '
+                'WHERE lower(age_restriction) <= %(ageLower)s '
+                'AND upper(age_restriction) >= %(ageUpper)s) AS matching',
+                {
+                    'multiplier': multiplierAsPercentage,
+                    'ageLower': ageLower,
+                    'ageUpper': ageUpper + 1
+                }
+            )
+            data = cursor.fetchone()
+        dBConnection.commit()
+
+        return RepricingPreview(
+            data['affected'], Money(data['before']), Money(data['after']))
+
+    def start(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        multiplierAsPercentage: int
+    ) -> RepricingJob:
+        ensureSqlScript('repricing.sql')
+        dBConnection = DBConfig.getDBConnection()
+        total = self.preview(ageLower, ageUpper, multiplierAsPercentage).affected
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO toy_repricing_jobs'
+                '(age_lower, age_upper, multiplier_percentage, total) '
+                'VALUES(%s, %s, %s, %s) '
+                'RETURNING *;',
+                (ageLower, ageUpper, multiplierAsPercentage, total)
+            )
+            job = RepricingJob._createFromDBData(cursor.fetchone())
+        dBConnection.commit()
+        return job
+
+    def run(self, job: RepricingJob) -> RepricingJob:
+        while not job.finished:
+            self._applyChunk(job)
+            if self.onProgress is not None:
+                self.onProgress(job)
+        return job
+
+    def apply(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        multiplierAsPercentage: int
+    ) -> RepricingJob:
+        return self.run(self.start(ageLower, ageUpper, multiplierAsPercentage))
+
+    def resume(self, jobId: int) -> RepricingJob:
+        return self.run(self.selectJobById(jobId))
+
+    def _applyChunk(self, job: RepricingJob):
+        dBConnection = DBConfig.getDBConnection()
+
+        try:
+            with dBConnection.cursor() as cursor:
+                cursor.execute(
+                    'WITH chunk AS ('
+                    'SELECT id FROM toys '
+                    'WHERE id > %(lastId)s '
+                    'AND lower(age_restriction) <= %(ageLower)s '
+                    'AND upper(age_restriction) >= %(ageUpper)s '
+                    'ORDER BY id '
+                    'LIMIT %(chunkSize)s '
+                    'FOR UPDATE) '
+                    'UPDATE toys '
+                    'SET cost = (increased_cents((cost::numeric * 100)::bigint, '
+                    '%(multiplier)s)::numeric / 100)::money '
+                    'FROM chunk '
+                    'WHERE toys.id = chunk.id '
+                    'RETURNING toys.id;',
+                    {
+                        'lastId': job.lastId,
+                        'ageLower': job.ageLower,
+                        'ageUpper': job.ageUpper + 1,
+                        'chunkSize': self.chunkSize,
+                        'multiplier': job.multiplierAsPercentage
+                    }
+                )
+                ids = [data['id'] for data in cursor.fetchall()]
+                processed = job.processed + len(ids)
+                lastId = max(ids, default=job.lastId)
+                finished = len(ids) < self.chunkSize
+
+                cursor.execute(
+                    'UPDATE toy_repricing_jobs '
+                    'SET processed = %s, last_id = %s, finished = %s '
+                    'WHERE id = %s;',
+                    (processed, lastId, finished, job.id)
+                )
+            dBConnection.commit()
+        except Exception:
+            dBConnection.rollback()
+            raise
+
+        job._processed = processed
+        job._lastId = lastId
+        job._finished = finished
+
+    @classmethod
+    def selectJobById(cls, id_: int) -> RepricingJob:
+        ensureSqlScript('repricing.sql')
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute(
+                'SELECT * FROM toy_repricing_jobs WHERE id = %s;', (id_,))
+            data = cursor.fetchone()
+        dBConnection.commit()
+        if not data:
+            raise ValueError('There is no repricing job with specified id.')
+        return RepricingJob._createFromDBData(data)
+
+    @classmethod
+    def selectUnfinishedJobs(cls) -> List[RepricingJob]:
+        ensureSqlScript('repricing.sql')
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute(
+                'SELECT * FROM toy_repricing_jobs '
+                'WHERE NOT finished '
+                'ORDER BY id;'
+            )
+            result = [RepricingJob._createFromDBData(data)
+                      for data in cursor.fetchall()]
+        dBConnection.commit()
+        return result
@@ -0,0 +1,48 @@
+import os
+from typing import Set
+
+from .config import DBConfig, SQL_PATH, connectFromEnv
+
+
+MIGRATIONS = [
+    'schema.sql',
+    'repricing.sql',
+    'price_history.sql',
+    'delta_sync.sql',
+    'catalog_sorting.sql',
+]
+
+_appliedScripts: Set[str] = set()
+
+
+def getSql(fileName: str) -> str:
+    with open(os.path.join(SQL_PATH, fileName), 'r', encoding='utf-8') as script:
+        return script.read()
+
+
+def applySqlScript(fileName: str):
+    dBConnection = DBConfig.getDBConnection()
+
+    with dBConnection.cursor() as cursor:
+        cursor.execute(getSql(fileName))
+    dBConnection.commit()
+    _appliedScripts.add(fileName)
+
+
+def ensureSqlScript(fileName: str):
+    if fileName not in _appliedScripts:
+        applySqlScript(fileName)
+
+
+def migrate():
+    for fileName in MIGRATIONS:
+        applySqlScript(fileName)
+
+
+if __name__ == '__main__':
+    dBConnection = connectFromEnv()
+    try:
+        DBConfig.setDBConnection(dBConnection)
+        migrate()
+    finally:
+        dBConnection.close()
@@ -0,0 +1,421 @@
+import os
+import sqlite3
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Iterable, List, TypeVar, Union
+
+from psycopg2 import OperationalError
+from psycopg2.errors import UndefinedColumn, UndefinedTable
+from psycopg2.extras import NumericRange
+
+from .cache import MISSING, QueryCache
+from .cancellation import interruptible
+from .changes import ChangeBus, EventsChanged, ModelChange, ToysChanged
+from .config import DBConfig, StorageConfig
+from .models import Event, Toy
+from .money import Money
+from .storage.base import TOY_ORDER_COLUMNS, canonicalAge
+from .storage.sqlite import pageQuery
+
+
+T = TypeVar('T')
+
+RECENT_EVENTS_DAYS = 90
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+SCHEMA_VERSION = 2
+
+NO_AGE_BOUND = -1
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS toys (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    cost_cents INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    age_lower INTEGER NOT NULL,
+    age_upper INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS toys_age ON toys(age_lower, age_upper);
+CREATE INDEX IF NOT EXISTS toys_name ON toys(name);
+CREATE INDEX IF NOT EXISTS toys_cost ON toys(cost_cents);
+CREATE INDEX IF NOT EXISTS toys_quantity ON toys(quantity);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    date_created TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_date_created ON events(date_created);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+'''
+
+_PAGE_COLUMNS = {
+    'id': ['id'],
+    'name': ['name', 'id'],
+    'cost': ['cost_cents', 'id'],
+    'quantity': ['quantity', 'id'],
+    'age': ['age_lower', 'age_upper', 'id'],
+}
+
+
+def _ageBound(value: Union[int, None]) -> int:
+    return NO_AGE_BOUND if value is None else value
+
+
+def _ageFromBounds(ageLower: int, ageUpper: int) -> NumericRange:
+    if ageLower == NO_AGE_BOUND and ageUpper == NO_AGE_BOUND:
+        return NumericRange(empty=True)
+    return NumericRange(None if ageLower == NO_AGE_BOUND else ageLower,
+                        None if ageUpper == NO_AGE_BOUND else ageUpper)
+
+
+class CatalogSnapshot:
+    _connection: Union[sqlite3.Connection, None] = None
+
+    @classmethod
+    def defaultPath(cls) -> str:
+        return os.getenv('snapshot_path') or os.path.join(
+            os.path.expanduser('~'), '.toy_organizer_snapshot.sqlite3')
+
+    @classmethod
+    def open(cls, path: str = None):
+        cls.close()
+        cls._connection = sqlite3.connect(
+            path or cls.defaultPath(), check_same_thread=False)
+        cls._connection.row_factory = sqlite3.Row
+        version = cls._connection.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            cls._connection.executescript(
+                'DROP TABLE IF EXISTS toys;'
+                'DROP TABLE IF EXISTS events;'
+                'DROP TABLE IF EXISTS meta;')
+        cls._connection.executescript(_SCHEMA)
+        cls._connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    @classmethod
+    def close(cls):
+        if cls._connection is not None:
+            cls._connection.close()
+            cls._connection = None
+
+    @classmethod
+    def isAvailable(cls) -> bool:
+        return cls.watermark() is not None
+
+    @classmethod
+    def watermark(cls) -> Union[datetime, None]:
+        if cls._connection is None:
+            return None
+        row = cls._connection.execute(
+            'SELECT value FROM meta WHERE key = \'watermark\'').fetchone()
+        return datetime.fromisoformat(row['value']) if row else None
+
+    @classmethod
+    def refresh(cls):
+        for change in cls.sync():
+            ChangeBus.publish(change)
+
+    @classmethod
+    def sync(cls) -> List[ModelChange]:
+        if cls._connection is None:
+            return []
+
+        watermark = cls.watermark()
+        if (watermark is not None
+                and datetime.now(timezone.utc) - watermark < TOMBSTONE_RETENTION):
+            try:
+                return cls._applyChanges(watermark)
+            except (UndefinedColumn, UndefinedTable):
+                DBConfig.getDBConnection().rollback()
+        return cls._reload()
+
+    @classmethod
+    def _reload(cls) -> List[ModelChange]:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute('SELECT now() AS now;')
+            watermark = cursor.fetchone()['now']
+        toys = Toy.selectAllToys()
+        events = Event.selectSince(cls._recentEventsStart())
+
+        with cls._connection:
+            cls._connection.execute('DELETE FROM toys')
+            cls._connection.execute('DELETE FROM events')
+            cls._saveToys(toys)
+            cls._saveEvents(events)
+            cls._setWatermark(watermark)
+        return [ToysChanged(external=True), EventsChanged(external=True)]
+
+    @classmethod
+    def _applyChanges(cls, watermark: datetime) -> List[ModelChange]:
+        toyChanges = Toy.selectChangedSince(watermark)
+        eventChanges = Event.selectChangedSince(watermark)
+        recentEventsStart = cls._recentEventsStart()
+
+        with cls._connection:
+            cls._saveToys(toyChanges.changed)
+            cls._connection.executemany(
+                'DELETE FROM toys WHERE id = ?',
+                ((id_,) for id_ in toyChanges.deletedIds)
+            )
+            cls._saveEvents(event for event in eventChanges.changed
+                            if event.dateCreated >= recentEventsStart)
+            cls._connection.executemany(
+                'DELETE FROM events WHERE id = ?',
+                ((id_,) for id_ in eventChanges.deletedIds)
+            )
+            cls._connection.execute(
+                'DELETE FROM events WHERE date_created < ?',
+                (recentEventsStart.isoformat(),)
+            )
+            cls._setWatermark(
+                min(toyChanges.watermark, eventChanges.watermark))
+        changes = []
+        if toyChanges.changed or toyChanges.deletedIds:
+            changes.append(ToysChanged(external=True))
+        if eventChanges.changed or eventChanges.deletedIds:
+            changes.append(EventsChanged(external=True))
+        return changes
+
+    @classmethod
+    def _recentEventsStart(cls) -> date:
+        return date.today() - timedelta(days=RECENT_EVENTS_DAYS)
+
+    @classmethod
+    def _saveToys(cls, toys: Iterable[Toy]):
+        cls._connection.executemany(
+            'INSERT OR REPLACE INTO toys VALUES (?, ?, ?, ?, ?, ?)',
+            ((toy.id, toy.name, toy.cost.cents, toy.quantity,
+              *map(_ageBound, canonicalAge(toy.age)))
+             for toy in toys)
+        )
+
+    @classmethod
+    def _saveEvents(cls, events: Iterable[Event]):
+        cls._connection.executemany(
+            'INSERT OR REPLACE INTO events VALUES (?, ?, ?)',
+            ((event.id, event.description, event.dateCreated.isoformat())
+             for event in events)
+        )
+
+    @classmethod
+    def _setWatermark(cls, watermark: datetime):
+        cls._connection.execute(
+            'INSERT OR REPLACE INTO meta VALUES (\'watermark\', ?)',
+            (watermark.isoformat(),)
+        )
+
+    @classmethod
+    def _toys(cls, query: str, parameters=()) -> List[Toy]:
+        result = []
+        with interruptible(cls._connection.interrupt):
+            for row in cls._connection.execute(query, parameters):
+                result.append(Toy._createFromDBData(
+                    row['id'],
+                    row['name'],
+                    Money(row['cost_cents']),
+                    row['quantity'],
+                    _ageFromBounds(row['age_lower'], row['age_upper'])
+                ))
+        return result
+
+    @classmethod
+    def _events(cls, query: str, parameters=()) -> List[Event]:
+        result = []
+        with interruptible(cls._connection.interrupt):
+            for row in cls._connection.execute(query, parameters):
+                result.append(Event._createFromDBData(
+                    row['id'],
+                    row['description'],
+                    date.fromisoformat(row['date_created'])
+                ))
+        return result
+
+    @classmethod
+    def selectAllToys(cls) -> List[Toy]:
+        return cls._toys('SELECT * FROM toys ORDER BY id')
+
+    @classmethod
+    def selectByAge(cls, ageLower: int, ageUpper: int, orderBy: str = None) -> List[Toy]:
+        query = ('SELECT * FROM toys '
+                 'WHERE age_lower BETWEEN 0 AND ? AND age_upper >= ? ')
+        if orderBy is not None and orderBy in {'cost', 'name', 'quantity'}:
+            query += f'ORDER BY {"cost_cents" if orderBy == "cost" else orderBy}'
+        return cls._toys(query, (ageLower, ageUpper + 1))
+
+    @classmethod
+    def selectPage(
+        cls,
+        orderBy: str,
+        descending: bool,
+        after: Union[Toy, None],
+        limit: int
+    ) -> List[Toy]:
+        return cls._toys(
+            *pageQuery(orderBy, descending, after, limit, _PAGE_COLUMNS))
+
+    @classmethod
+    def selectMostExpensive(
+        cls,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Union[Money, Decimal]
+    ) -> Union[Toy, None]:
+        toys = cls._toys(
+            'SELECT * FROM toys '
+            'WHERE age_lower BETWEEN 0 AND ? AND age_upper >= ? '
+            'AND cost_cents <= ? '
+            'ORDER BY cost_cents DESC '
+            'LIMIT 1',
+            (ageLower, ageUpper + 1, Money.of(maxCost).cents)
+        )
+        return toys[0] if toys else None
+
+    @classmethod
+    def selectAllEvents(cls) -> List[Event]:
+        return cls._events('SELECT * FROM events ORDER BY id')
+
+    @classmethod
+    def selectEventsByDate(cls, dateCreated: date) -> List[Event]:
+        return cls._events(
+            'SELECT * FROM events WHERE date_created = ?',
+            (dateCreated.isoformat(),)
+        )
+
+
+class CatalogReader:
+    cache: Union[QueryCache, None] = QueryCache()
+    _onConnectionLost: Union[Callable[[OperationalError], None], None] = None
+
+    @classmethod
+    def isOnline(cls) -> bool:
+        return StorageConfig.getStorage().isConnected()
+
+    @classmethod
+    def setConnectionLostHandler(
+        cls,
+        handler: Union[Callable[[OperationalError], None], None]
+    ):
+        cls._onConnectionLost = handler
+
+    @classmethod
+    def _read(cls, online: Callable[[], T], offline: Callable[[], T]) -> T:
+        if not cls.isOnline():
+            return offline()
+        try:
+            return online()
+        except OperationalError as error:
+            if cls.isOnline():
+                raise
+            if cls._onConnectionLost is not None:
+                cls._onConnectionLost(error)
+            if not CatalogSnapshot.isAvailable():
+                raise
+        return offline()
+
+    @classmethod
+    def canBrowse(cls) -> bool:
+        return cls.isOnline() or CatalogSnapshot.isAvailable()
+
+    @classmethod
+    def selectAllToys(cls) -> List[Toy]:
+        return cls._read(Toy.selectAllToys, CatalogSnapshot.selectAllToys)
+
+    @classmethod
+    def selectToysPage(
+        cls,
+        orderBy: str,
+        descending: bool,
+        after: Union[Toy, None],
+        limit: int
+    ) -> List[Toy]:
+        return cls._read(
+            lambda: Toy.selectPage(orderBy, descending, after, limit),
+            lambda: CatalogSnapshot.selectPage(
+                orderBy, descending, after, limit))
+
+    @classmethod
+    def selectByAge(cls, ageLower: int, ageUpper: int, orderBy: str = None) -> List[Toy]:
+        return cls._read(
+            lambda: list(cls._cached(
+                cls._byAgeKey(ageLower, ageUpper, orderBy),
+                lambda: tuple(Toy.selectByAge(ageLower, ageUpper, orderBy)))),
+            lambda: CatalogSnapshot.selectByAge(ageLower, ageUpper, orderBy))
+
+    @classmethod
+    def cachedByAge(
+        cls,
+        ageLower: int,
+        ageUpper: int,
+        orderBy: str = None
+    ) -> Union[List[Toy], None]:
+        toys = cls._peek(cls._byAgeKey(ageLower, ageUpper, orderBy))
+        return None if toys is MISSING else list(toys)
+
+    @classmethod
+    def selectMostExpensive(
+        cls,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Union[Money, Decimal]
+    ) -> Union[Toy, None]:
+        return cls._read(
+            lambda: cls._cached(
+                cls._mostExpensiveKey(ageLower, ageUpper, maxCost),
+                lambda: Toy.selectMostExpensive(ageLower, ageUpper, maxCost)),
+            lambda: CatalogSnapshot.selectMostExpensive(
+                ageLower, ageUpper, maxCost))
+
+    @classmethod
+    def cachedMostExpensive(
+        cls,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Union[Money, Decimal]
+    ):
+        return cls._peek(cls._mostExpensiveKey(ageLower, ageUpper, maxCost))
+
+    @classmethod
+    def setCache(cls, cache: Union[QueryCache, None]):
+        cls.cache = cache
+
+    @classmethod
+    def _byAgeKey(cls, ageLower: int, ageUpper: int, orderBy: Union[str, None]):
+        if orderBy not in TOY_ORDER_COLUMNS:
+            orderBy = None
+        return 'selectByAge', ageLower, ageUpper, orderBy
+
+    @classmethod
+    def _mostExpensiveKey(
+        cls,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Union[Money, Decimal]
+    ):
+        return 'selectMostExpensive', ageLower, ageUpper, Money.of(maxCost).cents
+
+    @classmethod
+    def _cached(cls, key, load):
+        if cls.cache is None:
+            return load()
+        return cls.cache.getOrLoad(key, load)
+
+    @classmethod
+    def _peek(cls, key):
+        if cls.cache is None or not cls.isOnline():
+            return MISSING
+        return cls.cache.get(key)
+
+    @classmethod
+    def selectAllEvents(cls) -> List[Event]:
+        return cls._read(Event.selectAll, CatalogSnapshot.selectAllEvents)
+
+    @classmethod
+    def selectEventsByDate(cls, dateCreated: date) -> List[Event]:
+        return cls._read(
+            lambda: Event.selectByDate(dateCreated),
+            lambda: CatalogSnapshot.selectEventsByDate(dateCreated))
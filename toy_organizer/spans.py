@@ -0,0 +1,204 @@
+import json
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Deque, Dict, List, Union
+
+
+HISTOGRAM_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+class Span:
+    def __init__(self, name: str, parent: Union['Span', None] = None) -> None:
+        self._name = name
+        self._parent = parent
+        self._children: List[Span] = []
+        self._start = time.perf_counter()
+        self._end = None
+        self._painted = False
+        self._discarded = False
+
+# region Properties
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def parent(self) -> Union['Span', None]:
+        return self._parent
+
+    @property
+    def children(self) -> List['Span']:
+        return self._children
+
+    @property
+    def duration(self) -> float:
+        end = self._end if self._end is not None else time.perf_counter()
+        return end - self._start
+
+    @property
+    def painted(self) -> bool:
+        return self._painted
+# endregion
+
+    def _finish(self, end: float = None):
+        self._end = end if end is not None else time.perf_counter()
+
+
+class ActionHistogram:
+    def __init__(self, name: str, window: int = 1000) -> None:
+        self._name = name
+        self._durations: Deque[float] = deque(maxlen=window)
+        self._children: Dict[str, Deque[float]] = {}
+        self._window = window
+        self._unpainted = 0
+
+# region Properties
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def count(self) -> int:
+        return len(self._durations)
+# endregion
+
+    def add(self, span: Span):
+        self._durations.append(span.duration)
+        if not span.painted:
+            self._unpainted += 1
+        for path, duration in _childDurations(span):
+            durations = self._children.get(path)
+            if durations is None:
+                durations = self._children[path] = deque(maxlen=self._window)
+            durations.append(duration)
+
+    def toDict(self) -> Dict:
+        result = _summary(self._durations)
+        result['unpainted'] = self._unpainted
+        result['children'] = {
+            path: _summary(durations)
+            for path, durations in sorted(self._children.items())
+        }
+        return result
+
+
+def _childDurations(span: Span, prefix: str = ''):
+    for child in span.children:
+        path = f'{prefix}{child.name}'
+        yield path, child.duration
+        yield from _childDurations(child, f'{path}/')
+
+
+def _summary(durations) -> Dict:
+    milliseconds = sorted(duration * 1000 for duration in durations)
+    if not milliseconds:
+        return {'count': 0}
+
+    def percentile(fraction: float) -> float:
+        return milliseconds[max(int(len(milliseconds) * fraction + 0.5) - 1, 0)]
+
+    buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+    for value in milliseconds:
+        buckets[bisect_left(HISTOGRAM_BUCKETS_MS, value)] += 1
+    return {
+        'count': len(milliseconds),
+        'mean_ms': sum(milliseconds) / len(milliseconds),
+        'p50_ms': percentile(0.50),
+        'p90_ms': percentile(0.90),
+        'p99_ms': percentile(0.99),
+        'max_ms': milliseconds[-1],
+        'buckets_ms': {
+            (f'<={edge}' if index < len(HISTOGRAM_BUCKETS_MS) else
+             f'>{HISTOGRAM_BUCKETS_MS[-1]}'): buckets[index]
+            for index, edge in enumerate(HISTOGRAM_BUCKETS_MS + [None])
+        },
+    }
+
+
+class SpanTracer:
+    window = 1000
+    _stack: List[Span] = []
+    _awaitingPaint: List[Span] = []
+    _histograms: Dict[str, ActionHistogram] = {}
+
+    @classmethod
+    @contextmanager
+    def span(cls, name: str):
+        parent = cls._stack[-1] if cls._stack else None
+        if parent is None:
+            cls._closeAwaitingPaint()
+        span = Span(name, parent)
+        if parent is not None:
+            parent._children.append(span)
+        cls._stack.append(span)
+        try:
+            yield span
+        finally:
+            cls._stack.pop()
+            span._finish()
+            if parent is None and not span._discarded:
+                cls._awaitingPaint.append(span)
+
+    @classmethod
+    def notifyPainted(cls):
+        if not cls._awaitingPaint:
+            return
+        end = time.perf_counter()
+        for span in cls._awaitingPaint:
+            span._finish(end)
+            span._painted = True
+            cls._record(span)
+        cls._awaitingPaint = []
+
+    @classmethod
+    def discardCurrent(cls):
+        if cls._stack:
+            cls._stack[0]._discarded = True
+
+    @classmethod
+    def _closeAwaitingPaint(cls):
+        for span in cls._awaitingPaint:
+            cls._record(span)
+        cls._awaitingPaint = []
+
+    @classmethod
+    def _record(cls, span: Span):
+        histogram = cls._histograms.get(span.name)
+        if histogram is None:
+            histogram = cls._histograms[span.name] = ActionHistogram(
+                span.name, cls.window)
+        histogram.add(span)
+
+    @classmethod
+    def histograms(cls) -> List[ActionHistogram]:
+        return list(cls._histograms.values())
+
+    @classmethod
+    def reset(cls):
+        cls._histograms = {}
+        cls._awaitingPaint = []
+
+    @classmethod
+    def toDict(cls) -> Dict:
+        return {
+            name: histogram.toDict()
+            for name, histogram in sorted(cls._histograms.items())
+        }
+
+    @classmethod
+    def exportJson(cls, path: str):
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(cls.toDict(), output, indent=2, ensure_ascii=False)
+
+
+def traced(func):
+    arity = func.__code__.co_argcount - 1
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with SpanTracer.span(f'{type(self).__name__}.{func.__name__}'):
+            return func(self, *args[:arity], **kwargs)
+    return wrapper
@@ -0,0 +1,8 @@
+CREATE INDEX IF NOT EXISTS toys_name_id_idx ON toys(name, id);
+CREATE INDEX IF NOT EXISTS toys_cost_id_idx ON toys(cost, id);
+CREATE INDEX IF NOT EXISTS toys_quantity_id_idx ON toys(quantity, id);
+CREATE INDEX IF NOT EXISTS toys_age_id_idx ON toys(
+    (coalesce(lower(age_restriction), -1)),
+    (coalesce(upper(age_restriction), -1)),
+    id
+);
@@ -0,0 +1,111 @@
+ALTER TABLE toys ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now();
+ALTER TABLE events ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now();
+
+CREATE INDEX IF NOT EXISTS toys_updated_at_idx ON toys(updated_at);
+CREATE INDEX IF NOT EXISTS events_updated_at_idx ON events(updated_at);
+
+CREATE TABLE IF NOT EXISTS toy_tombstones (
+    id integer PRIMARY KEY,
+    deleted_at timestamptz NOT NULL DEFAULT now()
+);
+CREATE TABLE IF NOT EXISTS event_tombstones (
+    id integer PRIMARY KEY,
+    deleted_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS toy_tombstones_deleted_at_idx
+    ON toy_tombstones(deleted_at);
+CREATE INDEX IF NOT EXISTS event_tombstones_deleted_at_idx
+    ON event_tombstones(deleted_at);
+
+CREATE OR REPLACE FUNCTION touch_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION toys_record_tombstones()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO toy_tombstones(id, deleted_at)
+    SELECT id, now() FROM old_rows
+    ON CONFLICT (id) DO UPDATE SET deleted_at = excluded.deleted_at;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION events_record_tombstones()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO event_tombstones(id, deleted_at)
+    SELECT id, now() FROM old_rows
+    ON CONFLICT (id) DO UPDATE SET deleted_at = excluded.deleted_at;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION prune_tombstones(retention interval)
+RETURNS void
+LANGUAGE sql
+AS $$
+    DELETE FROM toy_tombstones WHERE deleted_at < now() - retention;
+    DELETE FROM event_tombstones WHERE deleted_at < now() - retention;
+$$;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT FROM pg_trigger
+        WHERE tgname = 'toys_touch_updated_at'
+        AND tgrelid = 'toys'::regclass
+    ) THEN
+        CREATE TRIGGER toys_touch_updated_at
+        BEFORE UPDATE ON toys
+        FOR EACH ROW
+        EXECUTE FUNCTION touch_updated_at();
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT FROM pg_trigger
+        WHERE tgname = 'events_touch_updated_at'
+        AND tgrelid = 'events'::regclass
+    ) THEN
+        CREATE TRIGGER events_touch_updated_at
+        BEFORE UPDATE ON events
+        FOR EACH ROW
+        EXECUTE FUNCTION touch_updated_at();
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT FROM pg_trigger
+        WHERE tgname = 'toys_tombstones'
+        AND tgrelid = 'toys'::regclass
+    ) THEN
+        CREATE TRIGGER toys_tombstones
+        AFTER DELETE ON toys
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION toys_record_tombstones();
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT FROM pg_trigger
+        WHERE tgname = 'events_tombstones'
+        AND tgrelid = 'events'::regclass
+    ) THEN
+        CREATE TRIGGER events_tombstones
+        AFTER DELETE ON events
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION events_record_tombstones();
+    END IF;
+END;
+$$;
@@ -0,0 +1,118 @@
+CREATE TABLE IF NOT EXISTS toy_price_history (
+    toy_id integer NOT NULL,
+    old_cost money,
+    new_cost money NOT NULL,
+    changed_at timestamptz NOT NULL DEFAULT now()
+) PARTITION BY RANGE (changed_at);
+
+CREATE TABLE IF NOT EXISTS toy_price_history_default
+    PARTITION OF toy_price_history DEFAULT;
+
+CREATE INDEX IF NOT EXISTS toy_price_history_changed_at_brin
+    ON toy_price_history USING brin (changed_at);
+
+CREATE INDEX IF NOT EXISTS toy_price_history_toy_id_changed_at
+    ON toy_price_history (toy_id, changed_at);
+
+CREATE OR REPLACE FUNCTION toy_price_history_ensure_partition(at timestamptz)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    monthStart timestamptz :=
+        date_trunc('month', at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    partitionName text :=
+        'toy_price_history_' || to_char(at AT TIME ZONE 'UTC', 'YYYY_MM');
+BEGIN
+    IF to_regclass(partitionName) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I (LIKE toy_price_history INCLUDING DEFAULTS)',
+            partitionName
+        );
+        EXECUTE format(
+            'WITH moved AS ('
+            'DELETE FROM toy_price_history_default '
+            'WHERE changed_at >= %L AND changed_at < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved',
+            monthStart,
+            monthStart + interval '1 month',
+            partitionName
+        );
+        EXECUTE format(
+            'ALTER TABLE toy_price_history ATTACH PARTITION %I '
+            'FOR VALUES FROM (%L) TO (%L)',
+            partitionName,
+            monthStart,
+            monthStart + interval '1 month'
+        );
+    END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION toy_price_history_create_partitions(monthsAhead integer)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    FOR month IN 0..monthsAhead LOOP
+        PERFORM toy_price_history_ensure_partition(
+            now() + make_interval(months => month));
+    END LOOP;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION toys_log_price_insert()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO toy_price_history(toy_id, old_cost, new_cost, changed_at)
+    SELECT id, NULL, cost, now()
+    FROM new_rows;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION toys_log_price_update()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO toy_price_history(toy_id, old_cost, new_cost, changed_at)
+    SELECT new_rows.id, old_rows.cost, new_rows.cost, now()
+    FROM new_rows
+    JOIN old_rows ON old_rows.id = new_rows.id
+    WHERE new_rows.cost IS DISTINCT FROM old_rows.cost;
+    RETURN NULL;
+END;
+$$;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT FROM pg_trigger
+        WHERE tgname = 'toys_price_history_insert'
+        AND tgrelid = 'toys'::regclass
+    ) THEN
+        CREATE TRIGGER toys_price_history_insert
+        AFTER INSERT ON toys
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION toys_log_price_insert();
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT FROM pg_trigger
+        WHERE tgname = 'toys_price_history_update'
+        AND tgrelid = 'toys'::regclass
+    ) THEN
+        CREATE TRIGGER toys_price_history_update
+        AFTER UPDATE ON toys
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION toys_log_price_update();
+    END IF;
+END;
+$$;
+
+SELECT toy_price_history_create_partitions(3);
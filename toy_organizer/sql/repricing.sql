@@ -0,0 +1,26 @@
+CREATE TABLE IF NOT EXISTS toy_repricing_jobs (
+    id serial PRIMARY KEY,
+    age_lower integer NOT NULL,
+    age_upper integer NOT NULL,
+    multiplier_percentage integer NOT NULL,
+    total integer NOT NULL,
+    processed integer NOT NULL DEFAULT 0,
+    last_id integer NOT NULL DEFAULT 0,
+    finished boolean NOT NULL DEFAULT false,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION increased_cents(cents bigint, multiplier_percentage integer)
+RETURNS bigint
+LANGUAGE sql IMMUTABLE STRICT
+AS $$
+    SELECT quotient + CASE
+        WHEN remainder > 50 OR (remainder = 50 AND quotient % 2 <> 0) THEN 1
+        ELSE 0
+    END
+    FROM (
+        SELECT (product - (product % 100 + 100) % 100) / 100 AS quotient,
+               (product % 100 + 100) % 100 AS remainder
+        FROM (SELECT cents * multiplier_percentage AS product) AS products
+    ) AS parts
+$$;
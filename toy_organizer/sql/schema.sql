@@ -0,0 +1,13 @@
+CREATE TABLE IF NOT EXISTS toys (
+    id serial PRIMARY KEY,
+    name varchar(255) NOT NULL,
+    cost money NOT NULL,
+    quantity integer NOT NULL,
+    age_restriction int4range NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    id serial PRIMARY KEY,
+    description text NOT NULL,
+    date_created date NOT NULL
+);
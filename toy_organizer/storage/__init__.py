@@ -0,0 +1,13 @@
+from .base import EventRepository, Storage, ToyRepository
+from .memory import MemoryStorage
+from .postgres import PostgresStorage
+from .sqlite import SQLiteStorage
+
+__all__ = [
+    'EventRepository',
+    'MemoryStorage',
+    'PostgresStorage',
+    'SQLiteStorage',
+    'Storage',
+    'ToyRepository',
+]
@@ -0,0 +1,149 @@
+from datetime import date
+from typing import TYPE_CHECKING, Iterator, List, Protocol, Tuple, Union
+
+from psycopg2.extras import NumericRange
+
+from ..money import Money
+
+if TYPE_CHECKING:
+    from ..models import Event, Toy
+
+
+TOY_ORDER_COLUMNS = {'cost', 'name', 'quantity'}
+
+TOY_PAGE_COLUMNS = ['id', 'name', 'cost', 'quantity', 'age']
+
+DEFAULT_PAGE_SIZE = 200
+
+NO_AGE_LOWER = 2 ** 31 - 1
+
+NO_AGE_UPPER = -2 ** 31
+
+StockRow = Tuple[int, int, int, int, int]
+
+
+class ToyRepository(Protocol):
+    def create(self, toy: 'Toy') -> int: ...
+    def createMany(self, toys: List['Toy']) -> List[int]: ...
+    def update(self, toy: 'Toy'): ...
+    def updateMany(self, toys: List['Toy']): ...
+    def delete(self, id_: int): ...
+    def deleteByName(self, name: str) -> int: ...
+    def deleteByNames(self, names: List[str]) -> int: ...
+    def selectById(self, id_: int) -> 'Toy': ...
+    def selectAll(self) -> List['Toy']: ...
+    def iterAll(self, batchSize: int) -> Iterator['Toy']: ...
+    def iterStockRows(self, batchSize: int) -> Iterator[List[StockRow]]: ...
+
+    def selectByAge(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        orderBy: str = None
+    ) -> List['Toy']: ...
+
+    def countByAge(self, ageLower: int, ageUpper: int) -> int: ...
+
+    def selectMostExpensive(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Money
+    ) -> Union['Toy', None]: ...
+
+    def selectTopByCost(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Money,
+        limit: int
+    ) -> List['Toy']: ...
+
+    def selectPage(
+        self,
+        orderBy: str = 'id',
+        descending: bool = False,
+        after: Union['Toy', None] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> List['Toy']: ...
+
+    def increaseCostForAge(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        multiplierAsPercentage: int
+    ): ...
+
+
+class EventRepository(Protocol):
+    def create(self, event: 'Event') -> int: ...
+    def createMany(self, events: List['Event']) -> List[int]: ...
+    def update(self, event: 'Event'): ...
+    def updateMany(self, events: List['Event']): ...
+    def delete(self, id_: int): ...
+    def selectById(self, id_: int) -> 'Event': ...
+    def selectByDate(self, dateCreated: date) -> List['Event']: ...
+    def selectSince(self, dateCreated: date) -> List['Event']: ...
+    def selectAll(self) -> List['Event']: ...
+
+
+class Storage(Protocol):
+    toys: ToyRepository
+    events: EventRepository
+
+    def isConnected(self) -> bool: ...
+    def close(self): ...
+
+
+def toyPageKey(toy: 'Toy', orderBy: str) -> Tuple:
+    if orderBy == 'name':
+        return toy.name, toy.id
+    if orderBy == 'cost':
+        return toy.cost, toy.id
+    if orderBy == 'quantity':
+        return toy.quantity, toy.id
+    if orderBy == 'age':
+        lower, upper = canonicalAge(toy.age)
+        return (-1 if lower is None else lower,
+                -1 if upper is None else upper,
+                toy.id)
+    if orderBy == 'id':
+        return toy.id,
+    raise ValueError(f'Unknown sort column: {orderBy}')
+
+
+def stockRow(
+    id_: int,
+    cents: Union[int, None],
+    quantity: Union[int, None],
+    ageLower: Union[int, None],
+    ageUpper: Union[int, None]
+) -> StockRow:
+    return (
+        id_,
+        cents or 0,
+        quantity or 0,
+        NO_AGE_LOWER if ageLower is None else ageLower,
+        NO_AGE_UPPER if ageUpper is None else ageUpper
+    )
+
+
+def toyStockRow(toy: 'Toy') -> StockRow:
+    return stockRow(
+        toy.id,
+        toy.cost.cents if toy.cost is not None else None,
+        toy.quantity,
+        *canonicalAge(toy.age)
+    )
+
+
+def canonicalAge(age: NumericRange) -> Tuple[Union[int, None], Union[int, None]]:
+    if age.isempty:
+        return None, None
+    lower, upper = age.lower, age.upper
+    if lower is not None and not age.lower_inc:
+        lower += 1
+    if upper is not None and age.upper_inc:
+        upper += 1
+    return lower, upper
+
@@ -0,0 +1,172 @@
+from bisect import bisect_left, bisect_right, insort
+from heapq import nlargest
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+
+class AgeIndex:
+    def __init__(self) -> None:
+        self._lowers: List[int] = []
+        self._buckets: Dict[int, List[Tuple[int, int]]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __str__(self) -> str:
+        return f'(toys: {self._size}, lower bounds: {len(self._lowers)})'
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def add(self, id_: int, ageLower: Union[int, None], ageUpper: Union[int, None]):
+        if ageLower is None or ageUpper is None:
+            return
+        bucket = self._buckets.get(ageLower)
+        if bucket is None:
+            bucket = self._buckets[ageLower] = []
+            insort(self._lowers, ageLower)
+        insort(bucket, (ageUpper, id_))
+        self._size += 1
+
+    def remove(self, id_: int, ageLower: Union[int, None], ageUpper: Union[int, None]):
+        if ageLower is None or ageUpper is None:
+            return
+        bucket = self._buckets.get(ageLower)
+        if bucket is None:
+            return
+        position = bisect_left(bucket, (ageUpper, id_))
+        if position == len(bucket) or bucket[position] != (ageUpper, id_):
+            return
+        del bucket[position]
+        self._size -= 1
+        if not bucket:
+            del self._buckets[ageLower]
+            del self._lowers[bisect_left(self._lowers, ageLower)]
+
+    def clear(self):
+        self._lowers = []
+        self._buckets = {}
+        self._size = 0
+
+    def rebuild(self, entries: Iterable[Tuple[int, Union[int, None], Union[int, None]]]):
+        self.clear()
+        for id_, ageLower, ageUpper in entries:
+            if ageLower is None or ageUpper is None:
+                continue
+            bucket = self._buckets.get(ageLower)
+            if bucket is None:
+                bucket = self._buckets[ageLower] = []
+            bucket.append((ageUpper, id_))
+            self._size += 1
+        for bucket in self._buckets.values():
+            bucket.sort()
+        self._lowers = sorted(self._buckets)
+
+    def _ranges(self, ageLower: int, ageUpper: int):
+        lowers = self._lowers[:bisect_right(self._lowers, ageLower)]
+        for lower in lowers:
+            bucket = self._buckets[lower]
+            yield bucket, bisect_left(bucket, (ageUpper + 1,))
+
+    def matching(self, ageLower: int, ageUpper: int) -> Iterator[int]:
+        for bucket, start in self._ranges(ageLower, ageUpper):
+            for index in range(start, len(bucket)):
+                yield bucket[index][1]
+
+    def count(self, ageLower: int, ageUpper: int) -> int:
+        return sum(len(bucket) - start
+                   for bucket, start in self._ranges(ageLower, ageUpper))
+
+
+class CostIndex:
+    def __init__(self) -> None:
+        self._brackets: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __str__(self) -> str:
+        return f'(toys: {self._size}, age brackets: {len(self._brackets)})'
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def add(
+        self,
+        id_: int,
+        cents: int,
+        ageLower: Union[int, None],
+        ageUpper: Union[int, None]
+    ):
+        if ageLower is None or ageUpper is None:
+            return
+        bucket = self._brackets.get((ageLower, ageUpper))
+        if bucket is None:
+            bucket = self._brackets[(ageLower, ageUpper)] = []
+        insort(bucket, (cents, -id_))
+        self._size += 1
+
+    def remove(
+        self,
+        id_: int,
+        cents: int,
+        ageLower: Union[int, None],
+        ageUpper: Union[int, None]
+    ):
+        if ageLower is None or ageUpper is None:
+            return
+        bucket = self._brackets.get((ageLower, ageUpper))
+        if bucket is None:
+            return
+        position = bisect_left(bucket, (cents, -id_))
+        if position == len(bucket) or bucket[position] != (cents, -id_):
+            return
+        del bucket[position]
+        self._size -= 1
+        if not bucket:
+            del self._brackets[(ageLower, ageUpper)]
+
+    def clear(self):
+        self._brackets = {}
+        self._size = 0
+
+    def rebuild(self, entries: Iterable[Tuple[int, int, Union[int, None], Union[int, None]]]):
+        self.clear()
+        for id_, cents, ageLower, ageUpper in entries:
+            if ageLower is None or ageUpper is None:
+                continue
+            bucket = self._brackets.get((ageLower, ageUpper))
+            if bucket is None:
+                bucket = self._brackets[(ageLower, ageUpper)] = []
+            bucket.append((cents, -id_))
+            self._size += 1
+        for bucket in self._brackets.values():
+            bucket.sort()
+
+    def _candidates(self, ageLower: int, ageUpper: int, maxCents: int):
+        for (lower, upper), bucket in self._brackets.items():
+            if lower <= ageLower and upper >= ageUpper + 1:
+                end = bisect_right(bucket, (maxCents, 0))
+                if end:
+                    yield bucket, end
+
+    def mostExpensive(self, ageLower: int, ageUpper: int, maxCents: int) -> Union[int, None]:
+        best = max((bucket[end - 1]
+                    for bucket, end in self._candidates(ageLower, ageUpper, maxCents)),
+                   default=None)
+        return None if best is None else -best[1]
+
+    def topByCost(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        maxCents: int,
+        limit: int
+    ) -> List[int]:
+        if limit <= 0:
+            return []
+        candidates = []
+        for bucket, end in self._candidates(ageLower, ageUpper, maxCents):
+            candidates.extend(bucket[max(end - limit, 0):end])
+        return [-negativeId for _, negativeId in nlargest(limit, candidates)]
@@ -0,0 +1,318 @@
+import threading
+from datetime import date
+from heapq import nlargest, nsmallest
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Union
+
+from psycopg2.extras import NumericRange
+
+from ..models import Event, Toy
+from ..money import Money, increasedCents
+from .base import (
+    DEFAULT_PAGE_SIZE,
+    TOY_ORDER_COLUMNS,
+    StockRow,
+    canonicalAge,
+    stockRow,
+    toyPageKey
+)
+from .indexes import AgeIndex, CostIndex
+
+
+_TOY_ORDER_KEYS = {
+    'cost': lambda item: item[1][1],
+    'name': lambda item: item[1][0],
+    'quantity': lambda item: item[1][2],
+}
+
+_TOY_PAGE_KEYS = {
+    'id': lambda item: (item[0],),
+    'name': lambda item: (item[1][0], item[0]),
+    'cost': lambda item: (item[1][1], item[0]),
+    'quantity': lambda item: (item[1][2], item[0]),
+    'age': lambda item: (-1 if item[1][3] is None else item[1][3],
+                         -1 if item[1][4] is None else item[1][4],
+                         item[0]),
+}
+
+
+def _addToIndex(index: Dict, key, id_: int):
+    ids = index.get(key)
+    if ids is None:
+        ids = index[key] = set()
+    ids.add(id_)
+
+
+def _removeFromIndex(index: Dict, key, id_: int):
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(id_)
+        if not ids:
+            del index[key]
+
+
+class MemoryToyRepository:
+    def __init__(self) -> None:
+        self._toys: Dict[int, Tuple] = {}
+        self._byName: Dict[str, Set[int]] = {}
+        self._ages = AgeIndex()
+        self._costs = CostIndex()
+        self._nextId = 1
+        self._lock = threading.RLock()
+
+    def _record(self, toy: Toy) -> Tuple:
+        ageLower, ageUpper = canonicalAge(toy.age)
+        return toy.name, toy.cost.cents, toy.quantity, ageLower, ageUpper
+
+    def _toy(self, id_: int, record: Tuple) -> Toy:
+        name, cents, quantity, ageLower, ageUpper = record
+        age = (NumericRange(empty=True) if ageLower is None and ageUpper is None
+               else NumericRange(ageLower, ageUpper))
+        return Toy._createFromDBData(id_, name, Money(cents), quantity, age)
+
+    def _put(self, id_: int, record: Tuple):
+        previous = self._toys.get(id_)
+        if previous is not None:
+            _removeFromIndex(self._byName, previous[0], id_)
+            self._ages.remove(id_, previous[3], previous[4])
+            self._costs.remove(id_, previous[1], previous[3], previous[4])
+        self._toys[id_] = record
+        _addToIndex(self._byName, record[0], id_)
+        self._ages.add(id_, record[3], record[4])
+        self._costs.add(id_, record[1], record[3], record[4])
+
+    def _remove(self, id_: int):
+        record = self._toys.pop(id_, None)
+        if record is not None:
+            _removeFromIndex(self._byName, record[0], id_)
+            self._ages.remove(id_, record[3], record[4])
+            self._costs.remove(id_, record[1], record[3], record[4])
+
+    def _matchingAge(self, ageLower: int, ageUpper: int) -> List[Tuple[int, Tuple]]:
+        return [(id_, self._toys[id_])
+                for id_ in sorted(self._ages.matching(ageLower, ageUpper))]
+
+    def restore(self, toys: Iterable[Toy]):
+        with self._lock:
+            self._toys.clear()
+            self._byName.clear()
+            for toy in toys:
+                record = self._record(toy)
+                self._toys[toy.id] = record
+                _addToIndex(self._byName, record[0], toy.id)
+            self._ages.rebuild((id_, record[3], record[4])
+                               for id_, record in self._toys.items())
+            self._costs.rebuild((id_, record[1], record[3], record[4])
+                                for id_, record in self._toys.items())
+            self._nextId = max(self._toys, default=0) + 1
+
+    def store(self, id_: int, toy: Toy):
+        with self._lock:
+            self._put(id_, self._record(toy))
+            self._nextId = max(self._nextId, id_ + 1)
+
+    def create(self, toy: Toy) -> int:
+        with self._lock:
+            id_ = self._nextId
+            self._nextId += 1
+            self._put(id_, self._record(toy))
+        return id_
+
+    def createMany(self, toys: List[Toy]) -> List[int]:
+        with self._lock:
+            return [self.create(toy) for toy in toys]
+
+    def update(self, toy: Toy):
+        with self._lock:
+            if toy.id in self._toys:
+                self._put(toy.id, self._record(toy))
+
+    def updateMany(self, toys: List[Toy]):
+        with self._lock:
+            for toy in toys:
+                self.update(toy)
+
+    def delete(self, id_: int):
+        with self._lock:
+            self._remove(id_)
+
+    def deleteByName(self, name: str) -> int:
+        return self.deleteByNames([name])
+
+    def deleteByNames(self, names: List[str]) -> int:
+        with self._lock:
+            deleted = 0
+            for name in set(names):
+                for id_ in list(self._byName.get(name, ())):
+                    self._remove(id_)
+                    deleted += 1
+        return deleted
+
+    def selectById(self, id_: int) -> Toy:
+        with self._lock:
+            record = self._toys.get(id_)
+        if record is None:
+            raise ValueError('There is no toy with specified id.')
+        return self._toy(id_, record)
+
+    def selectAll(self) -> List[Toy]:
+        with self._lock:
+            items = list(self._toys.items())
+        return [self._toy(id_, record) for id_, record in items]
+
+    def iterAll(self, batchSize: int) -> Iterator[Toy]:
+        return iter(self.selectAll())
+
+    def iterStockRows(self, batchSize: int) -> Iterator[List[StockRow]]:
+        with self._lock:
+            rows = [stockRow(id_, *record[1:])
+                    for id_, record in self._toys.items()]
+        for start in range(0, len(rows), batchSize):
+            yield rows[start:start + batchSize]
+
+    def selectByAge(self, ageLower: int, ageUpper: int, orderBy: str = None) -> List[Toy]:
+        with self._lock:
+            items = self._matchingAge(ageLower, ageUpper)
+        if orderBy is not None and orderBy in TOY_ORDER_COLUMNS:
+            items.sort(key=_TOY_ORDER_KEYS[orderBy])
+        return [self._toy(id_, record) for id_, record in items]
+
+    def countByAge(self, ageLower: int, ageUpper: int) -> int:
+        with self._lock:
+            return self._ages.count(ageLower, ageUpper)
+
+    def selectMostExpensive(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Money
+    ) -> Union[Toy, None]:
+        with self._lock:
+            id_ = self._costs.mostExpensive(ageLower, ageUpper, maxCost.cents)
+            if id_ is None:
+                return None
+            return self._toy(id_, self._toys[id_])
+
+    def selectTopByCost(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Money,
+        limit: int
+    ) -> List[Toy]:
+        with self._lock:
+            return [self._toy(id_, self._toys[id_]) for id_ in
+                    self._costs.topByCost(ageLower, ageUpper, maxCost.cents, limit)]
+
+    def selectPage(
+        self,
+        orderBy: str = 'id',
+        descending: bool = False,
+        after: Union[Toy, None] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[Toy]:
+        if orderBy not in _TOY_PAGE_KEYS:
+            raise ValueError(f'Unknown sort column: {orderBy}')
+        key = _TOY_PAGE_KEYS[orderBy]
+        with self._lock:
+            items = self._toys.items()
+            if after is not None:
+                afterKey = toyPageKey(after, orderBy)
+                items = [item for item in items
+                         if (key(item) < afterKey if descending
+                             else key(item) > afterKey)]
+            select = nlargest if descending else nsmallest
+            return [self._toy(id_, record)
+                    for id_, record in select(limit, items, key=key)]
+
+    def increaseCostForAge(self, ageLower: int, ageUpper: int, multiplierAsPercentage: int):
+        with self._lock:
+            for id_, record in self._matchingAge(ageLower, ageUpper):
+                self._put(id_, (
+                    record[0],
+                    increasedCents(record[1], multiplierAsPercentage),
+                    *record[2:]
+                ))
+
+
+class MemoryEventRepository:
+    def __init__(self) -> None:
+        self._events: Dict[int, Tuple[str, date]] = {}
+        self._byDate: Dict[date, Set[int]] = {}
+        self._nextId = 1
+        self._lock = threading.RLock()
+
+    def _put(self, id_: int, record: Tuple[str, date]):
+        previous = self._events.get(id_)
+        if previous is not None:
+            _removeFromIndex(self._byDate, previous[1], id_)
+        self._events[id_] = record
+        _addToIndex(self._byDate, record[1], id_)
+
+    def _select(self, ids) -> List[Event]:
+        return [Event._createFromDBData(id_, *self._events[id_])
+                for id_ in sorted(ids)]
+
+    def create(self, event: Event) -> int:
+        with self._lock:
+            id_ = self._nextId
+            self._nextId += 1
+            self._put(id_, (event.description, event.dateCreated))
+        return id_
+
+    def createMany(self, events: List[Event]) -> List[int]:
+        with self._lock:
+            return [self.create(event) for event in events]
+
+    def update(self, event: Event):
+        with self._lock:
+            if event.id in self._events:
+                self._put(event.id, (event.description, event.dateCreated))
+
+    def updateMany(self, events: List[Event]):
+        with self._lock:
+            for event in events:
+                self.update(event)
+
+    def delete(self, id_: int):
+        with self._lock:
+            record = self._events.pop(id_, None)
+            if record is not None:
+                _removeFromIndex(self._byDate, record[1], id_)
+
+    def selectById(self, id_: int) -> Event:
+        with self._lock:
+            record = self._events.get(id_)
+        if record is None:
+            raise ValueError('There is no event with such id')
+        return Event._createFromDBData(id_, *record)
+
+    def selectByDate(self, dateCreated: date) -> List[Event]:
+        with self._lock:
+            return self._select(self._byDate.get(dateCreated, ()))
+
+    def selectSince(self, dateCreated: date) -> List[Event]:
+        with self._lock:
+            return self._select(id_ for id_, record in self._events.items()
+                                if record[1] >= dateCreated)
+
+    def selectAll(self) -> List[Event]:
+        with self._lock:
+            return self._select(self._events)
+
+
+class MemoryStorage:
+    def __init__(self) -> None:
+        self.toys = MemoryToyRepository()
+        self.events = MemoryEventRepository()
+
+    def isConnected(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+    def __str__(self) -> str:
+        return 'memory'
+
+    def __repr__(self) -> str:
+        return self.__str__()
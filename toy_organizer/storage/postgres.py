@@ -0,0 +1,464 @@
+from contextlib import contextmanager
+from datetime import date
+from typing import Iterator, List, Union
+
+from psycopg2.errors import QueryCanceled
+from psycopg2.extensions import cursor as PlainCursor
+from psycopg2.extras import execute_values
+
+from ..cancellation import interruptible
+from ..config import DBConfig, StatementTimeouts
+from ..models import TOY_SELECT_LIST, Event, Toy
+from ..money import Money
+from ..repricing import BulkRepricer
+from .base import (
+    DEFAULT_PAGE_SIZE,
+    NO_AGE_LOWER,
+    NO_AGE_UPPER,
+    StockRow,
+    toyPageKey
+)
+
+
+_PAGE_COLUMNS = {
+    'id': ['id'],
+    'name': ['name', 'id'],
+    'cost': ['cost', 'id'],
+    'quantity': ['quantity', 'id'],
+    'age': ['coalesce(lower(age_restriction), -1)',
+            'coalesce(upper(age_restriction), -1)',
+            'id'],
+}
+
+_PAGE_PLACEHOLDERS = {'cost': ['%s::money', '%s']}
+
+_STOCK_QUERY = ('SELECT id, coalesce((cost::numeric * 100)::bigint, 0), '
+                'coalesce(quantity, 0), '
+                f'coalesce(lower(age_restriction), {NO_AGE_LOWER}), '
+                f'coalesce(upper(age_restriction), {NO_AGE_UPPER}) '
+                'FROM toys ORDER BY id')
+
+
+def _toyFromDBData(data) -> Toy:
+    return Toy._createFromDBData(
+        data['id'],
+        data['name'],
+        Money(data['cost_cents']),
+        data['quantity'],
+        data['age_restriction']
+    )
+
+
+def _eventFromDBData(data) -> Event:
+    return Event._createFromDBData(
+        data['id'],
+        data['description'],
+        data['date_created']
+    )
+
+
+@contextmanager
+def _limitedStatement(dBConnection, cursor, operation: str):
+    timeout = StatementTimeouts.get(operation)
+    try:
+        with interruptible(dBConnection.cancel):
+            if timeout is not None:
+                cursor.execute('SET LOCAL statement_timeout = %s', (timeout,))
+            yield
+            if timeout is not None:
+                cursor.execute('SET LOCAL statement_timeout TO DEFAULT')
+    except QueryCanceled:
+        dBConnection.rollback()
+        raise
+
+
+class PostgresToyRepository:
+    def create(self, toy: Toy) -> int:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO toys(name, cost, quantity, age_restriction) '
+                f'VALUES(\'{toy.name}\', '
+                f'{toy.cost}, '
+                f'{toy.quantity}, '
+                f'\'{toy.age}\') '
+                f'RETURNING id;'
+            )
+            id_ = cursor.fetchone()['id']
+
+        dBConnection.commit()
+        return id_
+
+    def createMany(self, toys: List[Toy]) -> List[int]:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            rows = execute_values(
+                cursor,
+                'INSERT INTO toys(name, cost, quantity, age_restriction) '
+                'VALUES %s RETURNING id;',
+                [(toy.name, toy.cost, toy.quantity, toy.age) for toy in toys],
+                template='(%s, %s::numeric::money, %s, %s)',
+                page_size=len(toys),
+                fetch=True
+            )
+        dBConnection.commit()
+        return [row['id'] for row in rows]
+
+    def update(self, toy: Toy):
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE toys '
+                f'SET name = \'{toy.name}\', '
+                f'cost = {toy.cost}, '
+                f'quantity = {toy.quantity}, '
+                f'age_restriction = \'{toy.age}\' '
+                f'WHERE id = {toy.id};'
+            )
+        dBConnection.commit()
+
+    def updateMany(self, toys: List[Toy]):
+        dBConnection = DBConfig.getDBConnection()
+
+        try:
+            with dBConnection.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    'UPDATE toys '
+                    'SET name = data.name, cost = data.cost::money, '
+                    'quantity = data.quantity, age_restriction = data.age '
+                    'FROM (VALUES %s) AS data(id, name, cost, quantity, age) '
+                    'WHERE toys.id = data.id;',
+                    [(toy.id, toy.name, toy.cost, toy.quantity, toy.age)
+                     for toy in toys],
+                    template='(%s, %s, %s::numeric, %s, %s::int4range)',
+                    page_size=len(toys)
+                )
+            dBConnection.commit()
+        except Exception:
+            dBConnection.rollback()
+            raise
+
+    def delete(self, id_: int):
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM toys '
+                f'WHERE id = {id_};'
+            )
+        dBConnection.commit()
+
+    def deleteByName(self, name: str) -> int:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM toys WHERE name = \'{name}\'')
+            deleted = cursor.rowcount
+
+        dBConnection.commit()
+        return deleted
+
+    def deleteByNames(self, names: List[str]) -> int:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute('DELETE FROM toys WHERE name = ANY(%s);', (names,))
+            deleted = cursor.rowcount
+
+        dBConnection.commit()
+        return deleted
+
+    def selectById(self, id_: int) -> Toy:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute(f'SELECT {TOY_SELECT_LIST} FROM toys WHERE id = {id_};')
+            data = cursor.fetchone()
+            if not data:
+                raise ValueError('There is no toy with specified id.')
+        return _toyFromDBData(data)
+
+    def selectAll(self) -> List[Toy]:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor, \
+                _limitedStatement(dBConnection, cursor, 'toys.selectAll'):
+            cursor.execute(f'SELECT {TOY_SELECT_LIST} FROM toys;')
+            rows = cursor.fetchall()
+        return [_toyFromDBData(data) for data in rows]
+
+    def iterAll(self, batchSize: int) -> Iterator[Toy]:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor(name='toys_iter_all') as cursor:
+            cursor.itersize = batchSize
+            cursor.execute(f'SELECT {TOY_SELECT_LIST} FROM toys ORDER BY id;')
+            for data in cursor:
+                yield _toyFromDBData(data)
+        dBConnection.commit()
+
+    def iterStockRows(self, batchSize: int) -> Iterator[List[StockRow]]:
+        dBConnection = DBConfig.getDBConnection()
+
+        try:
+            with dBConnection.cursor(
+                name='toys_stock_rows',
+                cursor_factory=PlainCursor
+            ) as cursor:
+                cursor.itersize = batchSize
+                cursor.execute(_STOCK_QUERY)
+                while True:
+                    rows = cursor.fetchmany(batchSize)
+                    if not rows:
+                        break
+                    yield rows
+        finally:
+            dBConnection.commit()
+
+    def selectByAge(self, ageLower: int, ageUpper: int, orderBy: str = None) -> List[Toy]:
+        dBConnection = DBConfig.getDBConnection()
+        with dBConnection.cursor() as cursor, \
+                _limitedStatement(dBConnection, cursor, 'toys.selectByAge'):
+            query = (f'SELECT {TOY_SELECT_LIST} FROM toys '
+                     f'WHERE lower(age_restriction) <= {ageLower} '
+                     f'AND upper(age_restriction) >= {ageUpper + 1} ')
+            if orderBy is not None and orderBy in {'cost', 'name', 'quantity'}:
+                query += f'ORDER BY {orderBy}'
+
+            cursor.execute(query)
+            rows = cursor.fetchall()
+        return [_toyFromDBData(data) for data in rows]
+
+    def countByAge(self, ageLower: int, ageUpper: int) -> int:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor, \
+                _limitedStatement(dBConnection, cursor, 'toys.countByAge'):
+            cursor.execute(
+                'SELECT count(*) AS count FROM toys '
+                'WHERE lower(age_restriction) <= %s '
+                'AND upper(age_restriction) >= %s;',
+                (ageLower, ageUpper + 1)
+            )
+            return cursor.fetchone()['count']
+
+    def selectMostExpensive(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Money
+    ) -> Union[Toy, None]:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor, \
+                _limitedStatement(dBConnection, cursor,
+                                  'toys.selectMostExpensive'):
+            query = (
+                f'SELECT {TOY_SELECT_LIST} FROM toys '
+                f'WHERE lower(age_restriction) <= {ageLower} '
+                f'AND upper(age_restriction) >= {ageUpper + 1} '
+                f'AND cost <= {maxCost}::money '
+                'ORDER BY cost DESC '
+                'LIMIT 1'
+            )
+            cursor.execute(query)
+
+            data = cursor.fetchone()
+        return _toyFromDBData(data) if data else None
+
+    def selectTopByCost(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Money,
+        limit: int
+    ) -> List[Toy]:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor, \
+                _limitedStatement(dBConnection, cursor, 'toys.selectTopByCost'):
+            cursor.execute(
+                f'SELECT {TOY_SELECT_LIST} FROM toys '
+                'WHERE lower(age_restriction) <= %s '
+                'AND upper(age_restriction) >= %s '
+                'AND cost <= %s::money '
+                'ORDER BY cost DESC, id '
+                'LIMIT %s;',
+                (ageLower, ageUpper + 1, maxCost, limit)
+            )
+            rows = cursor.fetchall()
+        return [_toyFromDBData(data) for data in rows]
+
+    def selectPage(
+        self,
+        orderBy: str = 'id',
+        descending: bool = False,
+        after: Union[Toy, None] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[Toy]:
+        if orderBy not in _PAGE_COLUMNS:
+            raise ValueError(f'Unknown sort column: {orderBy}')
+        columns = _PAGE_COLUMNS[orderBy]
+        direction = ' DESC' if descending else ''
+        query = f'SELECT {TOY_SELECT_LIST} FROM toys '
+        parameters = []
+        if after is not None:
+            placeholders = _PAGE_PLACEHOLDERS.get(orderBy, ['%s'] * len(columns))
+            query += (f'WHERE ({", ".join(columns)}) {"<" if descending else ">"} '
+                      f'({", ".join(placeholders)}) ')
+            parameters.extend(toyPageKey(after, orderBy))
+        query += ('ORDER BY ' + ', '.join(column + direction for column in columns)
+                  + ' LIMIT %s;')
+        parameters.append(limit)
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor, \
+                _limitedStatement(dBConnection, cursor, 'toys.selectPage'):
+            cursor.execute(query, parameters)
+            rows = cursor.fetchall()
+        return [_toyFromDBData(data) for data in rows]
+
+    def increaseCostForAge(self, ageLower: int, ageUpper: int, multiplierAsPercentage: int):
+        BulkRepricer().apply(ageLower, ageUpper, multiplierAsPercentage)
+
+
+class PostgresEventRepository:
+    def create(self, event: Event) -> int:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO events(description, date_created) '
+                f'VALUES(\'{event.description}\', '
+                f'\'{event.dateCreated}\') '
+                f'RETURNING id;'
+            )
+            id_ = cursor.fetchone()['id']
+
+        dBConnection.commit()
+        return id_
+
+    def createMany(self, events: List[Event]) -> List[int]:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            rows = execute_values(
+                cursor,
+                'INSERT INTO events(description, date_created) VALUES %s '
+                'RETURNING id;',
+                [(event.description, event.dateCreated) for event in events],
+                page_size=len(events),
+                fetch=True
+            )
+        dBConnection.commit()
+        return [row['id'] for row in rows]
+
+    def update(self, event: Event):
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE events '
+                f'SET description = \'{event.description}\', '
+                f'date_created = \'{event.dateCreated}\' '
+                f'WHERE id = {event.id};'
+            )
+        dBConnection.commit()
+
+    def updateMany(self, events: List[Event]):
+        dBConnection = DBConfig.getDBConnection()
+
+        try:
+            with dBConnection.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    'UPDATE events '
+                    'SET description = data.description, '
+                    'date_created = data.date_created '
+                    'FROM (VALUES %s) AS data(id, description, date_created) '
+                    'WHERE events.id = data.id;',
+                    [(event.id, event.description, event.dateCreated)
+                     for event in events],
+                    template='(%s, %s, %s::date)',
+                    page_size=len(events)
+                )
+            dBConnection.commit()
+        except Exception:
+            dBConnection.rollback()
+            raise
+
+    def delete(self, id_: int):
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM events '
+                f'WHERE id = {id_};'
+            )
+        dBConnection.commit()
+
+    def selectById(self, id_: int) -> Event:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor:
+            query = f'SELECT * FROM events WHERE id = {id_}'
+            cursor.execute(query)
+            data = cursor.fetchone()
+            if data is None:
+                raise ValueError('There is no event with such id')
+        return _eventFromDBData(data)
+
+    def selectByDate(self, dateCreated: date) -> List[Event]:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor, \
+                _limitedStatement(dBConnection, cursor, 'events.selectByDate'):
+            query = f'SELECT * FROM events WHERE date_created = \'{dateCreated}\''
+            cursor.execute(query)
+            rows = cursor.fetchall()
+        return [_eventFromDBData(data) for data in rows]
+
+    def selectSince(self, dateCreated: date) -> List[Event]:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor, \
+                _limitedStatement(dBConnection, cursor, 'events.selectSince'):
+            cursor.execute(
+                'SELECT * FROM events WHERE date_created >= %s;',
+                (dateCreated,)
+            )
+            rows = cursor.fetchall()
+        return [_eventFromDBData(data) for data in rows]
+
+    def selectAll(self) -> List[Event]:
+        dBConnection = DBConfig.getDBConnection()
+
+        with dBConnection.cursor() as cursor, \
+                _limitedStatement(dBConnection, cursor, 'events.selectAll'):
+            query = 'SELECT * FROM events '
+            cursor.execute(query)
+            rows = cursor.fetchall()
+        return [_eventFromDBData(data) for data in rows]
+
+
+class PostgresStorage:
+    def __init__(self) -> None:
+        self.toys = PostgresToyRepository()
+        self.events = PostgresEventRepository()
+
+    def isConnected(self) -> bool:
+        return (DBConfig.hasDBConnection()
+                and DBConfig.getDBConnection().closed == 0)
+
+    def close(self):
+        DBConfig.closeDBConnection()
+
+    def __str__(self) -> str:
+        return 'PostgreSQL'
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,178 @@
+import threading
+from typing import Iterator, List, Union
+
+from ..changes import ChangeBus, ModelChange, ToysChanged
+from ..models import Toy
+from ..money import Money
+from .base import DEFAULT_PAGE_SIZE, StockRow, Storage
+from .memory import MemoryToyRepository
+
+
+DEFAULT_BATCH_SIZE = 50_000
+
+
+class ResidentToyRepository:
+    def __init__(self, storage: 'ResidentStorage') -> None:
+        self._storage = storage
+        self._mirror = MemoryToyRepository()
+        self._loaded = False
+        self._lock = threading.RLock()
+
+# region Properties
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+# endregion
+
+    @property
+    def _target(self):
+        return self._storage.target.toys
+
+    def resident(self) -> MemoryToyRepository:
+        with self._lock:
+            if not self._loaded:
+                self._mirror.restore(
+                    self._target.iterAll(self._storage.batchSize))
+                self._loaded = True
+            return self._mirror
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+            self._mirror.restore([])
+
+    def _write(self, write, apply):
+        with self._lock:
+            try:
+                result = write()
+            except Exception:
+                self.invalidate()
+                raise
+            if self._loaded:
+                apply(result)
+            return result
+
+    def create(self, toy: Toy) -> int:
+        return self._write(
+            lambda: self._target.create(toy),
+            lambda id_: self._mirror.store(id_, toy))
+
+    def createMany(self, toys: List[Toy]) -> List[int]:
+        def apply(ids: List[int]):
+            for id_, toy in zip(ids, toys):
+                self._mirror.store(id_, toy)
+
+        return self._write(lambda: self._target.createMany(toys), apply)
+
+    def update(self, toy: Toy):
+        self._write(
+            lambda: self._target.update(toy),
+            lambda _: self._mirror.update(toy))
+
+    def updateMany(self, toys: List[Toy]):
+        self._write(
+            lambda: self._target.updateMany(toys),
+            lambda _: self._mirror.updateMany(toys))
+
+    def delete(self, id_: int):
+        self._write(
+            lambda: self._target.delete(id_),
+            lambda _: self._mirror.delete(id_))
+
+    def deleteByName(self, name: str) -> int:
+        return self._write(
+            lambda: self._target.deleteByName(name),
+            lambda _: self._mirror.deleteByName(name))
+
+    def deleteByNames(self, names: List[str]) -> int:
+        return self._write(
+            lambda: self._target.deleteByNames(names),
+            lambda _: self._mirror.deleteByNames(names))
+
+    def selectById(self, id_: int) -> Toy:
+        return self.resident().selectById(id_)
+
+    def selectAll(self) -> List[Toy]:
+        return self.resident().selectAll()
+
+    def iterAll(self, batchSize: int) -> Iterator[Toy]:
+        return self.resident().iterAll(batchSize)
+
+    def iterStockRows(self, batchSize: int) -> Iterator[List[StockRow]]:
+        return self.resident().iterStockRows(batchSize)
+
+    def selectByAge(self, ageLower: int, ageUpper: int, orderBy: str = None) -> List[Toy]:
+        return self.resident().selectByAge(ageLower, ageUpper, orderBy)
+
+    def countByAge(self, ageLower: int, ageUpper: int) -> int:
+        return self.resident().countByAge(ageLower, ageUpper)
+
+    def selectMostExpensive(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Money
+    ) -> Union[Toy, None]:
+        return self.resident().selectMostExpensive(ageLower, ageUpper, maxCost)
+
+    def selectTopByCost(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Money,
+        limit: int
+    ) -> List[Toy]:
+        return self.resident().selectTopByCost(
+            ageLower, ageUpper, maxCost, limit)
+
+    def selectPage(
+        self,
+        orderBy: str = 'id',
+        descending: bool = False,
+        after: Union[Toy, None] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[Toy]:
+        return self._target.selectPage(orderBy, descending, after, limit)
+
+    def increaseCostForAge(self, ageLower: int, ageUpper: int, multiplierAsPercentage: int):
+        self._write(
+            lambda: self._target.increaseCostForAge(
+                ageLower, ageUpper, multiplierAsPercentage),
+            lambda _: self._mirror.increaseCostForAge(
+                ageLower, ageUpper, multiplierAsPercentage))
+
+
+class ResidentStorage:
+    def __init__(self, target: Storage, batchSize: int = DEFAULT_BATCH_SIZE) -> None:
+        self._target = target
+        self.batchSize = batchSize
+        self.toys = ResidentToyRepository(self)
+        self.events = target.events
+        ChangeBus.listen(ToysChanged, self.onToysChanged)
+
+# region Properties
+    @property
+    def target(self) -> Storage:
+        return self._target
+# endregion
+
+    def reload(self):
+        self.toys.invalidate()
+
+    def onToysChanged(self, change: ModelChange):
+        if change.external:
+            self.reload()
+
+    def isConnected(self) -> bool:
+        return self._target.isConnected()
+
+    def close(self):
+        ChangeBus.unlisten(ToysChanged, self.onToysChanged)
+        self.toys.invalidate()
+        self._target.close()
+
+    def __str__(self) -> str:
+        return f'resident {self._target}'
+
+    def __repr__(self) -> str:
+        return self.__str__()
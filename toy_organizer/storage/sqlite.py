@@ -0,0 +1,343 @@
+import sqlite3
+from datetime import date
+from typing import Dict, Iterator, List, Tuple, Union
+
+from psycopg2.extras import NumericRange
+
+from ..cancellation import interruptible
+from ..models import Event, Toy
+from ..money import Money, increasedCents
+from .base import (
+    DEFAULT_PAGE_SIZE,
+    NO_AGE_LOWER,
+    NO_AGE_UPPER,
+    TOY_ORDER_COLUMNS,
+    StockRow,
+    canonicalAge,
+    toyPageKey
+)
+
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS toys (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    cost_cents INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    age_lower INTEGER,
+    age_upper INTEGER
+);
+CREATE INDEX IF NOT EXISTS toys_name ON toys(name);
+CREATE INDEX IF NOT EXISTS toys_age ON toys(age_lower, age_upper);
+CREATE INDEX IF NOT EXISTS toys_cost ON toys(cost_cents);
+CREATE INDEX IF NOT EXISTS toys_quantity ON toys(quantity);
+CREATE INDEX IF NOT EXISTS toys_age_page
+    ON toys(coalesce(age_lower, -1), coalesce(age_upper, -1));
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    description TEXT NOT NULL,
+    date_created TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_date_created ON events(date_created);
+'''
+
+_ORDER_COLUMNS = {'cost': 'cost_cents', 'name': 'name', 'quantity': 'quantity'}
+
+_PAGE_COLUMNS = {
+    'id': ['id'],
+    'name': ['name', 'id'],
+    'cost': ['cost_cents', 'id'],
+    'quantity': ['quantity', 'id'],
+    'age': ['coalesce(age_lower, -1)', 'coalesce(age_upper, -1)', 'id'],
+}
+
+
+def pageQuery(
+    orderBy: str,
+    descending: bool,
+    after: Union[Toy, None],
+    limit: int,
+    pageColumns: Dict[str, List[str]] = _PAGE_COLUMNS
+) -> Tuple[str, tuple]:
+    if orderBy not in pageColumns:
+        raise ValueError(f'Unknown sort column: {orderBy}')
+    columns = pageColumns[orderBy]
+    direction = ' DESC' if descending else ''
+    query = 'SELECT * FROM toys '
+    parameters = ()
+    if after is not None:
+        parameters = tuple(toyPageKey(after, orderBy))
+        query += (f'WHERE ({", ".join(columns)}) {"<" if descending else ">"} '
+                  f'({", ".join("?" for _ in columns)}) ')
+    query += 'ORDER BY ' + ', '.join(column + direction for column in columns)
+    return query + ' LIMIT ?', parameters + (limit,)
+
+
+def _toyFromRow(row) -> Toy:
+    age = (NumericRange(empty=True) if row['age_lower'] is None
+           and row['age_upper'] is None
+           else NumericRange(row['age_lower'], row['age_upper']))
+    return Toy._createFromDBData(
+        row['id'],
+        row['name'],
+        Money(row['cost_cents']),
+        row['quantity'],
+        age
+    )
+
+
+def _toyParameters(toy: Toy) -> tuple:
+    ageLower, ageUpper = canonicalAge(toy.age)
+    return toy.name, toy.cost.cents, toy.quantity, ageLower, ageUpper
+
+
+def _eventFromRow(row) -> Event:
+    return Event._createFromDBData(
+        row['id'],
+        row['description'],
+        date.fromisoformat(row['date_created'])
+    )
+
+
+class SQLiteToyRepository:
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self._connection = connection
+
+    def create(self, toy: Toy) -> int:
+        with self._connection:
+            cursor = self._connection.execute(
+                'INSERT INTO toys(name, cost_cents, quantity, age_lower, age_upper) '
+                'VALUES(?, ?, ?, ?, ?)',
+                _toyParameters(toy)
+            )
+        return cursor.lastrowid
+
+    def createMany(self, toys: List[Toy]) -> List[int]:
+        with self._connection:
+            return [self._connection.execute(
+                'INSERT INTO toys(name, cost_cents, quantity, age_lower, age_upper) '
+                'VALUES(?, ?, ?, ?, ?)',
+                _toyParameters(toy)
+            ).lastrowid for toy in toys]
+
+    def update(self, toy: Toy):
+        with self._connection:
+            self._connection.execute(
+                'UPDATE toys SET name = ?, cost_cents = ?, quantity = ?, '
+                'age_lower = ?, age_upper = ? WHERE id = ?',
+                _toyParameters(toy) + (toy.id,)
+            )
+
+    def updateMany(self, toys: List[Toy]):
+        with self._connection:
+            self._connection.executemany(
+                'UPDATE toys SET name = ?, cost_cents = ?, quantity = ?, '
+                'age_lower = ?, age_upper = ? WHERE id = ?',
+                (_toyParameters(toy) + (toy.id,) for toy in toys)
+            )
+
+    def delete(self, id_: int):
+        with self._connection:
+            self._connection.execute('DELETE FROM toys WHERE id = ?', (id_,))
+
+    def deleteByName(self, name: str) -> int:
+        with self._connection:
+            return self._connection.execute(
+                'DELETE FROM toys WHERE name = ?', (name,)).rowcount
+
+    def deleteByNames(self, names: List[str]) -> int:
+        with self._connection:
+            return sum(self._connection.execute(
+                'DELETE FROM toys WHERE name = ?', (name,)).rowcount
+                for name in set(names))
+
+    def selectById(self, id_: int) -> Toy:
+        row = self._connection.execute(
+            'SELECT * FROM toys WHERE id = ?', (id_,)).fetchone()
+        if row is None:
+            raise ValueError('There is no toy with specified id.')
+        return _toyFromRow(row)
+
+    def selectAll(self) -> List[Toy]:
+        with interruptible(self._connection.interrupt):
+            return [_toyFromRow(row)
+                    for row in self._connection.execute('SELECT * FROM toys')]
+
+    def iterAll(self, batchSize: int) -> Iterator[Toy]:
+        cursor = self._connection.execute('SELECT * FROM toys ORDER BY id')
+        while True:
+            rows = cursor.fetchmany(batchSize)
+            if not rows:
+                return
+            for row in rows:
+                yield _toyFromRow(row)
+
+    def iterStockRows(self, batchSize: int) -> Iterator[List[StockRow]]:
+        cursor = self._connection.execute(
+            'SELECT id, cost_cents, quantity, '
+            f'coalesce(age_lower, {NO_AGE_LOWER}), '
+            f'coalesce(age_upper, {NO_AGE_UPPER}) '
+            'FROM toys ORDER BY id')
+        while True:
+            rows = cursor.fetchmany(batchSize)
+            if not rows:
+                return
+            yield [tuple(row) for row in rows]
+
+    def selectByAge(self, ageLower: int, ageUpper: int, orderBy: str = None) -> List[Toy]:
+        query = 'SELECT * FROM toys WHERE age_lower <= ? AND age_upper >= ? '
+        if orderBy is not None and orderBy in TOY_ORDER_COLUMNS:
+            query += f'ORDER BY {_ORDER_COLUMNS[orderBy]}'
+        with interruptible(self._connection.interrupt):
+            return [_toyFromRow(row) for row in self._connection.execute(
+                query, (ageLower, ageUpper + 1))]
+
+    def countByAge(self, ageLower: int, ageUpper: int) -> int:
+        with interruptible(self._connection.interrupt):
+            return self._connection.execute(
+                'SELECT count(*) FROM toys '
+                'WHERE age_lower <= ? AND age_upper >= ?',
+                (ageLower, ageUpper + 1)
+            ).fetchone()[0]
+
+    def selectMostExpensive(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Money
+    ) -> Union[Toy, None]:
+        with interruptible(self._connection.interrupt):
+            row = self._connection.execute(
+                'SELECT * FROM toys '
+                'WHERE age_lower <= ? AND age_upper >= ? AND cost_cents <= ? '
+                'ORDER BY cost_cents DESC '
+                'LIMIT 1',
+                (ageLower, ageUpper + 1, maxCost.cents)
+            ).fetchone()
+        return _toyFromRow(row) if row is not None else None
+
+    def selectTopByCost(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Money,
+        limit: int
+    ) -> List[Toy]:
+        with interruptible(self._connection.interrupt):
+            return [_toyFromRow(row) for row in self._connection.execute(
+                'SELECT * FROM toys '
+                'WHERE age_lower <= ? AND age_upper >= ? AND cost_cents <= ? '
+                'ORDER BY cost_cents DESC, id '
+                'LIMIT ?',
+                (ageLower, ageUpper + 1, maxCost.cents, limit))]
+
+    def selectPage(
+        self,
+        orderBy: str = 'id',
+        descending: bool = False,
+        after: Union[Toy, None] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[Toy]:
+        query, parameters = pageQuery(orderBy, descending, after, limit)
+        with interruptible(self._connection.interrupt):
+            return [_toyFromRow(row)
+                    for row in self._connection.execute(query, parameters)]
+
+    def increaseCostForAge(self, ageLower: int, ageUpper: int, multiplierAsPercentage: int):
+        with self._connection:
+            self._connection.execute(
+                'UPDATE toys SET cost_cents = increased_cents(cost_cents, ?) '
+                'WHERE age_lower <= ? AND age_upper >= ?',
+                (multiplierAsPercentage, ageLower, ageUpper + 1)
+            )
+
+
+class SQLiteEventRepository:
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self._connection = connection
+
+    def create(self, event: Event) -> int:
+        with self._connection:
+            cursor = self._connection.execute(
+                'INSERT INTO events(description, date_created) VALUES(?, ?)',
+                (event.description, event.dateCreated.isoformat())
+            )
+        return cursor.lastrowid
+
+    def createMany(self, events: List[Event]) -> List[int]:
+        with self._connection:
+            return [self._connection.execute(
+                'INSERT INTO events(description, date_created) VALUES(?, ?)',
+                (event.description, event.dateCreated.isoformat())
+            ).lastrowid for event in events]
+
+    def update(self, event: Event):
+        with self._connection:
+            self._connection.execute(
+                'UPDATE events SET description = ?, date_created = ? '
+                'WHERE id = ?',
+                (event.description, event.dateCreated.isoformat(), event.id)
+            )
+
+    def updateMany(self, events: List[Event]):
+        with self._connection:
+            self._connection.executemany(
+                'UPDATE events SET description = ?, date_created = ? '
+                'WHERE id = ?',
+                ((event.description, event.dateCreated.isoformat(), event.id)
+                 for event in events)
+            )
+
+    def delete(self, id_: int):
+        with self._connection:
+            self._connection.execute('DELETE FROM events WHERE id = ?', (id_,))
+
+    def selectById(self, id_: int) -> Event:
+        row = self._connection.execute(
+            'SELECT * FROM events WHERE id = ?', (id_,)).fetchone()
+        if row is None:
+            raise ValueError('There is no event with such id')
+        return _eventFromRow(row)
+
+    def selectByDate(self, dateCreated: date) -> List[Event]:
+        with interruptible(self._connection.interrupt):
+            return [_eventFromRow(row) for row in self._connection.execute(
+                'SELECT * FROM events WHERE date_created = ?',
+                (dateCreated.isoformat(),))]
+
+    def selectSince(self, dateCreated: date) -> List[Event]:
+        with interruptible(self._connection.interrupt):
+            return [_eventFromRow(row) for row in self._connection.execute(
+                'SELECT * FROM events WHERE date_created >= ?',
+                (dateCreated.isoformat(),))]
+
+    def selectAll(self) -> List[Event]:
+        with interruptible(self._connection.interrupt):
+            return [_eventFromRow(row)
+                    for row in self._connection.execute('SELECT * FROM events')]
+
+
+class SQLiteStorage:
+    def __init__(self, path: str = ':memory:') -> None:
+        self._path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.create_function(
+            'increased_cents', 2, increasedCents, deterministic=True)
+        self._connection.executescript(_SCHEMA)
+        self.toys = SQLiteToyRepository(self._connection)
+        self.events = SQLiteEventRepository(self._connection)
+
+    def isConnected(self) -> bool:
+        return self._connection is not None
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __str__(self) -> str:
+        return f'SQLite ({self._path})'
+
+    def __repr__(self) -> str:
+        return self.__str__()
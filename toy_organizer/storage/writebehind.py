@@ -0,0 +1,412 @@
+import atexit
+import logging
+import threading
+from contextlib import nullcontext
+from datetime import date
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Tuple, Union
+
+from psycopg2 import OperationalError
+
+from ..config import DBConfig
+from ..models import Event, Toy
+from ..money import Money
+from .base import (
+    DEFAULT_PAGE_SIZE,
+    EventRepository,
+    StockRow,
+    Storage,
+    ToyRepository,
+    toyPageKey,
+    toyStockRow
+)
+
+if TYPE_CHECKING:
+    from psycopg2.extensions import connection
+
+
+logger = logging.getLogger(__name__)
+
+
+def _copyToy(toy: Toy) -> Toy:
+    return Toy._createFromDBData(
+        toy.id, toy.name, toy.cost, toy.quantity, toy.age)
+
+
+def _copyEvent(event: Event) -> Event:
+    return Event._createFromDBData(
+        event.id, event.description, event.dateCreated)
+
+
+def _overlay(items: List, pending: Dict, copy: Callable) -> List:
+    return [copy(pending[item.id]) if item.id in pending else item
+            for item in items]
+
+
+def _inPage(key: Tuple, first: Union[Tuple, None], last: Union[Tuple, None],
+            descending: bool) -> bool:
+    if descending:
+        return ((first is None or key < first)
+                and (last is None or key >= last))
+    return (first is None or key > first) and (last is None or key <= last)
+
+
+class _WriteBehindRepository:
+    def __init__(
+        self,
+        storage: 'WriteBehindStorage',
+        target: Union[ToyRepository, EventRepository]
+    ) -> None:
+        self._storage = storage
+        self._target = target
+        self._pending: Dict[int, object] = {}
+        self._parked: Dict[int, object] = {}
+        self._attempts = 0
+
+    def _forget(self, items: List):
+        for item in items:
+            if self._pending.get(item.id) is item:
+                del self._pending[item.id]
+
+    def _flush(self):
+        if not self._pending:
+            return
+        items = list(self._pending.values())
+        try:
+            with self._storage.flushConnection():
+                self._target.updateMany(items)
+        except OperationalError:
+            raise
+        except Exception:
+            self._attempts += 1
+            if self._attempts < self._storage.maxAttempts:
+                raise
+            self._park(items)
+        else:
+            self._forget(items)
+        self._attempts = 0
+
+    def _park(self, items: List):
+        for item in items:
+            try:
+                with self._storage.flushConnection():
+                    self._target.updateMany([item])
+            except OperationalError:
+                raise
+            except Exception:
+                logger.exception('Parked %r after %d failed attempts',
+                                 item, self._storage.maxAttempts)
+                self._parked[item.id] = item
+            self._forget([item])
+
+    def _flushBeforeRead(self):
+        try:
+            self._flush()
+        except Exception:
+            logger.exception('Failed to flush %d pending changes before '
+                             'a read, reading without them', len(self._pending))
+
+    def retryParked(self):
+        with self._storage.lock:
+            for id_, item in self._parked.items():
+                self._pending.setdefault(id_, item)
+            self._parked.clear()
+        self._storage.notifyPending()
+
+
+class WriteBehindToyRepository(_WriteBehindRepository):
+    def _overlaid(self, toys: List[Toy]) -> List[Toy]:
+        return _overlay(toys, self._pending, _copyToy)
+
+    def create(self, toy: Toy) -> int:
+        with self._storage.lock:
+            return self._target.create(toy)
+
+    def createMany(self, toys: List[Toy]) -> List[int]:
+        with self._storage.lock:
+            return self._target.createMany(toys)
+
+    def update(self, toy: Toy):
+        with self._storage.lock:
+            self._pending[toy.id] = _copyToy(toy)
+        self._storage.notifyPending()
+
+    def updateMany(self, toys: List[Toy]):
+        with self._storage.lock:
+            for toy in toys:
+                self._pending[toy.id] = _copyToy(toy)
+        self._storage.notifyPending()
+
+    def delete(self, id_: int):
+        with self._storage.lock:
+            self._pending.pop(id_, None)
+            self._target.delete(id_)
+
+    def deleteByName(self, name: str) -> int:
+        with self._storage.lock:
+            self._flush()
+            return self._target.deleteByName(name)
+
+    def deleteByNames(self, names: List[str]) -> int:
+        with self._storage.lock:
+            self._flush()
+            return self._target.deleteByNames(names)
+
+    def selectById(self, id_: int) -> Toy:
+        with self._storage.lock:
+            toy = self._pending.get(id_)
+            if toy is not None:
+                return _copyToy(toy)
+            return self._target.selectById(id_)
+
+    def selectAll(self) -> List[Toy]:
+        with self._storage.lock:
+            return self._overlaid(self._target.selectAll())
+
+    def iterAll(self, batchSize: int) -> Iterator[Toy]:
+        with self._storage.lock:
+            self._flushBeforeRead()
+        for toy in self._target.iterAll(batchSize):
+            with self._storage.lock:
+                pending = self._pending.get(toy.id)
+            yield toy if pending is None else _copyToy(pending)
+
+    def iterStockRows(self, batchSize: int) -> Iterator[List[StockRow]]:
+        with self._storage.lock:
+            self._flushBeforeRead()
+        for rows in self._target.iterStockRows(batchSize):
+            with self._storage.lock:
+                pending = dict(self._pending)
+            if pending:
+                rows = [toyStockRow(pending[row[0]]) if row[0] in pending
+                        else row for row in rows]
+            yield rows
+
+    def selectByAge(self, ageLower: int, ageUpper: int, orderBy: str = None) -> List[Toy]:
+        with self._storage.lock:
+            self._flushBeforeRead()
+            return self._overlaid(
+                self._target.selectByAge(ageLower, ageUpper, orderBy))
+
+    def countByAge(self, ageLower: int, ageUpper: int) -> int:
+        with self._storage.lock:
+            self._flushBeforeRead()
+            return self._target.countByAge(ageLower, ageUpper)
+
+    def selectMostExpensive(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Money
+    ) -> Union[Toy, None]:
+        with self._storage.lock:
+            self._flushBeforeRead()
+            toy = self._target.selectMostExpensive(ageLower, ageUpper, maxCost)
+            return None if toy is None else self._overlaid([toy])[0]
+
+    def selectTopByCost(
+        self,
+        ageLower: int,
+        ageUpper: int,
+        maxCost: Money,
+        limit: int
+    ) -> List[Toy]:
+        with self._storage.lock:
+            self._flushBeforeRead()
+            return self._overlaid(self._target.selectTopByCost(
+                ageLower, ageUpper, maxCost, limit))
+
+    def selectPage(
+        self,
+        orderBy: str = 'id',
+        descending: bool = False,
+        after: Union[Toy, None] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> List[Toy]:
+        with self._storage.lock:
+            toys = self._target.selectPage(orderBy, descending, after, limit)
+            if self._reorders(toys, orderBy, descending, after, limit):
+                self._flushBeforeRead()
+                toys = self._target.selectPage(
+                    orderBy, descending, after, limit)
+            return self._overlaid(toys)
+
+    def _reorders(
+        self,
+        toys: List[Toy],
+        orderBy: str,
+        descending: bool,
+        after: Union[Toy, None],
+        limit: int
+    ) -> bool:
+        if not self._pending or orderBy == 'id':
+            return False
+        if after is not None and after.id in self._pending:
+            return True
+        keys = {toy.id: toyPageKey(toy, orderBy) for toy in toys}
+        first = None if after is None else toyPageKey(after, orderBy)
+        last = toyPageKey(toys[-1], orderBy) if len(toys) == limit else None
+        for id_, toy in self._pending.items():
+            key = toyPageKey(toy, orderBy)
+            if id_ in keys:
+                if key != keys[id_]:
+                    return True
+            elif _inPage(key, first, last, descending):
+                return True
+        return False
+
+    def increaseCostForAge(self, ageLower: int, ageUpper: int, multiplierAsPercentage: int):
+        with self._storage.lock:
+            self._flush()
+            self._target.increaseCostForAge(
+                ageLower, ageUpper, multiplierAsPercentage)
+
+
+class WriteBehindEventRepository(_WriteBehindRepository):
+    def _overlaid(self, events: List[Event]) -> List[Event]:
+        return _overlay(events, self._pending, _copyEvent)
+
+    def create(self, event: Event) -> int:
+        with self._storage.lock:
+            return self._target.create(event)
+
+    def createMany(self, events: List[Event]) -> List[int]:
+        with self._storage.lock:
+            return self._target.createMany(events)
+
+    def update(self, event: Event):
+        with self._storage.lock:
+            self._pending[event.id] = _copyEvent(event)
+        self._storage.notifyPending()
+
+    def updateMany(self, events: List[Event]):
+        with self._storage.lock:
+            for event in events:
+                self._pending[event.id] = _copyEvent(event)
+        self._storage.notifyPending()
+
+    def delete(self, id_: int):
+        with self._storage.lock:
+            self._pending.pop(id_, None)
+            self._target.delete(id_)
+
+    def selectById(self, id_: int) -> Event:
+        with self._storage.lock:
+            event = self._pending.get(id_)
+            if event is not None:
+                return _copyEvent(event)
+            return self._target.selectById(id_)
+
+    def selectByDate(self, dateCreated: date) -> List[Event]:
+        with self._storage.lock:
+            self._flushBeforeRead()
+            return self._overlaid(self._target.selectByDate(dateCreated))
+
+    def selectSince(self, dateCreated: date) -> List[Event]:
+        with self._storage.lock:
+            self._flushBeforeRead()
+            return self._overlaid(self._target.selectSince(dateCreated))
+
+    def selectAll(self) -> List[Event]:
+        with self._storage.lock:
+            return self._overlaid(self._target.selectAll())
+
+
+class WriteBehindStorage:
+    def __init__(
+        self,
+        target: Storage,
+        flushInterval: float = 1.0,
+        maxPending: int = 100,
+        connect: Union[Callable[[], 'connection'], None] = None,
+        maxAttempts: int = 5
+    ) -> None:
+        if flushInterval <= 0:
+            raise ValueError('Flush interval must be positive')
+        if maxAttempts <= 0:
+            raise ValueError('Max attempts must be positive')
+        self._target = target
+        self.flushInterval = flushInterval
+        self.maxPending = maxPending
+        self.maxAttempts = maxAttempts
+        self._connect = connect
+        self._dBConnection = None
+        self._lock = threading.RLock()
+        self._wakeUp = threading.Event()
+        self._stopped = threading.Event()
+        self.toys = WriteBehindToyRepository(self, target.toys)
+        self.events = WriteBehindEventRepository(self, target.events)
+        self._thread = threading.Thread(
+            target=self._run, name='WriteBehind', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+# region Properties
+    @property
+    def target(self) -> Storage:
+        return self._target
+
+    @property
+    def lock(self) -> threading.RLock:
+        return self._lock
+
+    @property
+    def pendingCount(self) -> int:
+        with self._lock:
+            return len(self.toys._pending) + len(self.events._pending)
+
+    @property
+    def parkedCount(self) -> int:
+        with self._lock:
+            return len(self.toys._parked) + len(self.events._parked)
+# endregion
+
+    def flushConnection(self):
+        if self._connect is None:
+            return nullcontext()
+        if self._dBConnection is None or self._dBConnection.closed != 0:
+            self._dBConnection = self._connect()
+            DBConfig.prepareDBConnection(self._dBConnection)
+        return DBConfig.useDBConnection(self._dBConnection)
+
+    def notifyPending(self):
+        if self.pendingCount >= self.maxPending:
+            self._wakeUp.set()
+
+    def flush(self):
+        with self._lock:
+            self.toys._flush()
+            self.events._flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeUp.wait(self.flushInterval)
+            self._wakeUp.clear()
+            if (self._stopped.is_set() or not self.pendingCount
+                    or not self._target.isConnected()):
+                continue
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush %d pending changes, '
+                                 'will retry', self.pendingCount)
+
+    def isConnected(self) -> bool:
+        return self._target.isConnected()
+
+    def close(self):
+        self._stopped.set()
+        self._wakeUp.set()
+        self._thread.join()
+        atexit.unregister(self.flush)
+        try:
+            self.flush()
+        finally:
+            if self._dBConnection is not None and self._dBConnection.closed == 0:
+                self._dBConnection.close()
+            self._target.close()
+
+    def __str__(self) -> str:
+        return f'write-behind {self._target}'
+
+    def __repr__(self) -> str:
+        return self.__str__()
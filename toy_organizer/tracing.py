@@ -0,0 +1,210 @@
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple, Union
+
+from psycopg2.extensions import TRANSACTION_STATUS_INERROR
+from psycopg2.extensions import cursor as PlainCursor
+from psycopg2.extras import RealDictCursor
+
+from .config import DBConfig
+
+
+logger = logging.getLogger(__name__)
+
+_TRACING_FILE = os.path.normcase(__file__)
+_PACKAGE_DIR = os.path.dirname(_TRACING_FILE)
+
+
+class QueryStats:
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._count = 0
+        self._slowCount = 0
+        self._totalTime = 0.0
+        self._maxTime = 0.0
+        self._rows = 0
+        self._presenters: Dict[str, int] = {}
+        self._lastPlan = None
+
+# region Properties
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def slowCount(self) -> int:
+        return self._slowCount
+
+    @property
+    def totalTime(self) -> float:
+        return self._totalTime
+
+    @property
+    def meanTime(self) -> float:
+        return self._totalTime / self._count if self._count else 0.0
+
+    @property
+    def maxTime(self) -> float:
+        return self._maxTime
+
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    @property
+    def presenters(self) -> Dict[str, int]:
+        return dict(self._presenters)
+
+    @property
+    def lastPlan(self) -> Union[str, None]:
+        return self._lastPlan
+# endregion
+
+    def __str__(self) -> str:
+        return (f'(name: {self._name}, count: {self._count}, '
+                f'total: {self._totalTime * 1000:.1f} ms, '
+                f'mean: {self.meanTime * 1000:.2f} ms, '
+                f'max: {self._maxTime * 1000:.2f} ms, '
+                f'rows: {self._rows}, slow: {self._slowCount})')
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class QueryTracer:
+    slowThreshold = 0.2
+    captureExplain = False
+    _stats: Dict[str, QueryStats] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def install(cls, slowThreshold: float = 0.2, captureExplain: bool = False):
+        cls.slowThreshold = slowThreshold
+        cls.captureExplain = captureExplain
+        DBConfig.setCursorFactory(TracingCursor)
+
+    @classmethod
+    def uninstall(cls):
+        DBConfig.setCursorFactory(RealDictCursor)
+
+    @classmethod
+    def installFromEnv(cls) -> bool:
+        if os.getenv('trace_queries', '0') in {'', '0', 'false'}:
+            return False
+        cls.install(
+            float(os.getenv('slow_query_ms', '200')) / 1000,
+            os.getenv('explain_slow_queries', '0') not in {'', '0', 'false'}
+        )
+        return True
+
+    @classmethod
+    def stats(cls) -> List[QueryStats]:
+        with cls._lock:
+            return sorted(cls._stats.values(),
+                          key=lambda stats: stats.totalTime, reverse=True)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._stats = {}
+
+    @classmethod
+    def report(cls) -> str:
+        return '\n'.join(str(stats) for stats in cls.stats())
+
+    @classmethod
+    def record(
+        cls,
+        name: str,
+        presenter: Union[str, None],
+        duration: float,
+        rowCount: int,
+        plan: Union[str, None] = None
+    ) -> bool:
+        slow = duration >= cls.slowThreshold
+        with cls._lock:
+            stats = cls._stats.get(name)
+            if stats is None:
+                stats = cls._stats[name] = QueryStats(name)
+            stats._count += 1
+            stats._totalTime += duration
+            stats._maxTime = max(stats._maxTime, duration)
+            stats._rows += max(rowCount, 0)
+            if presenter is not None:
+                stats._presenters[presenter] = \
+                    stats._presenters.get(presenter, 0) + 1
+            if slow:
+                stats._slowCount += 1
+            if plan is not None:
+                stats._lastPlan = plan
+        return slow
+
+
+def _frameName(frame) -> str:
+    owner = frame.f_locals.get('self', frame.f_locals.get('cls'))
+    if owner is None:
+        return frame.f_code.co_name
+    ownerType = owner if isinstance(owner, type) else type(owner)
+    return f'{ownerType.__name__}.{frame.f_code.co_name}'
+
+
+def _callers() -> Tuple[str, Union[str, None]]:
+    name = None
+    external = None
+    presenter = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        fileName = os.path.normcase(frame.f_code.co_filename)
+        if fileName != _TRACING_FILE:
+            if external is None:
+                external = _frameName(frame)
+            if name is None and fileName.startswith(_PACKAGE_DIR):
+                name = _frameName(frame)
+        if (os.path.dirname(fileName) == _PACKAGE_DIR
+                and os.path.basename(fileName) == 'presenters.py'
+                and 'self' in frame.f_locals):
+            presenter = _frameName(frame)
+            break
+        frame = frame.f_back
+    return name or external or '<unknown>', presenter
+
+
+class TracingCursor(RealDictCursor):
+    def execute(self, query, vars=None):
+        name, presenter = _callers()
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            duration = time.perf_counter() - start
+            plan = None
+            if (duration >= QueryTracer.slowThreshold
+                    and QueryTracer.captureExplain
+                    and self.connection.get_transaction_status() !=
+                    TRANSACTION_STATUS_INERROR):
+                plan = self._explain(query, vars)
+            if QueryTracer.record(name, presenter, duration, self.rowcount, plan):
+                logger.warning(
+                    'Slow query %s (%s): %.1f ms, %d rows\n%s%s',
+                    name,
+                    presenter or 'no presenter',
+                    duration * 1000,
+                    self.rowcount,
+                    self.query.decode(errors='replace') if self.query else query,
+                    f'\n{plan}' if plan else ''
+                )
+
+    def _explain(self, query, vars) -> Union[str, None]:
+        statement = self.mogrify(query, vars).decode()
+        if not statement.lstrip().upper().startswith('SELECT'):
+            return None
+        with self.connection.cursor(cursor_factory=PlainCursor) as cursor:
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {statement}')
+            return '\n'.join(row[0] for row in cursor.fetchall())
@@ -1,10 +1,27 @@
 from datetime import date
-from decimal import Decimal
-from typing import Callable, List, Protocol, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Protocol, Tuple, Union
+import logging
 import os
 
-from PyQt6.QtGui import QPainter, QAction, QMouseEvent
-from PyQt6.QtCore import Qt
+from PyQt6.QtGui import (
+    QPainter,
+    QAction,
+    QFont,
+    QFontMetrics,
+    QMouseEvent,
+    QPalette
+)
+from PyQt6 import sip
+from PyQt6.QtCore import (
+    QEvent,
+    QModelIndex,
+    QObject,
+    QSize,
+    Qt,
+    QTimer,
+    pyqtBoundSignal,
+    pyqtSignal
+)
 from PyQt6.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -17,6 +34,8 @@ from PyQt6.QtWidgets import (
     QLabel,
     QTableWidget,
     QTableWidgetItem,
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
     QAbstractSpinBox,
     QStyleOption,
     QStyle,
@@ -27,10 +46,19 @@ from PyQt6.QtWidgets import (
     QApplication,
     QCalendarWidget,
     QDateEdit,
-    QTextEdit
+    QTextEdit,
+    QTabWidget
 )
 
 from toy_organizer.config import STYLES_PATH
+from toy_organizer.money import Money
+from toy_organizer.spans import SpanTracer
+
+if TYPE_CHECKING:
+    from psycopg2.extras import NumericRange
+
+
+logger = logging.getLogger(__name__)
 
 
 def getStyles(fileName: str):
@@ -46,26 +74,175 @@ class StyleableWidget(QWidget):
         self.style().drawPrimitive(QStyle.PrimitiveElement.PE_Widget, option, painter, self)
 
 
+RAW_VALUE_ROLE = Qt.ItemDataRole.UserRole
+COLUMN_FIT_DELAY_MS = 150
+
+
+def formatAgeRange(age: 'NumericRange') -> str:
+    if age.isempty:
+        return ''
+    return f'{age.lower} - {age.upper - 1}'
+
+
+class QtValueDelegate(QStyledItemDelegate):
+    def __init__(
+        self,
+        formatter: Callable[[Any], str] = str,
+        alignment: Qt.AlignmentFlag = Qt.AlignmentFlag.AlignLeft,
+        parent: QObject = None
+    ) -> None:
+        super().__init__(parent)
+        self._formatter = formatter
+        self._alignment = alignment | Qt.AlignmentFlag.AlignVCenter
+        self._metrics: Dict[str, QFontMetrics] = {}
+        self._margin = None
+
+    def formatValue(self, value) -> str:
+        return '' if value is None else self._formatter(value)
+
+    def fontMetrics(self, font: QFont) -> QFontMetrics:
+        key = font.key()
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics[key] = QFontMetrics(font)
+        return metrics
+
+    def _textMargin(self, option: QStyleOptionViewItem) -> int:
+        if self._margin is None:
+            widget = option.widget
+            style = widget.style() if widget is not None else QApplication.style()
+            self._margin = style.pixelMetric(
+                QStyle.PixelMetric.PM_FocusFrameHMargin, None, widget) + 1
+        return self._margin
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        widget = option.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        style.drawPrimitive(
+            QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, widget)
+
+        margin = self._textMargin(option)
+        rect = option.rect.adjusted(margin, 0, -margin, 0)
+        text = self.fontMetrics(option.font).elidedText(
+            self.formatValue(index.data(RAW_VALUE_ROLE)),
+            Qt.TextElideMode.ElideRight, rect.width())
+        selected = option.state & QStyle.StateFlag.State_Selected
+        painter.save()
+        painter.setFont(option.font)
+        painter.setPen(option.palette.color(
+            QPalette.ColorRole.HighlightedText if selected
+            else QPalette.ColorRole.Text))
+        painter.drawText(rect, self._alignment, text)
+        painter.restore()
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        metrics = self.fontMetrics(option.font)
+        text = self.formatValue(index.data(RAW_VALUE_ROLE))
+        return QSize(metrics.horizontalAdvance(text) + 2 * self._textMargin(option),
+                     metrics.height() + 2)
+
+
 class QtTableWidget(QTableWidget):
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+        self._delegates: Dict[int, QtValueDelegate] = {}
+        self._itemFlags = QTableWidgetItem().flags() & ~Qt.ItemFlag.ItemIsEditable
+        self._fitPending = False
+        self._fitTimer = QTimer(self)
+        self._fitTimer.setSingleShot(True)
+        self._fitTimer.setInterval(COLUMN_FIT_DELAY_MS)
+        self._fitTimer.timeout.connect(self.growColumns)
+        self.verticalScrollBar().valueChanged.connect(self._scheduleFit)
+        self.horizontalHeader().setResizeContentsPrecision(0)
+
+    def setColumnDelegate(self, column: int, delegate: QtValueDelegate):
+        self._delegates[column] = delegate
+        self.setItemDelegateForColumn(column, delegate)
+
+    def cellText(self, row: int, column: int) -> str:
+        item = self.item(row, column)
+        if item is None:
+            return ''
+        delegate = self._delegates.get(column)
+        if delegate is None:
+            return item.text()
+        return delegate.formatValue(item.data(RAW_VALUE_ROLE))
+
     def setupTable(self, data, labels: List[str]):
         self.setRowCount(len(data))
         if len(data) > 0:
             self.setColumnCount(len(data[0]))
 
         for i, row in enumerate(data):
-            for j, item in enumerate(row):
-                tableItem = QTableWidgetItem(str(item))
-                tableItem.setFlags(tableItem.flags() ^
-                                   Qt.ItemFlag.ItemIsEditable)
-                self.setItem(i, j, tableItem)
+            self._setRow(i, row)
 
         if len(data) > 0:
             self.setHorizontalHeaderLabels(labels)
-            header = self.horizontalHeader()
-            header.resizeSections(QHeaderView.ResizeMode.ResizeToContents)
+            self.fitColumns()
         else:
             self.setColumnCount(0)
 
+    def fitColumns(self):
+        if not self.isVisible():
+            self._fitPending = True
+            return
+        self._fitPending = False
+        self.horizontalHeader().resizeSections(
+            QHeaderView.ResizeMode.ResizeToContents)
+
+    def _scheduleFit(self):
+        self._fitTimer.start()
+
+    def growColumns(self):
+        for column in range(self.columnCount()):
+            width = self.sizeHintForColumn(column)
+            if width > self.columnWidth(column):
+                self.setColumnWidth(column, width)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._fitPending:
+            self.fitColumns()
+
+    def appendRows(self, data):
+        start = self.rowCount()
+        self.setRowCount(start + len(data))
+        for i, row in enumerate(data, start):
+            self._setRow(i, row)
+
+    def _setRow(self, i: int, row):
+        for j, item in enumerate(row):
+            if j in self._delegates:
+                tableItem = QTableWidgetItem()
+                tableItem.setData(RAW_VALUE_ROLE, item)
+            else:
+                tableItem = QTableWidgetItem(str(item))
+            tableItem.setFlags(self._itemFlags)
+            self.setItem(i, j, tableItem)
+
+
+class QtMessageDialog(QDialog):
+    def __init__(self, parent: QWidget = None) -> None:
+        super().__init__(parent)
+        self.setFixedWidth(300)
+        self.setFixedHeight(150)
+        layout = QVBoxLayout()
+        layout.setAlignment(Qt.AlignmentFlag.AlignHCenter)
+        self.label = QLabel()
+        self.label.setWordWrap(True)
+        self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.label)
+        self.okButton = QPushButton('Ок')
+        self.okButton.clicked.connect(self.close)
+        layout.addWidget(self.okButton)
+        self.setLayout(layout)
+
+    def showMessage(self, message: str, title: str):
+        self.setWindowTitle(title)
+        self.label.setText(message)
+        SpanTracer.discardCurrent()
+        self.exec()
+
 
 class QtSideMenu(StyleableWidget):
     def __init__(self) -> None:
@@ -86,6 +263,31 @@ class QtHeader(QLabel):
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
 
+class QtDispatcher(QObject):
+    _invoked = pyqtSignal(object)
+    _posted = pyqtSignal(object)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._invoked.connect(self._run)
+        self._posted.connect(self._run, Qt.ConnectionType.QueuedConnection)
+
+    def invoke(self, func: Callable, *args):
+        self._invoked.emit(lambda: func(*args))
+
+    def post(self, func: Callable, *args):
+        self._posted.emit(lambda: func(*args))
+
+    def wrap(self, func: Callable) -> Callable:
+        return lambda *args: self.invoke(func, *args)
+
+    def _run(self, func: Callable):
+        try:
+            func()
+        except Exception:
+            logger.exception('Failed to run %r on the GUI thread', func)
+
+
 class ViewFactory:
     def __init__(
         self,
@@ -101,6 +303,7 @@ class ViewFactory:
         getEventsCatalogView: Callable[[], 'EventCatalogView'],
         getAddEventView: Callable[[], 'AddEventView'],
         getEditEventView: Callable[[int], 'EditEventView'],
+        getAnalyticsView: Callable[[], 'AnalyticsView'],
     ) -> None:
         self.getCatalogView = getCatalogView
         self.getAddToyView = getAddToyView
@@ -114,37 +317,41 @@ class ViewFactory:
         self.getEventsCatalogView = getEventsCatalogView
         self.getAddEventView = getAddEventView
         self.getEditEventView = getEditEventView
+        self.getAnalyticsView = getAnalyticsView
 
 
 class View(Protocol):
     def show(self): ...
     def showMessage(self, message, title): ...
+    def dispose(self): ...
 
 
 class QtView(StyleableWidget):
     def __init__(self, mainWindow: 'MainWindow') -> None:
         super().__init__()
         self.mainWindow = mainWindow
+        self._subscriptions: List[Tuple[pyqtBoundSignal, Callable]] = []
 
     def show(self):
         self.mainWindow.switchPage(self)
 
     def showMessage(self, message, title='Внимание'):
-        messageDialog = QDialog(self)
-        messageDialog.setWindowTitle(title)
-        messageDialog.setFixedWidth(300)
-        messageDialog.setFixedHeight(150)
-        layout = QVBoxLayout()
-        layout.setAlignment(Qt.AlignmentFlag.AlignHCenter)
-        label = QLabel(message)
-        label.setWordWrap(True)
-        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(label)
-        okButton = QPushButton('Ок')
-        okButton.clicked.connect(messageDialog.close)
-        layout.addWidget(okButton)
-        messageDialog.setLayout(layout)
-        messageDialog.exec()
+        self.mainWindow.messageDialog().showMessage(message, title)
+
+    def subscribe(self, signal: pyqtBoundSignal, handler: Callable):
+        signal.connect(handler)
+        self._subscriptions.append((signal, handler))
+
+    def dispose(self):
+        if sip.isdeleted(self):
+            return
+        for signal, handler in self._subscriptions:
+            try:
+                signal.disconnect(handler)
+            except TypeError:
+                pass
+        self._subscriptions = []
+        self.deleteLater()
 
 
 class QtPage(QtView):
@@ -174,6 +381,10 @@ class CatalogView(View):
     @property
     def selectedItems(self): ...
 
+    def appendTableData(self, data): ...
+
+    def subscribeOnSortClick(self, handler): ...
+    def subscribeOnScrolledToEnd(self, handler): ...
     def subscribeOnAddButtonClick(self, handler): ...
     def subscribeOnEditButtonClick(self, handler): ...
     def subscribeOnDeleteButtonClick(self, handler): ...
@@ -203,6 +414,16 @@ class QtCatalogView(QtPage):
         self.table = QtTableWidget(0, 0)
         self.table.setRowCount(1)
         self.table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.table.setColumnDelegate(2, QtValueDelegate(
+            str, Qt.AlignmentFlag.AlignRight, self.table))
+        self.table.setColumnDelegate(3, QtValueDelegate(
+            str, Qt.AlignmentFlag.AlignRight, self.table))
+        self.table.setColumnDelegate(4, QtValueDelegate(
+            formatAgeRange, Qt.AlignmentFlag.AlignLeft, self.table))
+        header = self.table.horizontalHeader()
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(0, Qt.SortOrder.AscendingOrder)
         self.formLayout.addWidget(self.table)
         self.formLayout.setContentsMargins(0, 0, 0, 0)
         self._tableData = []
@@ -220,7 +441,7 @@ class QtCatalogView(QtPage):
         for row in rowIndexes:
             item = []
             for column in range(self.table.columnCount()):
-                item.append(self.table.item(row, column).text())
+                item.append(self.table.cellText(row, column))
             items.append(item)
         return items
 
@@ -234,28 +455,46 @@ class QtCatalogView(QtPage):
         self.table.setupTable(
             data, ['Id', 'Название', 'Стоимость', 'Количество', 'Возраст'])
 
+    def appendTableData(self, data):
+        self._tableData.extend(data)
+        self.table.appendRows(data)
+
+    def subscribeOnSortClick(self, handler):
+        def onSortIndicatorChanged(column: int, order: Qt.SortOrder):
+            handler(column, order == Qt.SortOrder.DescendingOrder)
+
+        self.subscribe(self.table.horizontalHeader().sortIndicatorChanged,
+                       onSortIndicatorChanged)
+
+    def subscribeOnScrolledToEnd(self, handler):
+        scrollBar = self.table.verticalScrollBar()
+
+        def onScrolled(value: int):
+            if value >= scrollBar.maximum():
+                handler()
+
+        self.subscribe(scrollBar.valueChanged, onScrolled)
+
     def subscribeOnAddButtonClick(self, handler):
-        self.addButton.clicked.connect(handler)
+        self.subscribe(self.addButton.clicked, handler)
 
     def subscribeOnEditButtonClick(self, handler):
-        self.editButton.clicked.connect(handler)
+        self.subscribe(self.editButton.clicked, handler)
 
     def subscribeOnDeleteButtonClick(self, handler):
-        self.deleteButton.clicked.connect(
-            handler)
+        self.subscribe(self.deleteButton.clicked, handler)
 
     def subscribeOnMostExpensiveToyButtonClick(self, handler):
-        self.mostExpensiveToyButton.clicked.connect(
-            handler)
+        self.subscribe(self.mostExpensiveToyButton.clicked, handler)
 
     def subscribeOnAgeSearchButtonClick(self, handler):
-        self.ageSearchButton.clicked.connect(handler)
+        self.subscribe(self.ageSearchButton.clicked, handler)
 
     def subscribeOnIncreaseCostButtonClick(self, handler):
-        self.increaseCostButton.clicked.connect(handler)
+        self.subscribe(self.increaseCostButton.clicked, handler)
 
     def subscribeOnDeleteByNameButtonClick(self, handler):
-        self.deleteByNameButton.clicked.connect(handler)
+        self.subscribe(self.deleteByNameButton.clicked, handler)
 
 
 class MostExpensiveToyView(View):
@@ -264,7 +503,7 @@ class MostExpensiveToyView(View):
     def subscribeOnCancelButton(self, handler): ...
 
     @property
-    def maxCost(self) -> Decimal: ...
+    def maxCost(self) -> Money: ...
 
     @property
     def ageLower(self) -> int: ...
@@ -305,6 +544,8 @@ class QtMostExpensiveToyView(QtPage):
         self.table = QtTableWidget(0, 0)
         self.table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.table.setMaximumWidth(500)
+        self.table.setColumnDelegate(1, QtValueDelegate(
+            str, Qt.AlignmentFlag.AlignRight, self.table))
         self.searchButton = QPushButton('Поиск')
         self.cancelButton = QPushButton('Назад')
         self._hasToy = False
@@ -321,14 +562,14 @@ class QtMostExpensiveToyView(QtPage):
         self.sideMenu.addWidget(self.cancelButton)
 
     def subscribeOnSearchButton(self, handler):
-        self.searchButton.clicked.connect(handler)
+        self.subscribe(self.searchButton.clicked, handler)
 
     def subscribeOnCancelButton(self, handler):
-        self.cancelButton.clicked.connect(handler)
+        self.subscribe(self.cancelButton.clicked, handler)
 
     @property
-    def maxCost(self) -> Decimal:
-        return Decimal(self.maxCostSpinBox.value())
+    def maxCost(self) -> Money:
+        return Money.fromDecimal(self.maxCostSpinBox.value())
 
     @property
     def ageLower(self) -> int:
@@ -361,6 +602,117 @@ class QtMostExpensiveToyView(QtPage):
         self.table.setupTable(value, ['Название', 'Стоимость'])
 
 
+class AnalyticsView(View):
+    def subscribeOnSimulateButtonClick(self, handler): ...
+
+    def subscribeOnCancelButtonClick(self, handler): ...
+
+    @property
+    def ageLower(self) -> int: ...
+
+    @property
+    def ageUpper(self) -> int: ...
+
+    @property
+    def multiplierAsPercentage(self) -> int: ...
+
+    def setSummary(self, summary: str): ...
+
+    def setSimulationResult(self, result: str): ...
+
+    def setDistributionData(self, data): ...
+
+    def setHistogramData(self, data, labels: List[str]): ...
+
+    def setStockByAgeData(self, data): ...
+
+    def setStockCurveData(self, data): ...
+
+
+class QtAnalyticsView(QtPage):
+    def __init__(self, mainWindow: 'MainWindow') -> None:
+        super().__init__(mainWindow)
+        self.header = QtHeader('Аналитика каталога')
+        self.summaryLabel = QLabel('')
+        self.summaryLabel.setWordWrap(True)
+        self.distributionTable = QtTableWidget()
+        self.histogramTable = QtTableWidget()
+        self.stockByAgeTable = QtTableWidget()
+        self.stockCurveTable = QtTableWidget()
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.distributionTable, 'Цены по возрасту')
+        self.tabs.addTab(self.histogramTable, 'Гистограмма цен')
+        self.tabs.addTab(self.stockByAgeTable, 'Запас по возрасту')
+        self.tabs.addTab(self.stockCurveTable, 'Кривая стоимости')
+        self.ageLabel = QLabel('Возраст')
+        self.ageLowerSpinBox = QSpinBox()
+        self.ageUpperSpinBox = QSpinBox()
+        self.multiplierLabel = QLabel('Множитель (в процентах)')
+        self.multiplierSpinBox = QSpinBox()
+        self.multiplierSpinBox.setRange(0, 100000)
+        self.multiplierSpinBox.setValue(100)
+        self.ageLowerSpinBox.setButtonSymbols(
+            QAbstractSpinBox.ButtonSymbols.NoButtons)
+        self.ageUpperSpinBox.setButtonSymbols(
+            QAbstractSpinBox.ButtonSymbols.NoButtons)
+        self.multiplierSpinBox.setButtonSymbols(
+            QAbstractSpinBox.ButtonSymbols.NoButtons)
+        self.simulationLabel = QLabel('')
+        self.simulationLabel.setWordWrap(True)
+        self.simulateButton = QPushButton('Рассчитать')
+        self.cancelButton = QPushButton('Назад')
+        self.formLayout.addWidget(self.header)
+        self.formLayout.addWidget(self.summaryLabel)
+        self.formLayout.addWidget(self.tabs)
+        self.formLayout.addWidget(self.ageLabel)
+        self.formLayout.addWidget(self.ageLowerSpinBox)
+        self.formLayout.addWidget(self.ageUpperSpinBox)
+        self.formLayout.addWidget(self.multiplierLabel)
+        self.formLayout.addWidget(self.multiplierSpinBox)
+        self.formLayout.addWidget(self.simulationLabel)
+        self.sideMenu.addWidget(self.simulateButton)
+        self.sideMenu.addWidget(self.cancelButton)
+
+    def subscribeOnSimulateButtonClick(self, handler):
+        self.subscribe(self.simulateButton.clicked, handler)
+
+    def subscribeOnCancelButtonClick(self, handler):
+        self.subscribe(self.cancelButton.clicked, handler)
+
+    @property
+    def ageLower(self) -> int:
+        return self.ageLowerSpinBox.value()
+
+    @property
+    def ageUpper(self) -> int:
+        return self.ageUpperSpinBox.value()
+
+    @property
+    def multiplierAsPercentage(self) -> int:
+        return self.multiplierSpinBox.value()
+
+    def setSummary(self, summary: str):
+        self.summaryLabel.setText(summary)
+
+    def setSimulationResult(self, result: str):
+        self.simulationLabel.setText(result)
+
+    def setDistributionData(self, data):
+        self.distributionTable.setupTable(
+            data, ['Возраст', 'Игрушек', 'Мин.', '25%', 'Медиана', '75%',
+                   'Макс.', 'Стоимость запаса'])
+
+    def setHistogramData(self, data, labels: List[str]):
+        self.histogramTable.setupTable(data, ['Цена'] + labels)
+
+    def setStockByAgeData(self, data):
+        self.stockByAgeTable.setupTable(data, ['Возраст', 'Стоимость запаса'])
+
+    def setStockCurveData(self, data):
+        self.stockCurveTable.setupTable(
+            data, ['Цена до', 'Игрушек', 'Стоимость запаса', 'Доля'])
+
+
 class AgeSearchView(View):
     def subscribeOnSearchButtonClick(self, handler): ...
 
@@ -400,6 +752,8 @@ class QtAgeSearchView(QtPage):
         self.orderByComboBox.addItems(['Название', 'Стоимость', 'Ничего'])
         self.table = QtTableWidget(0, 0)
         self.table.setMaximumWidth(500)
+        self.table.setColumnDelegate(1, QtValueDelegate(
+            str, Qt.AlignmentFlag.AlignRight, self.table))
         self.table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self._tableData = []
         self.formLayout.addWidget(self.header)
@@ -413,10 +767,10 @@ class QtAgeSearchView(QtPage):
         self.sideMenu.addWidget(self.cancelButton)
 
     def subscribeOnSearchButtonClick(self, handler):
-        self.searchButton.clicked.connect(handler)
+        self.subscribe(self.searchButton.clicked, handler)
 
     def subscribeOnCancelButtonClick(self, handler):
-        self.cancelButton.clicked.connect(handler)
+        self.subscribe(self.cancelButton.clicked, handler)
 
     @property
     def tableData(self):
@@ -486,10 +840,10 @@ class QtIncreaseCostView(QtPage):
         self.sideMenu.addWidget(self.cancelButton)
 
     def subscibeOnUpdateButton(self, handler):
-        self.updateButton.clicked.connect(handler)
+        self.subscribe(self.updateButton.clicked, handler)
 
     def subscibeOnCancelButton(self, handler):
-        self.cancelButton.clicked.connect(handler)
+        self.subscribe(self.cancelButton.clicked, handler)
 
     @property
     def ageLower(self) -> int:
@@ -528,10 +882,10 @@ class QtDeleteByNameView(QtPage):
         self.sideMenu.addWidget(self.cancelButton)
 
     def subscribeOnDeleteButtonClick(self, handler):
-        self.deleteButton.clicked.connect(handler)
+        self.subscribe(self.deleteButton.clicked, handler)
 
     def subscribeOnCancelButtonClick(self, handler):
-        self.cancelButton.clicked.connect(handler)
+        self.subscribe(self.cancelButton.clicked, handler)
 
     @property
     def name(self) -> str:
@@ -543,7 +897,7 @@ class AddToyView(View):
     def name(self) -> str: ...
 
     @property
-    def cost(self) -> Decimal: ...
+    def cost(self) -> Money: ...
 
     @property
     def quantity(self) -> int: ...
@@ -597,8 +951,8 @@ class QtAddToyView(QtPage):
         return self.nameLineEdit.text()
 
     @property
-    def cost(self) -> Decimal:
-        return Decimal(self.costSpinBox.value())
+    def cost(self) -> Money:
+        return Money.fromDecimal(self.costSpinBox.value())
 
     @property
     def quantity(self) -> int:
@@ -613,10 +967,10 @@ class QtAddToyView(QtPage):
         return self.ageUpperSpinBox.value()
 
     def subscribeOnAddButtonClick(self, handler):
-        self.addButton.clicked.connect(handler)
+        self.subscribe(self.addButton.clicked, handler)
 
     def subscribeOnCancelButtonClick(self, handler):
-        self.cancelButton.clicked.connect(handler)
+        self.subscribe(self.cancelButton.clicked, handler)
 
 
 class EditToyView(View):
@@ -627,7 +981,7 @@ class EditToyView(View):
     def id(self) -> int: ...
 
     @property
-    def cost(self) -> Decimal: ...
+    def cost(self) -> Money: ...
 
     @property
     def quantity(self) -> int: ...
@@ -642,7 +996,7 @@ class EditToyView(View):
     def name(self, value: str) -> None: ...
 
     @cost.setter
-    def cost(self, value: Decimal) -> None: ...
+    def cost(self, value: Money) -> None: ...
 
     @quantity.setter
     def quantity(self, value: int) -> None: ...
@@ -701,8 +1055,8 @@ class QtEditToyView(QtPage):
         return self.nameLineEdit.text()
 
     @property
-    def cost(self) -> Decimal:
-        return Decimal(self.costSpinBox.value())
+    def cost(self) -> Money:
+        return Money.fromDecimal(self.costSpinBox.value())
 
     @property
     def quantity(self) -> int:
@@ -721,8 +1075,8 @@ class QtEditToyView(QtPage):
         self.nameLineEdit.setText(value)
 
     @cost.setter
-    def cost(self, value: Decimal) -> None:
-        self.costSpinBox.setValue(value)
+    def cost(self, value: Money) -> None:
+        self.costSpinBox.setValue(float(value.toDecimal()))
 
     @quantity.setter
     def quantity(self, value: int) -> None:
@@ -737,17 +1091,21 @@ class QtEditToyView(QtPage):
         self.ageUpperSpinBox.setValue(value)
 
     def subscribeOnEditButtonClick(self, handler):
-        self.saveButton.clicked.connect(handler)
+        self.subscribe(self.saveButton.clicked, handler)
 
     def subscribeOnCancelButtonClick(self, handler):
-        self.cancelButton.clicked.connect(handler)
+        self.subscribe(self.cancelButton.clicked, handler)
 
 
 class NavMenuView(View):
+    def setActionsEnabled(self, value: bool): ...
+
     def subscribeOnFileMenuCatalogClick(self, handler): ...
 
     def subscribeOnFileMenuEventsClick(self, handler): ...
 
+    def subscribeOnFileMenuExportProfileClick(self, handler): ...
+
     def subscribeOnFileMenuExitClick(self, handler): ...
 
     def subscribeOnCatalogWatchClick(self, handler): ...
@@ -756,6 +1114,8 @@ class NavMenuView(View):
 
     def subscribeOnCatalogAddClick(self, handler): ...
 
+    def subscribeOnCatalogAnalyticsClick(self, handler): ...
+
     def subscribeOnEventsWatchClick(self, handler): ...
 
     def subscribeOnEventsAddClick(self, handler): ...
@@ -772,21 +1132,15 @@ class QtNavMenuView(QMenuBar):
     def show(self) -> None:
         return self.mainWindow.setNavMenu(self)
 
+    def setActionsEnabled(self, value: bool):
+        self.setEnabled(value)
+
     def showMessage(self, message, title='Внимание'):
-        messageDialog = QDialog(self)
-        messageDialog.setWindowTitle(title)
-        messageDialog.setFixedWidth(300)
-        messageDialog.setFixedHeight(150)
-        layout = QVBoxLayout()
-        label = QLabel(message)
-        label.setWordWrap(True)
-        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(label)
-        okButton = QPushButton('Ок')
-        okButton.clicked.connect(messageDialog.close)
-        layout.addWidget(okButton)
-        messageDialog.setLayout(layout)
-        messageDialog.exec()
+        self.mainWindow.messageDialog().showMessage(message, title)
+
+    def dispose(self):
+        if not sip.isdeleted(self):
+            self.deleteLater()
 
     def subscribeOnFileMenuCatalogClick(self, handler):
         action = QAction('Каталог', self.mainWindow)
@@ -798,6 +1152,11 @@ class QtNavMenuView(QMenuBar):
         action.triggered.connect(handler)
         self.fileMenu.addAction(action)
 
+    def subscribeOnFileMenuExportProfileClick(self, handler):
+        action = QAction('Экспорт профиля отклика', self.mainWindow)
+        action.triggered.connect(handler)
+        self.fileMenu.addAction(action)
+
     def subscribeOnFileMenuExitClick(self, handler):
         action = QAction('Выход', self.mainWindow)
         action.triggered.connect(handler)
@@ -818,6 +1177,11 @@ class QtNavMenuView(QMenuBar):
         action.triggered.connect(handler)
         self.catalogMenu.addAction(action)
 
+    def subscribeOnCatalogAnalyticsClick(self, handler):
+        action = QAction('Аналитика', self.mainWindow)
+        action.triggered.connect(handler)
+        self.catalogMenu.addAction(action)
+
     def subscribeOnEventsWatchClick(self, handler):
         action = QAction('Просмотреть', self.mainWindow)
         action.triggered.connect(handler)
@@ -836,6 +1200,8 @@ class MainView(View):
 
     def setEventsData(self, data): ...
 
+    def setConnectionState(self, message: Union[str, None], canBrowse: bool = False): ...
+
 
 class QtMainView(QtPage):
     def __init__(self, mainWindow: 'MainWindow') -> None:
@@ -850,9 +1216,13 @@ class QtMainView(QtPage):
         )
         self.descriptionLabel.setAlignment(Qt.AlignmentFlag.AlignHCenter)
         self.formLayout.addWidget(self.descriptionLabel)
+        self.connectionLabel = QLabel('')
+        self.connectionLabel.setWordWrap(True)
+        self.connectionLabel.setAlignment(Qt.AlignmentFlag.AlignHCenter)
+        self.connectionLabel.hide()
+        self.formLayout.addWidget(self.connectionLabel)
         self.eventTable = QtTableWidget()
-        self.eventTable.setupTable(
-            [['1', 'test', '2022-10-03']], ['1', '2', '3'])
+        self.eventTable.setupTable([], [])
         self.eventTable.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self.calendar = QCalendarWidget()
         self.eventLayout = QVBoxLayout()
@@ -866,14 +1236,20 @@ class QtMainView(QtPage):
         self.sideMenu.addWidget(self.addEventClick)
 
     def subscribeOnCatalogClick(self, handler):
-        self.catalogButton.clicked.connect(handler)
+        self.subscribe(self.catalogButton.clicked, handler)
 
     def subscribeOnAddEventClick(self, handler):
-        self.addEventClick.clicked.connect(handler)
+        self.subscribe(self.addEventClick.clicked, handler)
 
     def setEventsData(self, data):
         self.eventTable.setupTable(data, ['Id', 'Описание', 'Дата'])
 
+    def setConnectionState(self, message: Union[str, None], canBrowse: bool = False):
+        self.connectionLabel.setText(message or '')
+        self.connectionLabel.setVisible(message is not None)
+        self.catalogButton.setEnabled(message is None or canBrowse)
+        self.addEventClick.setEnabled(message is None)
+
 
 class EventCatalogView(View):
     @property
@@ -923,18 +1299,18 @@ class QtEventCatalogView(QtPage):
         for row in rowIndexes:
             item = []
             for column in range(self.table.columnCount()):
-                item.append(self.table.item(row, column).text())
+                item.append(self.table.cellText(row, column))
             items.append(item)
         return items
 
     def subscribeOnAddButtonClick(self, handler):
-        self.addButton.clicked.connect(handler)
+        self.subscribe(self.addButton.clicked, handler)
 
     def subscribeOnEditButtonClick(self, handler):
-        self.editButton.clicked.connect(handler)
+        self.subscribe(self.editButton.clicked, handler)
 
     def subscribeOnDeleteButtonClick(self, handler):
-        self.deleteButton.clicked.connect(handler)
+        self.subscribe(self.deleteButton.clicked, handler)
 
 
 class AddEventView(View):
@@ -975,10 +1351,10 @@ class QtAddEventView(QtPage):
         return self.dateInput.date().toPyDate()
 
     def subscribeOnAddButtonClick(self, handler):
-        self.addButton.clicked.connect(handler)
+        self.subscribe(self.addButton.clicked, handler)
 
     def subscribeOnCancelButtonClick(self, handler):
-        self.cancelButton.clicked.connect(handler)
+        self.subscribe(self.cancelButton.clicked, handler)
 
 
 class EditEventView(View):
@@ -1041,10 +1417,10 @@ class QtEditEventView(QtPage):
         self.dateInput.setDate(value)
 
     def subscribeOnEditButtonClick(self, handler):
-        self.saveButton.clicked.connect(handler)
+        self.subscribe(self.saveButton.clicked, handler)
 
     def subscribeOnCancelButtonClick(self, handler):
-        self.cancelButton.clicked.connect(handler)
+        self.subscribe(self.cancelButton.clicked, handler)
 
 
 class MainWindow(QMainWindow):
@@ -1064,6 +1440,13 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.page)
         self.setMenuBar(self.navMenu)
         self.setStyleSheet(getStyles('mainStyles.qss'))
+        self._messageDialog = None
+
+    def event(self, event: QEvent) -> bool:
+        result = super().event(event)
+        if event.type() == QEvent.Type.UpdateRequest:
+            SpanTracer.notifyPainted()
+        return result
 
     def mousePressEvent(self, event: QMouseEvent) -> None:
         focusedWidget = QApplication.focusWidget()
@@ -1071,6 +1454,15 @@ class MainWindow(QMainWindow):
             focusedWidget.clearFocus()
         super().mousePressEvent(event)
 
+    def messageDialog(self) -> QtMessageDialog:
+        if self._messageDialog is None:
+            self._messageDialog = QtMessageDialog(self)
+        if self._messageDialog.isVisible():
+            dialog = QtMessageDialog(self)
+            dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+            return dialog
+        return self._messageDialog
+
     def switchPage(self, page: QWidget):
         self.page = page
         self.setCentralWidget(page)